@@ -0,0 +1,202 @@
+import asyncio
+import json
+import threading
+import uuid
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Callable
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from api.executors import run_io
+from api.models.job_models import JobInfo
+
+
+class JobCancelled(Exception):
+    """工作函式發現工作已被要求取消時拋出，工作會標記為 cancelled"""
+
+
+class JobManager[JobT: JobInfo]:
+    """
+    在背景執行緒池執行工作並保存工作狀態
+
+    工作狀態只能透過 update 在鎖內修改，讀取時返回複本，
+    因此請求端可以隨時輪詢或以 watch 訂閱進度。
+    工作結束後的完整狀態會寫入 report_dir/{job_id}.json，記憶體中只保留最近 keep 個工作。
+    """
+
+    def __init__(
+        self,
+        job_type: type[JobT],
+        max_workers: int = 1,
+        report_dir: Path | None = None,
+        keep: int = 100,
+    ):
+        self.job_type = job_type
+        self.report_dir = report_dir
+        self.keep = keep
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="job"
+        )
+        self._lock = threading.Lock()
+        self._jobs: OrderedDict[str, JobT] = OrderedDict()
+        # 工作 ID -> 狀態版本（與 job.version 相同），watch 不複製工作即可判斷是否有變動
+        self._versions: dict[str, int] = {}
+        # 工作 ID -> 結束後報告的檔案路徑（提交時決定，不受工作目錄改變影響）
+        self._reports: dict[str, Path] = {}
+
+    def submit(self, job: JobT, func: Callable[[JobT], None]) -> JobT:
+        """
+        提交工作並立即返回
+
+        func 在背景執行緒中以工作的複本呼叫，應透過 update 回報進度；
+        func 正常結束時工作標記為 completed，拋出例外時標記為 failed 並記錄錯誤訊息；
+        長時間執行的 func 應定期檢查 cancel_requested，被取消時拋出 JobCancelled。
+        """
+        with self._lock:
+            self._jobs[job.job_id] = job
+            self._versions[job.job_id] = job.version
+            if self.report_dir is not None:
+                self._reports[job.job_id] = (
+                    self.report_dir / f"{job.job_id}.json"
+                ).absolute()
+            self._evict()
+            snapshot = job.model_copy(deep=True)
+        self._executor.submit(self._run, job.job_id, func)
+        return snapshot
+
+    def _run(self, job_id: str, func: Callable[[JobT], None]):
+        self.update(job_id, self._mark_started)
+        status, message = "completed", None
+        try:
+            # 排隊時已被取消的工作不執行
+            if self.cancel_requested(job_id):
+                raise JobCancelled()
+            func(self.get(job_id))
+        except JobCancelled:
+            status, message = "cancelled", "工作已取消"
+        except Exception as e:
+            status, message = "failed", str(e)
+
+        # 先寫入報告再公開結束狀態，看到工作結束時報告必定已存在
+        finished_at = datetime.now()
+
+        def finish(job: JobInfo):
+            job.status = status
+            job.finished_at = finished_at
+            if message is not None:
+                job.message = message
+
+        report = self.get(job_id)
+        finish(report)
+        report.version += 1
+        self._save_report(report)
+        self.update(job_id, finish)
+
+    @staticmethod
+    def _mark_started(job: JobInfo):
+        job.status = "running"
+        job.started_at = datetime.now()
+
+    def update(self, job_id: str, func: Callable[[JobT], None]):
+        """在鎖內修改工作狀態"""
+        with self._lock:
+            job = self._jobs[job_id]
+            func(job)
+            job.version += 1
+            self._versions[job_id] = job.version
+
+    def cancel(self, job_id: str) -> JobT:
+        """
+        要求取消工作並返回工作狀態的複本
+
+        排隊中的工作不會執行；執行中的工作由工作函式在檢查點停止；已結束的工作不受影響。
+
+        Raises:
+            FileNotFoundError: 找不到工作
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None and not job.finished and not job.cancel_requested:
+                job.cancel_requested = True
+                job.version += 1
+                self._versions[job_id] = job.version
+        return self.get(job_id)
+
+    def cancel_requested(self, job_id: str) -> bool:
+        """工作是否已被要求取消（供工作函式在檢查點呼叫）"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return job is not None and job.cancel_requested
+
+    def get(self, job_id: str) -> JobT:
+        """
+        取得工作狀態的複本，已不在記憶體中的工作從報告檔案讀取
+
+        Raises:
+            FileNotFoundError: 找不到工作
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                return job.model_copy(deep=True)
+            report = self._reports.get(job_id)
+        if report is None and self.report_dir is not None:
+            report = self.report_dir / f"{job_id}.json"
+        if report is None or not report.exists():
+            raise FileNotFoundError(f"找不到工作：{job_id}")
+        with open(report, "r", encoding="utf-8") as f:
+            return self.job_type.model_validate(json.load(f))
+
+    def get_if_changed(self, job_id: str, version: int) -> JobT | None:
+        """
+        工作狀態版本與 version 不同時返回複本，相同時返回 None（不複製工作）
+
+        Raises:
+            FileNotFoundError: 找不到工作
+        """
+        with self._lock:
+            if self._versions.get(job_id) == version:
+                return None
+        return self.get(job_id)
+
+    def _save_report(self, job: JobT):
+        report = self._reports.get(job.job_id)
+        if report is None:
+            return
+        report.parent.mkdir(parents=True, exist_ok=True)
+        with open(report, "w", encoding="utf-8") as f:
+            f.write(job.model_dump_json(indent=4))
+
+    def _evict(self):
+        """移除超過保留數量的已結束工作（報告仍可從 report_dir 中的檔案讀取）"""
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[: max(0, len(self._jobs) - self.keep)]:
+            del self._jobs[job_id]
+            del self._versions[job_id]
+            self._reports.pop(job_id, None)
+
+    async def watch(self, job_id: str, interval: float = 0.5) -> AsyncIterator[JobT]:
+        """
+        每當工作狀態改變時產生一份複本，工作結束後停止
+
+        Raises:
+            FileNotFoundError: 找不到工作
+        """
+        version = -1
+        while True:
+            # 狀態沒有改變時不複製工作（例如匯入工作累積的逐列報告）；
+            # 取得鎖、複製與讀取報告檔案都在 I/O 執行器中進行，不阻塞事件迴圈
+            job = await run_io(self.get_if_changed, job_id, version)
+            if job is not None:
+                version = job.version
+                yield job
+                if job.finished:
+                    return
+            await asyncio.sleep(interval)
+
+    @staticmethod
+    def new_job_id() -> str:
+        return uuid.uuid4().hex
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
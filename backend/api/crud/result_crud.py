@@ -1,44 +1,23 @@
-from pathlib import Path
-import json
-from datetime import datetime
-from api.models.result_models import ResultBasicInfo
+from api.crud.review_crud import clear_review_cache
+from api.executors import run_io
+from api.models.response_models import Page
+from api.models.result_models import ResultBasicInfo, ResultQuery
+from api.storage import get_storage
 
 
 class ResultCRUD:
     @staticmethod
-    def get_all_results() -> list[ResultBasicInfo]:
+    def get_all_results(query: ResultQuery | None = None) -> Page[ResultBasicInfo]:
         """
-        取得所有審查結果的基本資訊
+        取得審查結果的基本資訊（只讀取結果索引）
+
+        Args:
+            query: 篩選、排序與分頁條件，預設為所有結果（最新的在前）
 
         Returns:
-            list[ResultBasicInfo]: 包含所有審查結果的列表，每個結果包含基本資訊
+            Page[ResultBasicInfo]: 符合條件的結果與總筆數
         """
-        results_dir = Path("data/evaluation_results")
-        results_info: list[ResultBasicInfo] = []
-
-        if not results_dir.exists():
-            return []
-
-        json_files = list(results_dir.glob("*.json"))
-        for result_file in sorted(
-            json_files, key=lambda x: x.stat().st_mtime, reverse=True
-        ):
-            try:
-                with open(result_file, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-
-                # 提取基本資訊
-                result_info = ResultBasicInfo(
-                    file_name=result_file.name,
-                    student_id=data.get("id", ""),
-                    student_name=data.get("name", ""),
-                )
-                results_info.append(result_info)
-            except Exception as e:
-                print(f"警告：跳過檔案 {result_file.name}: {e}")
-                continue
-
-        return results_info
+        return get_storage().query_results(query or ResultQuery())
 
     @staticmethod
     def get_result_by_filename(filename: str) -> dict:
@@ -54,16 +33,17 @@ class ResultCRUD:
         Raises:
             FileNotFoundError: 找不到指定的結果檔案
         """
-        results_dir = Path("data/evaluation_results")
-        result_file = results_dir / filename
-
-        if not result_file.exists():
-            raise FileNotFoundError(f"找不到結果檔案: {filename}")
+        return get_storage().get_result(filename)
 
-        with open(result_file, "r", encoding="utf-8") as f:
-            data = json.load(f)
+    @staticmethod
+    def get_result_json(filename: str) -> bytes:
+        """
+        根據檔名取得審查結果的 JSON（不解析）
 
-        return data
+        Raises:
+            FileNotFoundError: 找不到指定的結果檔案
+        """
+        return get_storage().get_result_json(filename)
 
     @staticmethod
     def delete_result_by_filename(filename: str) -> bool:
@@ -79,13 +59,8 @@ class ResultCRUD:
         Raises:
             FileNotFoundError: 找不到指定的結果檔案
         """
-        results_dir = Path("data/evaluation_results")
-        result_file = results_dir / filename
-
-        if not result_file.exists():
+        if not get_storage().delete_result(filename):
             raise FileNotFoundError(f"找不到結果檔案: {filename}")
-
-        result_file.unlink()
         return True
 
     @staticmethod
@@ -94,18 +69,28 @@ class ResultCRUD:
         刪除所有審查結果
 
         Returns:
-            int: 刪除的檔案數量
+            int: 刪除的數量
         """
-        results_dir = Path("data/evaluation_results")
+        count = get_storage().delete_all_results()
+        clear_review_cache()
+        return count
+
+    # ---- 非同步版本：在 I/O 執行器中執行對應的方法，供 async 路由使用 ----
 
-        if not results_dir.exists():
-            return 0
+    @staticmethod
+    async def get_all_results_async(
+        query: ResultQuery | None = None,
+    ) -> Page[ResultBasicInfo]:
+        return await run_io(ResultCRUD.get_all_results, query)
 
-        json_files = list(results_dir.glob("*.json"))
-        deleted_count = 0
+    @staticmethod
+    async def get_result_json_async(filename: str) -> bytes:
+        return await run_io(ResultCRUD.get_result_json, filename)
 
-        for result_file in json_files:
-            result_file.unlink()
-            deleted_count += 1
+    @staticmethod
+    async def delete_result_by_filename_async(filename: str) -> bool:
+        return await run_io(ResultCRUD.delete_result_by_filename, filename)
 
-        return deleted_count
+    @staticmethod
+    async def delete_all_results_async() -> int:
+        return await run_io(ResultCRUD.delete_all_results)
@@ -1,10 +1,95 @@
+import contextlib
+import functools
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Callable, Iterator
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    wait,
+)
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
+from datetime import datetime
+from api.crud.job_crud import JobCancelled, JobManager
+from api.crud.student_crud import StudentCRUD
+from api.executors import batch_pool, call_with_storage, run_cpu, run_io
+from api.storage import get_storage
+from api.models.job_models import ReviewJob, ReviewJobProgress
+from api.models.review_models import (
+    BatchReviewItem,
+    BatchReviewLine,
+    ReviewOptions,
+    SimulatedCourse,
+)
+from api.models.student_models import StudentBasicInfo
 from rule_engine.models.student import Student
+from rule_engine.models.course import StudentCourse
 from rule_engine.models.rule import Rule, RuleSet
-from rule_engine.models.result import Result
+from rule_engine.record import ResultRecord
 from rule_engine.evaluator import Evaluator
-from rule_engine.factory import RuleFactory
+from rule_engine.profiler import EvaluationProfiler, RuleProfile
+from rule_engine.course_index import CourseIndex
+from rule_engine.departments import department_registry
+from rule_engine.overlay import CourseOverlay
 from rule_engine.utils import UtilFunctions
+from rule_engine.result_cache import CachedResults, ResultCache
+
+# 審查結果快取：每個行程（包含計算與批次審查行程池的每個 worker 行程）各自的記憶體 LRU，
+# 項目數由環境變數 GRADUATION_REVIEW_CACHE_SIZE 設定（預設 256，0 表示不使用）；
+# 設定 GRADUATION_REVIEW_CACHE_DIR 時另外將結果保存在該目錄，供其他行程與重新啟動後共用，
+# 檔案數上限由 GRADUATION_REVIEW_CACHE_DISK_MAX 設定（預設 4096）。
+# 刪除規則、學生或所有審查結果時會一併清除：API 行程與磁碟層立即清除，
+# worker 行程在下一次審查前清除（見 clear_review_cache）
+review_cache = ResultCache(
+    maxsize=int(os.environ.get("GRADUATION_REVIEW_CACHE_SIZE", 256)),
+    disk_dir=(
+        Path(os.environ["GRADUATION_REVIEW_CACHE_DIR"])
+        if os.environ.get("GRADUATION_REVIEW_CACHE_DIR")
+        else None
+    ),
+    disk_maxsize=int(os.environ.get("GRADUATION_REVIEW_CACHE_DISK_MAX", 4096)),
+)
+
+
+# 清除審查結果快取的次數，隨每個審查工作傳給 worker 行程；
+# worker 行程收到的次數與上次不同時先清除自己的記憶體快取（見 _sync_review_cache）
+_review_cache_generation = 0
+_synced_review_cache_generation = 0
+_review_cache_generation_lock = threading.Lock()
+
+
+def clear_review_cache():
+    """清除審查結果快取（包含磁碟層的檔案），worker 行程的記憶體快取在下一次審查前清除"""
+    global _review_cache_generation, _synced_review_cache_generation
+    with _review_cache_generation_lock:
+        _review_cache_generation += 1
+        _synced_review_cache_generation = _review_cache_generation
+        review_cache.clear(include_disk=True)
+
+
+def _sync_review_cache(generation: int):
+    """呼叫端清除快取的次數與目前行程不同時，清除目前行程的記憶體快取（磁碟層已由呼叫端清除）"""
+    global _synced_review_cache_generation
+    with _review_cache_generation_lock:
+        if generation != _synced_review_cache_generation:
+            review_cache.clear()
+            _synced_review_cache_generation = generation
+
+
+class SimulationInputError(ValueError):
+    """模擬審查的假設課程無法轉換成修課資料"""
+
+
+# 批次審查工作：依提交順序一次執行一個，
+# 每個工作在批次審查行程池中同時審查多位學生，並保留一個 CPU 核心給一般的 API 請求
+review_jobs: JobManager[ReviewJob] = JobManager(
+    ReviewJob, max_workers=1, report_dir=Path("data/review_jobs")
+)
+REVIEW_JOB_WORKERS = max(1, (os.cpu_count() or 1) - 1)
 
 
 class ReviewCRUD:
@@ -21,117 +106,67 @@ class ReviewCRUD:
             rule_type: "minor" 或 "double_major" 或 "major"
 
         Returns:
-            Rule 或是 None
+            Rule 或是 None：已解析並凍結的規則，同一規則在行程內只解析一次，
+                規則檔案變動或透過 RuleCRUD 新增、刪除後會重新載入；需要修改時請先複製
         """
-        rules_dir = Path("data/rules")
-
-        if not rules_dir.exists():
-            raise FileNotFoundError(f"規則目錄不存在：{rules_dir}")
-
-        dept_dir = rules_dir / department
-        if not dept_dir.exists():
-            raise FileNotFoundError(f"找不到科系 '{department}' 對應的規則資料夾")
-
-        # 根據類型設定後綴
-        suffix = f"_{rule_type}"
-
-        # 尋找符合條件的規則文件
-        rule_files = list(dept_dir.glob(f"*{suffix}.json"))
-        if not rule_files:
-            raise FileNotFoundError(
-                f"科系 '{department}' 沒有可用的 {rule_type} 規則文件"
-            )
-
-        # 解析文件名稱中的年度
-        eligible_rules = []
-
-        for rule_file in rule_files:
-            filename = rule_file.stem  # 去除副檔名
-            # 移除後綴
-            year_part = filename.replace(suffix, "")
-
-            # 檢查是否為純數字
-            if year_part.isdigit():
-                rule_year = int(year_part)
-                if rule_year <= admission_year:
-                    eligible_rules.append((rule_year, rule_file))
-
-        if not eligible_rules:
-            raise FileNotFoundError(
-                f"找不到適用於入學年度 {admission_year} 的 {rule_type} 規則"
-            )
-
-        # 選擇最大但小於等於入學年度的規則
-        eligible_rules.sort(key=lambda x: x[0], reverse=True)
-        _, selected_rule_file = eligible_rules[0]
-
-        # 載入規則
-        rule = RuleFactory.from_json_file(selected_rule_file)
-
-        return rule
+        return get_storage().find_rule(department, admission_year, rule_type)
 
     @staticmethod
-    def perform_evaluation(student: Student, rule: Rule) -> Result:
+    def perform_evaluation(
+        student: Student,
+        rule: Rule,
+        index: CourseIndex | None = None,
+        profiler: EvaluationProfiler | None = None,
+    ) -> ResultRecord:
         """
-        執行畢業審查評估
+        執行畢業審查評估（不會修改學生資料）
 
         Args:
             student: 學生資料
             rule: 審查規則
+            index: 學生修課索引，同一位學生審查多條規則時可共用
+            profiler: 效能分析紀錄器，傳入時記錄每個規則節點的效能
 
         Returns:
-            Result: 審查結果
+            ResultRecord: 審查結果（輕量紀錄，回傳給 API 前再以 to_model() 轉換）
         """
-        evaluator = Evaluator()
-        result = evaluator.evaluate(rule, student.courses)
+        evaluator = Evaluator(profiler)
+        result = evaluator.evaluate_record(rule, student.courses, index)
         return result
 
     @staticmethod
-    def save_evaluation_result(student: Student, results: dict[str, Result | None]):
-        output_dir = Path("data/evaluation_results")
-        output_dir.mkdir(exist_ok=True)
-        from datetime import datetime
-
+    def save_evaluation_result(
+        student: Student, results: dict[str, ResultRecord | None]
+    ):
         now = datetime.now()
-        result_file = output_dir / f"{student.id}_{now.strftime("%d_%b_%Y_%H_%M")}.json"
-        result_data = student.model_dump(exclude={"courses"})
-        result_data |= {
-            key: model.model_dump() if model else None for key, model in results.items()
-        }
-        import json
-
-        with open(result_file, "w", encoding="utf-8") as f:
-            json.dump(result_data, f, ensure_ascii=False, indent=4)
+        result_name = f"{student.id}_{now.strftime("%d_%b_%Y_%H_%M")}.json"
+        # 審查結果以紀錄交給儲存層，寫入 to_json() 的輸出，回應時可重複使用
+        result_data = student.model_dump(exclude={"courses"}) | results
+        get_storage().save_result(result_name, result_data, created_at=now)
 
     @staticmethod
-    def review_student(
+    def resolve_rules(
         student: Student,
         major_department: str | None = None,
         double_major_department: str | None = None,
         minor_departments: list[str] | None = None,
-    ) -> dict[str, Result | None]:
+        rule_selector: Callable[[str, int, str], Rule | None] | None = None,
+    ) -> dict[str, Rule | None]:
         """
-        對學生進行完整的畢業審查
-
-        Args:
-            student: 學生資料
-            major_department: 主修科系（若為 None 則使用學生本身的科系）
-            double_major_department: 雙主修科系
-            minor_departments: 輔系科系列表
+        依審查選項選出各項審查要使用的規則（含不分系學生的規則調整）
 
         Returns:
-            dict[str, Result]: 包含各項審查結果的字典
-                - "main": 主修審查結果
-                - "double_major": 雙主修審查結果（如果有）
-                - "minor_<dept>": 各輔系審查結果（如果有）
+            dict[str, Rule | None]: 鍵與 review_student 的結果相同，
+                找不到雙主修或輔系規則時對應的 "<鍵>_error" 為 None
         """
-        results: dict[str, Result | None] = {}
+        select_rule = rule_selector or ReviewCRUD.select_rule
+        rules: dict[str, Rule | None] = {}
 
         # 1. 主修系
         review_dept = major_department if major_department else student.major
 
         # 載入主修規則
-        main_rule = ReviewCRUD.select_rule(review_dept, student.admission_year, "major")
+        main_rule = select_rule(review_dept, student.admission_year, "major")
 
         # 如果主修是不分系，判斷有沒有輔系(minor)
         if review_dept == "AN":
@@ -141,14 +176,15 @@ class ReviewCRUD:
                 )
 
             # 取得專長系的科系代碼
-            dept_codes_in_college = UtilFunctions().get_department_code(
+            dept_codes_in_college = department_registry.same_college(
                 minor_departments[0]
             )
 
-            # 調整規則
+            # 調整規則（規則為共用的凍結物件，先複製再修改）
             if isinstance(main_rule, RuleSet):
+                main_rule = main_rule.model_copy(deep=True)
                 # 調整第一個子規則：某系輔修
-                selected_info = ReviewCRUD.select_rule(
+                selected_info = select_rule(
                     minor_departments[0], student.admission_year, "minor"
                 )
                 if selected_info:
@@ -173,38 +209,626 @@ class ReviewCRUD:
                 f"無法為科系 '{review_dept}' 和入學年度 {student.admission_year} 找到適用的規則"
             )
 
-        # 執行主修審查
-        results["main"] = ReviewCRUD.perform_evaluation(student, main_rule)
+        rules["main"] = main_rule
 
-        # 2. 雙主修審查
+        # 2. 雙主修規則
         if double_major_department:
             try:
-                double_major_rule = ReviewCRUD.select_rule(
+                double_major_rule = select_rule(
                     double_major_department, student.admission_year, "double_major"
                 )
                 if double_major_rule:
-                    results[f"double_major_{double_major_department}"] = (
-                        ReviewCRUD.perform_evaluation(student, double_major_rule)
-                    )
+                    rules[f"double_major_{double_major_department}"] = double_major_rule
             except FileNotFoundError as e:
                 # 如果找不到雙主修規則，記錄錯誤但繼續
-                results["double_major_error"] = None
+                rules["double_major_error"] = None
 
-        # 3. 輔系審查
+        # 3. 輔系規則
         if minor_departments:
             for minor_dept in minor_departments:
                 try:
-                    minor_rule = ReviewCRUD.select_rule(
+                    minor_rule = select_rule(
                         minor_dept, student.admission_year, "minor"
                     )
                     if minor_rule:
-                        results[f"minor_{minor_dept}"] = ReviewCRUD.perform_evaluation(
-                            student, minor_rule
-                        )
+                        rules[f"minor_{minor_dept}"] = minor_rule
                 except FileNotFoundError as e:
                     # 如果找不到輔系規則，記錄錯誤但繼續
-                    results[f"minor_{minor_dept}_error"] = None
+                    rules[f"minor_{minor_dept}_error"] = None
+
+        return rules
+
+    @staticmethod
+    def review_student(
+        student: Student,
+        major_department: str | None = None,
+        double_major_department: str | None = None,
+        minor_departments: list[str] | None = None,
+        rule_selector: Callable[[str, int, str], Rule | None] | None = None,
+        save_result: bool = True,
+        use_cache: bool = True,
+        profiler: EvaluationProfiler | None = None,
+    ) -> dict[str, ResultRecord | None]:
+        """
+        對學生進行完整的畢業審查
+
+        Args:
+            student: 學生資料
+            major_department: 主修科系（若為 None 則使用學生本身的科系）
+            double_major_department: 雙主修科系
+            minor_departments: 輔系科系列表
+            rule_selector: 選擇規則的函式，預設為 ReviewCRUD.select_rule
+            save_result: 是否將審查結果存檔
+            use_cache: 是否使用評估結果快取（快取命中時不重新評估，save_result 為 True 時仍會存檔）
+            profiler: 效能分析紀錄器，傳入時一定會重新評估（不使用快取）
+
+        Returns:
+            dict[str, ResultRecord]: 包含各項審查結果的字典
+                - "main": 主修審查結果
+                - "double_major": 雙主修審查結果（如果有）
+                - "minor_<dept>": 各輔系審查結果（如果有）
+        """
+        select_rule = rule_selector or ReviewCRUD.select_rule
+        # 審查選項在不分系處理移除第一個輔系之前記錄，作為快取鍵的一部分
+        options = {
+            "major": major_department,
+            "double_major": double_major_department,
+            "minor": list(minor_departments) if minor_departments else None,
+        }
+        rules = ReviewCRUD.resolve_rules(
+            student,
+            major_department,
+            double_major_department,
+            minor_departments,
+            select_rule,
+        )
+
+        # 查詢快取：規則內容、修課列表或審查選項任一改變都會得到不同的鍵
+        cache_key = None
+        if use_cache and profiler is None:
+            cache_key = ResultCache.make_key(
+                student=student.model_dump(mode="json", exclude={"courses"}),
+                courses=UtilFunctions.fingerprint_courses(student.courses),
+                options=options,
+                rules={
+                    key: UtilFunctions.rule_digest(rule) if rule else None
+                    for key, rule in rules.items()
+                },
+            )
+            cached = review_cache.get(cache_key)
+            if cached is not None:
+                # 快取只省略評估，結果仍照常存檔（先前的結果可能已被刪除）
+                if save_result:
+                    ReviewCRUD.save_evaluation_result(student, cached.results)
+                return cached.results
+
+        # 執行審查（評估不會修改修課資料，各項審查共用同一份索引）
+        index = CourseIndex(student.courses)
+        results: dict[str, ResultRecord | None] = {
+            key: (
+                ReviewCRUD.perform_evaluation(student, rule, index, profiler)
+                if rule
+                else None
+            )
+            for key, rule in rules.items()
+        }
+
+        if save_result:
+            ReviewCRUD.save_evaluation_result(student, results)
 
-        ReviewCRUD.save_evaluation_result(student, results)
+        if cache_key is not None:
+            review_cache.put(cache_key, CachedResults(results))
 
         return results
+
+    @staticmethod
+    def next_semester(student: Student) -> tuple[int, int]:
+        """學生最後一次修課的下一個學期 (學年, 學期)，沒有修課紀錄時為入學學年第一學期"""
+        if not student.courses:
+            return student.admission_year, 1
+        year, semester = max(
+            (course.year_taken, course.semester_taken) for course in student.courses
+        )
+        return (year, 2) if semester == 1 else (year + 1, 1)
+
+    @staticmethod
+    def simulate_student(
+        student: Student,
+        variants: list[list[StudentCourse]],
+        major_department: str | None = None,
+        double_major_department: str | None = None,
+        minor_departments: list[str] | None = None,
+        rule_selector: Callable[[str, int, str], Rule | None] | None = None,
+    ) -> list[dict[str, ResultRecord | None]]:
+        """
+        模擬審查：假設學生另外修了各組課程後的審查結果（不修改也不存檔學生資料）
+
+        每組假設課程以 CourseOverlay 疊加在原始修課列表上，規則只選擇一次，
+        所有組別共用相同的規則。
+
+        Args:
+            student: 學生資料（唯讀）
+            variants: 各組假設新增的課程
+
+        Returns:
+            list[dict[str, ResultRecord | None]]: 依 variants 順序排列的審查結果，
+                每組的鍵與 review_student 相同
+        """
+        rules = ReviewCRUD.resolve_rules(
+            student,
+            major_department,
+            double_major_department,
+            list(minor_departments) if minor_departments else None,
+            rule_selector,
+        )
+        evaluator = Evaluator()
+
+        outcomes: list[dict[str, ResultRecord | None]] = []
+        for added_courses in variants:
+            courses = CourseOverlay(student.courses, added_courses)
+            index = CourseIndex(courses)
+            outcomes.append(
+                {
+                    key: (
+                        evaluator.evaluate_record(rule, courses, index)
+                        if rule
+                        else None
+                    )
+                    for key, rule in rules.items()
+                }
+            )
+        return outcomes
+
+    @staticmethod
+    def review_students(
+        student_ids: list[str],
+        options: ReviewOptions | None = None,
+        max_workers: int | None = None,
+        save_result: bool = True,
+    ) -> list[BatchReviewItem]:
+        """
+        批次審查多位學生，以多個行程平行執行
+
+        Args:
+            student_ids: 學號列表
+            options: 所有學生共用的審查選項
+            max_workers: 同時審查的學生數（預設為 CPU 核心數，1 表示在目前行程依序執行）
+            save_result: 是否將每位學生的審查結果存檔
+
+        Returns:
+            list[BatchReviewItem]: 依 student_ids 順序排列的審查結果，
+                失敗的學生 success 為 False 並附上錯誤訊息
+        """
+        items: list[BatchReviewItem | None] = [None] * len(student_ids)
+        for position, item in ReviewCRUD.iter_review_students(
+            student_ids, options, max_workers, save_result
+        ):
+            items[position] = item
+        return items
+
+    @staticmethod
+    def iter_review_students(
+        student_ids: list[str],
+        options: ReviewOptions | None = None,
+        max_workers: int | None = None,
+        save_result: bool = True,
+    ) -> Iterator[tuple[int, BatchReviewItem]]:
+        """
+        批次審查多位學生，每完成一位就產生 (在 student_ids 中的位置, 結果)
+
+        多位學生時在共用的批次審查行程池（見 api.executors.batch_pool）中執行，
+        同一批次同時最多 max_workers 位學生。
+        同一批次中每條規則在每個 worker 行程只選擇一次，整批學生使用相同版本的規則；
+        學生資料透過 StudentCRUD.get_cached_student 讀取。
+        提前停止迭代（例如串流的連線中斷）時，尚未開始的審查會被取消。
+
+        參數與 review_students 相同。
+        """
+        options = options or ReviewOptions()
+        max_workers = max_workers or os.cpu_count() or 1
+        batch_id = uuid.uuid4().hex
+
+        if max_workers == 1 or len(student_ids) <= 1:
+            try:
+                for position, student_id in enumerate(student_ids):
+                    yield position, _review_student_worker(
+                        student_id,
+                        options,
+                        save_result,
+                        batch_id,
+                        _review_cache_generation,
+                    )
+            finally:
+                with _batch_rules_lock:
+                    _batch_rules.pop(batch_id, None)
+            return
+
+        # 共用的行程池中同時最多 max_workers 位學生，完成一位再提交下一位
+        storage = get_storage().resolved()
+        remaining = iter(enumerate(student_ids))
+        # future -> (位置, 提交到的行程池)
+        pending: dict[Future[BatchReviewItem], tuple[int, ProcessPoolExecutor]] = {}
+
+        def submit_next():
+            next_student = next(remaining, None)
+            if next_student is None:
+                return
+            position, student_id = next_student
+            executor = batch_pool.get()
+            try:
+                future = executor.submit(
+                    call_with_storage,
+                    storage,
+                    _review_student_worker,
+                    student_id,
+                    options,
+                    save_result,
+                    batch_id,
+                    _review_cache_generation,
+                )
+            except BrokenProcessPool:
+                # 其他批次的 worker 行程異常終止，換一個新的行程池
+                batch_pool.discard(executor)
+                executor = batch_pool.get()
+                future = executor.submit(
+                    call_with_storage,
+                    storage,
+                    _review_student_worker,
+                    student_id,
+                    options,
+                    save_result,
+                    batch_id,
+                    _review_cache_generation,
+                )
+            pending[future] = (position, executor)
+
+        try:
+            for _ in range(min(max_workers, len(student_ids))):
+                submit_next()
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    position, executor = pending.pop(future)
+                    try:
+                        item = future.result()
+                    except Exception as e:
+                        # worker 行程異常終止等無法在 worker 內捕捉的錯誤
+                        if isinstance(e, BrokenProcessPool):
+                            batch_pool.discard(executor)
+                        item = BatchReviewItem(
+                            student_id=student_ids[position],
+                            success=False,
+                            error=str(e),
+                        )
+                    yield position, item
+                    submit_next()
+        finally:
+            for future in pending:
+                future.cancel()
+
+    @staticmethod
+    def submit_review_job(
+        student_ids: list[str],
+        options: ReviewOptions | None = None,
+        save_result: bool = True,
+        include_details: bool = False,
+        max_workers: int | None = None,
+    ) -> ReviewJob:
+        """
+        提交背景批次審查工作並立即返回工作狀態
+
+        每完成一位學生就將 BatchReviewLine 寫入結果檔案（見 get_review_job_results）並更新進度，
+        save_result 為 True 時每位學生的審查結果另外保存到審查結果中。
+        工作不依附於提交的請求，連線中斷不影響執行；可透過 cancel_review_job 取消。
+
+        Args:
+            max_workers: 同時審查的學生數，預設為 REVIEW_JOB_WORKERS
+        """
+        student_ids = list(student_ids)
+        options = options or ReviewOptions()
+        job = ReviewJob(
+            job_id=JobManager.new_job_id(),
+            options=options,
+            save_result=save_result,
+            include_details=include_details,
+            progress=ReviewJobProgress(total=len(student_ids)),
+        )
+        # 背景執行緒不依賴提交後的工作目錄
+        results_path = ReviewCRUD._review_job_results_path(job.job_id).absolute()
+
+        def run(job: ReviewJob):
+            results_path.parent.mkdir(parents=True, exist_ok=True)
+            items = ReviewCRUD.iter_review_students(
+                student_ids,
+                options,
+                max_workers or REVIEW_JOB_WORKERS,
+                save_result,
+            )
+            with open(results_path, "w", encoding="utf-8") as f, contextlib.closing(
+                items
+            ):
+                for index, item in items:
+                    line = BatchReviewLine.from_item(index, item, include_details)
+                    f.write(line.model_dump_json() + "\n")
+
+                    def apply(job: ReviewJob):
+                        progress = job.progress
+                        progress.completed += 1
+                        if line.success:
+                            progress.succeeded += 1
+                            progress.eligible += line.is_eligible_for_graduation
+                        else:
+                            progress.failed += 1
+
+                    review_jobs.update(job.job_id, apply)
+                    # 停止迭代時尚未開始的審查會被取消
+                    if review_jobs.cancel_requested(job.job_id):
+                        raise JobCancelled()
+
+            def finish(job: ReviewJob):
+                progress = job.progress
+                job.message = (
+                    f"批次審查完成：{progress.succeeded} 位成功、{progress.failed} 位失敗，"
+                    f"{progress.eligible} 位符合畢業資格"
+                )
+
+            review_jobs.update(job.job_id, finish)
+
+        return review_jobs.submit(job, run)
+
+    @staticmethod
+    def get_review_job(job_id: str) -> ReviewJob:
+        """
+        Raises:
+            FileNotFoundError: 找不到工作
+        """
+        return review_jobs.get(job_id)
+
+    @staticmethod
+    def watch_review_job(job_id: str) -> AsyncIterator[ReviewJob]:
+        """每當批次審查工作狀態改變時產生一份複本，工作結束後停止"""
+        return review_jobs.watch(job_id)
+
+    @staticmethod
+    def cancel_review_job(job_id: str) -> ReviewJob:
+        """
+        取消批次審查工作：排隊中的工作不會執行，執行中的工作在下一位學生完成後停止，
+        已完成的結果仍保留在結果檔案中
+
+        Raises:
+            FileNotFoundError: 找不到工作
+        """
+        return review_jobs.cancel(job_id)
+
+    @staticmethod
+    def get_review_job_results(job_id: str) -> Path:
+        """
+        已結束的批次審查工作的結果檔案（NDJSON，每行一個 BatchReviewLine，依完成順序）
+
+        Raises:
+            FileNotFoundError: 找不到工作或結果檔案
+            ValueError: 工作尚未結束
+        """
+        job = review_jobs.get(job_id)
+        if not job.finished:
+            raise ValueError(f"工作 {job_id} 尚未結束")
+        path = ReviewCRUD._review_job_results_path(job_id)
+        if not path.exists():
+            raise FileNotFoundError(f"找不到工作 {job_id} 的審查結果")
+        return path
+
+    @staticmethod
+    def _review_job_results_path(job_id: str) -> Path:
+        return review_jobs.report_dir / f"{job_id}.ndjson"
+
+    # ---- 非同步版本，供 async 路由使用 ----
+    # 審查與模擬在計算行程池中執行（包含讀取規則與存檔），其餘在 I/O 執行器中執行
+
+    @staticmethod
+    async def review_student_async(
+        student_id: str,
+        major_department: str | None = None,
+        double_major_department: str | None = None,
+        minor_departments: list[str] | None = None,
+        save_result: bool = True,
+        profiler: EvaluationProfiler | None = None,
+    ) -> tuple[StudentBasicInfo, dict[str, ResultRecord | None]]:
+        """
+        審查學生，學生資料在 worker 行程中以 StudentCRUD.get_cached_student 讀取
+
+        profiler 傳入時，worker 行程中的效能紀錄會加入 profiler.entries。
+
+        Returns:
+            (學生基本資訊, 與 review_student 相同的審查結果)
+
+        Raises:
+            FileNotFoundError: 找不到學生或規則
+        """
+        student_info, results, entries = await run_cpu(
+            _review_student_in_worker,
+            student_id,
+            major_department,
+            double_major_department,
+            minor_departments,
+            save_result,
+            profiler is not None,
+            _review_cache_generation,
+        )
+        if profiler is not None:
+            profiler.entries.extend(entries)
+        return student_info, results
+
+    @staticmethod
+    async def simulate_student_async(
+        student_id: str,
+        variants: list[list[SimulatedCourse]],
+        major_department: str | None = None,
+        double_major_department: str | None = None,
+        minor_departments: list[str] | None = None,
+    ) -> tuple[StudentBasicInfo, list[dict[str, ResultRecord | None]]]:
+        """
+        模擬審查，學生資料在 worker 行程中以 StudentCRUD.get_cached_student 讀取，
+        未指定學年學期的假設課程視為在 next_semester 修習
+
+        Returns:
+            (學生基本資訊, 與 simulate_student 相同的審查結果)
+
+        Raises:
+            FileNotFoundError: 找不到學生或規則
+            SimulationInputError: 假設課程無法轉換成修課資料
+        """
+        return await run_cpu(
+            _simulate_student_in_worker,
+            student_id,
+            variants,
+            major_department,
+            double_major_department,
+            minor_departments,
+        )
+
+    @staticmethod
+    async def submit_review_job_async(
+        student_ids: list[str],
+        options: ReviewOptions | None = None,
+        save_result: bool = True,
+        include_details: bool = False,
+    ) -> ReviewJob:
+        return await run_io(
+            ReviewCRUD.submit_review_job,
+            student_ids,
+            options,
+            save_result=save_result,
+            include_details=include_details,
+        )
+
+    @staticmethod
+    async def get_review_job_async(job_id: str) -> ReviewJob:
+        return await run_io(ReviewCRUD.get_review_job, job_id)
+
+    @staticmethod
+    async def cancel_review_job_async(job_id: str) -> ReviewJob:
+        return await run_io(ReviewCRUD.cancel_review_job, job_id)
+
+    @staticmethod
+    async def get_review_job_results_async(job_id: str) -> Path:
+        return await run_io(ReviewCRUD.get_review_job_results, job_id)
+
+
+# 批次審查時各行程選擇過的規則（或找不到規則的錯誤訊息）：
+# 批次 ID -> ((系所, 入學年度, 規則類型) -> 規則或錯誤訊息)。
+# worker 行程在多個批次間共用，只保留最近的幾個批次；在目前行程審查時結束後即移除
+_batch_rules: OrderedDict[str, dict[tuple[str, int, str], Rule | str]] = OrderedDict()
+_batch_rules_lock = threading.Lock()
+_BATCH_RULES_MAXSIZE = 8
+
+
+def _select_batch_rule(
+    batch_id: str, department: str, admission_year: int, rule_type: str
+) -> Rule | None:
+    with _batch_rules_lock:
+        rules = _batch_rules.get(batch_id)
+        if rules is None:
+            rules = _batch_rules[batch_id] = {}
+            while len(_batch_rules) > _BATCH_RULES_MAXSIZE:
+                _batch_rules.popitem(last=False)
+        else:
+            _batch_rules.move_to_end(batch_id)
+
+        key = (department, admission_year, rule_type)
+        if key not in rules:
+            try:
+                rules[key] = ReviewCRUD.select_rule(*key)
+            except FileNotFoundError as e:
+                rules[key] = str(e)
+        rule = rules[key]
+    if isinstance(rule, str):
+        raise FileNotFoundError(rule)
+    return rule
+
+
+def _review_student_in_worker(
+    student_id: str,
+    major_department: str | None,
+    double_major_department: str | None,
+    minor_departments: list[str] | None,
+    save_result: bool,
+    profile: bool,
+    cache_generation: int,
+) -> tuple[StudentBasicInfo, dict[str, ResultRecord | None], list[RuleProfile]]:
+    # 在計算行程池中執行，效能紀錄隨結果傳回呼叫端
+    _sync_review_cache(cache_generation)
+    student = StudentCRUD.get_cached_student(student_id)
+    profiler = EvaluationProfiler() if profile else None
+    results = ReviewCRUD.review_student(
+        student,
+        major_department,
+        double_major_department,
+        minor_departments,
+        save_result=save_result,
+        profiler=profiler,
+    )
+    return (
+        StudentBasicInfo(id=student.id, name=student.name, major=student.major),
+        results,
+        profiler.entries if profiler else [],
+    )
+
+
+def _simulate_student_in_worker(
+    student_id: str,
+    variants: list[list[SimulatedCourse]],
+    major_department: str | None,
+    double_major_department: str | None,
+    minor_departments: list[str] | None,
+) -> tuple[StudentBasicInfo, list[dict[str, ResultRecord | None]]]:
+    # 在計算行程池中執行，假設課程依學生最後一次修課的學期轉換
+    student = StudentCRUD.get_cached_student(student_id)
+    year, semester = ReviewCRUD.next_semester(student)
+    try:
+        variant_courses = [
+            [course.to_student_course(year, semester) for course in courses]
+            for courses in variants
+        ]
+    except ValueError as e:
+        raise SimulationInputError(str(e)) from None
+    outcomes = ReviewCRUD.simulate_student(
+        student,
+        variant_courses,
+        major_department,
+        double_major_department,
+        minor_departments,
+    )
+    return (
+        StudentBasicInfo(id=student.id, name=student.name, major=student.major),
+        outcomes,
+    )
+
+
+def _review_student_worker(
+    student_id: str,
+    options: ReviewOptions,
+    save_result: bool,
+    batch_id: str,
+    cache_generation: int,
+) -> BatchReviewItem:
+    try:
+        _sync_review_cache(cache_generation)
+        student = StudentCRUD.get_cached_student(student_id)
+        results = ReviewCRUD.review_student(
+            student=student,
+            major_department=options.major,
+            double_major_department=options.double_major,
+            minor_departments=list(options.minor) if options.minor else None,
+            rule_selector=functools.partial(_select_batch_rule, batch_id),
+            save_result=save_result,
+        )
+        return BatchReviewItem(
+            student_id=student_id,
+            success=True,
+            results=results,
+            student=StudentBasicInfo(
+                id=student.id, name=student.name, major=student.major
+            ),
+        )
+    except Exception as e:
+        return BatchReviewItem(student_id=student_id, success=False, error=str(e))
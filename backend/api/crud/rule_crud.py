@@ -1,10 +1,13 @@
-from pathlib import Path
 import json
+from datetime import datetime, timezone
 from typing import ClassVar
 import re
 
+from api.crud.review_crud import clear_review_cache
+from api.executors import run_io
 from api.models.rule_models import *
-from rule_engine.factory import RuleFactory
+from api.storage import Version, get_storage
+from rule_engine.departments import department_registry
 
 
 class RuleCRUD:
@@ -14,14 +17,12 @@ class RuleCRUD:
 
     @staticmethod
     def _load_departments_info() -> dict[str, dict[str, str]]:
-        """載入系所資訊"""
-        dept_file = Path("data/departments_info.json")
-        if not dept_file.exists():
+        """載入系所資訊（檔案未變動時使用已載入的內容，返回的字典不可修改）"""
+        try:
+            return department_registry.departments()
+        except FileNotFoundError:
             return {}
 
-        with open(dept_file, "r", encoding="utf-8") as f:
-            return json.load(f)
-
     @staticmethod
     def _get_department_name(
         dept_code: str, departments_info: dict[str, dict[str, str]]
@@ -62,45 +63,51 @@ class RuleCRUD:
         Returns:
             list[RuleBasicInfo]: 規則列表，包含系所名稱和適用年份
         """
-        rules_dir = Path("data/rules")
-        if not rules_dir.exists():
-            return []
-
         departments_info = RuleCRUD._load_departments_info()
         rules_list: list[RuleBasicInfo] = []
 
-        # 遍歷所有系所目錄
-        for dept_dir in sorted(rules_dir.iterdir()):
-            if not dept_dir.is_dir():
-                continue
-
-            dept_code = dept_dir.name
+        for dept_code, admission_year, rule_type in get_storage().list_rules():
             dept_name, college = RuleCRUD._get_department_name(
                 dept_code, departments_info
             )
-
-            # 遍歷該系所的所有規則檔案
-            for rule_file in sorted(dept_dir.glob("*.json")):
-                try:
-                    rule_type, admission_year = RuleCRUD._parse_rule_file_name(
-                        rule_file.stem
-                    )
-
-                    rules_list.append(
-                        RuleBasicInfo(
-                            department_code=dept_code,
-                            department_name=dept_name,
-                            admission_year=admission_year,
-                            college=college,
-                            rule_type=rule_type,
-                        )
-                    )
-                except (ValueError, json.JSONDecodeError) as e:
-                    print(f"警告：跳過檔案 {rule_file.name}: {e}")
-                    continue
+            rules_list.append(
+                RuleBasicInfo(
+                    department_code=dept_code,
+                    department_name=dept_name,
+                    admission_year=admission_year,
+                    college=college,
+                    rule_type=RuleTypeEnum(rule_type),
+                )
+            )
 
         return rules_list
 
+    @staticmethod
+    def rules_version() -> Version:
+        """規則列表的版本（只隨規則的新增或刪除改變），不讀取規則內容"""
+        return get_storage().rules_version()
+
+    @staticmethod
+    def rule_version(
+        department_code: str, admission_year: int, rule_type: RuleTypeEnum
+    ) -> Version | None:
+        """規則的版本（不解析規則），規則不存在時返回 None"""
+        return get_storage().rule_version(
+            department_code, admission_year, rule_type.value
+        )
+
+    @staticmethod
+    def departments_version() -> Version:
+        """系所資訊的版本（departments_info.json 的修改時間與大小），不讀取檔案"""
+        stamp = department_registry.stamp()
+        if stamp is None:
+            return "missing", None
+        mtime_ns, size = stamp
+        return (
+            f"{mtime_ns:x}-{size:x}",
+            datetime.fromtimestamp(mtime_ns / 1e9, timezone.utc),
+        )
+
     @staticmethod
     def get_rule_detail(
         department_code: str, admission_year: int, rule_type: RuleTypeEnum
@@ -116,15 +123,12 @@ class RuleCRUD:
         Returns:
             RuleDetail: 規則詳細資訊，如果不存在則返回 None
         """
-        # 構建檔案路徑
-        filename = f"{admission_year}_{rule_type.value}.json"
-        rule_file = Path("data/rules") / department_code / filename
-
-        if not rule_file.exists():
-            return None
-
         try:
-            rule_content = RuleFactory.from_json_file(rule_file)
+            rule_content = get_storage().get_rule(
+                department_code, admission_year, rule_type.value
+            )
+            if rule_content is None:
+                return None
 
             # 載入系所資訊
             departments_info = RuleCRUD._load_departments_info()
@@ -143,7 +147,10 @@ class RuleCRUD:
             )
 
         except (json.JSONDecodeError, KeyError, ValueError) as e:
-            print(f"錯誤：無法解析規則檔案 {rule_file}: {e}")
+            print(
+                f"錯誤：無法解析規則 {department_code} {admission_year} "
+                f"{rule_type.value}: {e}"
+            )
             return None
 
     @staticmethod
@@ -153,24 +160,12 @@ class RuleCRUD:
         if request.department_code not in departments_info:
             raise ValueError(f"系所代碼 {request.department_code} 不存在")
 
-        # 確保目錄存在
-        dept_dir = Path("data/rules") / request.department_code
-        dept_dir.mkdir(parents=True, exist_ok=True)
-
-        # 構建檔案路徑
-        filename = f"{request.admission_year}_{request.rule_type.value}.json"
-        rule_file = dept_dir / filename
-
-        if rule_file.exists():
-            raise FileExistsError(
-                f"{request.department_code} {request.admission_year} 學年度 {request.rule_type.value} 規則已存在"
-            )
-
-        # 寫入檔案
-        with open(rule_file, "w", encoding="utf-8") as f:
-            json.dump(
-                request.rule_content.model_dump(), f, ensure_ascii=False, indent=4
-            )
+        get_storage().save_rule(
+            request.department_code,
+            request.admission_year,
+            request.rule_type.value,
+            request.rule_content,
+        )
 
         return RuleBasicInfo(
             department_code=request.department_code,
@@ -195,14 +190,12 @@ class RuleCRUD:
         Returns:
             bool: 是否成功刪除
         """
-        filename = f"{admission_year}_{rule_type.value}.json"
-        rule_file = Path("data/rules") / department_code / filename
-
-        if not rule_file.exists():
-            return False
-
-        rule_file.unlink()
-        return True
+        deleted = get_storage().delete_rule(
+            department_code, admission_year, rule_type.value
+        )
+        if deleted:
+            clear_review_cache()
+        return deleted
 
     @staticmethod
     def get_departments() -> dict[str, dict]:
@@ -213,3 +206,49 @@ class RuleCRUD:
             dict: 系所代碼到系所資訊的映射
         """
         return RuleCRUD._load_departments_info()
+
+    # ---- 非同步版本：在 I/O 執行器中執行對應的方法，供 async 路由使用 ----
+
+    @staticmethod
+    async def get_all_rules_async() -> list[RuleBasicInfo]:
+        return await run_io(RuleCRUD.get_all_rules)
+
+    @staticmethod
+    async def rules_version_async() -> Version:
+        return await run_io(RuleCRUD.rules_version)
+
+    @staticmethod
+    async def rule_version_async(
+        department_code: str, admission_year: int, rule_type: RuleTypeEnum
+    ) -> Version | None:
+        return await run_io(
+            RuleCRUD.rule_version, department_code, admission_year, rule_type
+        )
+
+    @staticmethod
+    async def departments_version_async() -> Version:
+        return await run_io(RuleCRUD.departments_version)
+
+    @staticmethod
+    async def get_rule_detail_async(
+        department_code: str, admission_year: int, rule_type: RuleTypeEnum
+    ) -> RuleDetail | None:
+        return await run_io(
+            RuleCRUD.get_rule_detail, department_code, admission_year, rule_type
+        )
+
+    @staticmethod
+    async def create_rule_async(request: CreateRuleRequest) -> RuleBasicInfo:
+        return await run_io(RuleCRUD.create_rule, request)
+
+    @staticmethod
+    async def delete_rule_async(
+        department_code: str, admission_year: int, rule_type: RuleTypeEnum
+    ) -> bool:
+        return await run_io(
+            RuleCRUD.delete_rule, department_code, admission_year, rule_type
+        )
+
+    @staticmethod
+    async def get_departments_async() -> dict[str, dict]:
+        return await run_io(RuleCRUD.get_departments)
@@ -1,54 +1,251 @@
+from collections.abc import AsyncIterator, Callable
 from pathlib import Path
 
 from rule_engine.models.student import Student
-from rule_engine.factory import StudentFactory
+from rule_engine.models.import_report import ExcelRowError
+from rule_engine.excel_stream import ExcelStudentStream
+from rule_engine.utils import UtilFunctions
+from api.crud.job_crud import JobManager
+from api.executors import run_io
+from api.storage import Storage, Version, get_storage
+from api.models.job_models import ImportJob, ImportedStudent
+from api.models.response_models import Page
+from api.models.student_models import StudentBasicInfo, StudentQuery
+
+# Excel 匯入工作（一次處理一個，避免同時寫入相同的學生檔案）
+import_jobs: JobManager[ImportJob] = JobManager(
+    ImportJob, max_workers=1, report_dir=Path("data/import_jobs")
+)
 
 
 class StudentCRUD:
     @staticmethod
     def get_all_students() -> list[Student]:
-        student_dir = Path("data/students")
-        students_info: list[Student] = []
+        return get_storage().list_students()
 
-        if not student_dir.exists():
-            return []
-        json_files = list(student_dir.glob("*.json"))
-        for student_file in sorted(json_files):
-            try:
-                student = StudentFactory.from_json_file(student_file)
-                students_info.append(student)
-            except Exception as e:
-                print(f"警告：跳過檔案 {student_file.name}: {e}")
-                continue
-        return students_info
+    @staticmethod
+    def query_students(query: StudentQuery | None = None) -> Page[StudentBasicInfo]:
+        """
+        取得學生的基本資訊（學號、姓名、主修科系），不解析修課列表
+
+        Args:
+            query: 篩選與分頁條件，預設為所有學生
+
+        Returns:
+            Page[StudentBasicInfo]: 依學號排序的學生與符合條件的總人數
+        """
+        return get_storage().query_students(query or StudentQuery())
 
     @staticmethod
     def get_student_by_id(student_id: str) -> Student:
-        student_dir = Path("data/students")
-        student_file = student_dir / f"{student_id}.json"
-        if not student_file.exists():
-            raise FileNotFoundError(f"找不到學生檔案: {student_file}")
-        return StudentFactory.from_json_file(student_file)
+        return get_storage().get_student(student_id)
+
+    @staticmethod
+    def get_cached_student(student_id: str) -> Student:
+        """
+        取得學生資料（唯讀），資料未變動時直接返回快取中已解析的物件
+
+        Raises:
+            FileNotFoundError: 學生不存在
+        """
+        return get_storage().get_cached_student(student_id)
+
+    @staticmethod
+    def import_students_from_excel(
+        excel_file_path: Path,
+        major: str,
+        storage: Storage | None = None,
+        on_progress: (
+            Callable[[ExcelStudentStream, ImportedStudent], None] | None
+        ) = None,
+        incremental: bool = False,
+    ) -> tuple[list[ImportedStudent], list[ExcelRowError]]:
+        """
+        串流匯入 Excel 中的學生，每讀完一位學生就存檔，不會同時保留所有學生的修課資料
+
+        增量匯入時每位學生以指紋與已儲存的資料比較，標記為新增、變動或未變動，
+        未變動的學生不會重新寫入；完整匯入時不讀取既有資料，每位學生都直接寫入並標記為 imported。
+
+        Args:
+            storage: 儲存層，預設為目前使用的儲存層
+            on_progress: 每處理完一位學生後以 (讀取中的串流, 該學生的匯入結果) 呼叫
+            incremental: 是否只寫入新增或變動的學生
+
+        Returns:
+            (每位匯入學生的結果, 不合法資料列的錯誤報告)
+        """
+        storage = storage or get_storage()
+        stream = ExcelStudentStream(excel_file_path, major)
+        imported: list[ImportedStudent] = []
+        try:
+            for student in stream:
+                if incremental:
+                    fingerprint = UtilFunctions.fingerprint_student(student)
+                    stored = storage.student_fingerprint(student.id)
+                    if stored is None:
+                        import_status = "added"
+                    elif stored == fingerprint:
+                        import_status = "unchanged"
+                    else:
+                        import_status = "changed"
+                else:
+                    fingerprint, import_status = None, "imported"
+
+                written = import_status != "unchanged"
+                if written:
+                    storage.save_student(student, fingerprint)
+
+                result = ImportedStudent(
+                    id=student.id,
+                    name=student.name,
+                    major=student.major,
+                    courses=len(student.courses),
+                    status=import_status,
+                    written=written,
+                )
+                imported.append(result)
+                if on_progress is not None:
+                    on_progress(stream, result)
+        finally:
+            # 中途失敗時已寫入的學生仍記錄在索引中
+            storage.flush()
+        return imported, stream.errors
+
+    @staticmethod
+    def submit_import_job(
+        excel_file_path: Path, filename: str, major: str, incremental: bool = False
+    ) -> ImportJob:
+        """
+        提交背景匯入工作並立即返回工作狀態
+
+        excel_file_path 交由工作處理，匯入結束後（不論成功與否）會被刪除。
+        """
+        job = ImportJob(
+            job_id=JobManager.new_job_id(),
+            filename=filename,
+            major=major,
+            incremental=incremental,
+        )
+        # 背景執行緒不依賴提交後的工作目錄
+        storage = get_storage().resolved()
+
+        def report_progress(stream: ExcelStudentStream, student: ImportedStudent):
+            def apply(job: ImportJob):
+                progress = job.progress
+                progress.rows_read = stream.rows_read
+                progress.total_rows = stream.total_rows
+                progress.students_written += student.written
+                progress.error_rows = len(stream.errors)
+                setattr(progress, student.status, getattr(progress, student.status) + 1)
+
+            import_jobs.update(job.job_id, apply)
+
+        def run(job: ImportJob):
+            try:
+                students, errors = StudentCRUD.import_students_from_excel(
+                    excel_file_path,
+                    major,
+                    storage,
+                    report_progress,
+                    incremental=incremental,
+                )
+            finally:
+                excel_file_path.unlink(missing_ok=True)
+
+            def finish(job: ImportJob):
+                job.students = students
+                job.errors = errors
+                job.progress.error_rows = len(errors)
+                job.message = f"成功從 Excel 檔案匯入 {len(students)} 位學生資料"
+                if incremental:
+                    job.message += (
+                        f"（新增 {job.progress.added}、變動 {job.progress.changed}、"
+                        f"未變動 {job.progress.unchanged}）"
+                    )
+                if errors:
+                    job.message += f"，{len(errors)} 列資料有誤已略過"
+
+            import_jobs.update(job.job_id, finish)
+
+        return import_jobs.submit(job, run)
 
     @staticmethod
-    def delete_all_students():
-        student_dir = Path("data/students")
-        if not student_dir.exists():
-            return 0
+    def get_import_job(job_id: str) -> ImportJob:
+        """
+        Raises:
+            FileNotFoundError: 找不到工作
+        """
+        return import_jobs.get(job_id)
 
-        json_files = list(student_dir.glob("*.json"))
-        deleted_count = 0
+    @staticmethod
+    def watch_import_job(job_id: str) -> AsyncIterator[ImportJob]:
+        """每當匯入工作狀態改變時產生一份複本，工作結束後停止"""
+        return import_jobs.watch(job_id)
 
-        for student_file in json_files:
-            student_file.unlink()
-            deleted_count += 1
+    @staticmethod
+    def student_version(student_id: str) -> Version | None:
+        """學生資料的版本（不讀取修課列表），學生不存在時返回 None"""
+        return get_storage().student_version(student_id)
 
-        return deleted_count
+    @staticmethod
+    def delete_all_students() -> int:
+        count = get_storage().delete_all_students()
+        StudentCRUD._clear_review_cache()
+        return count
 
     @staticmethod
     def delete_student_by_id(student_id: str):
-        student_dir = Path("data/students")
-        student_file = student_dir / f"{student_id}.json"
-        if not student_file.exists():
-            raise FileNotFoundError(f"找不到學生檔案: {student_file}")
-        student_file.unlink()
+        if not get_storage().delete_student(student_id):
+            raise FileNotFoundError(f"找不到學生: {student_id}")
+        StudentCRUD._clear_review_cache()
+
+    @staticmethod
+    def _clear_review_cache():
+        # review_crud 匯入了本模組，在此延後匯入
+        from api.crud.review_crud import clear_review_cache
+
+        clear_review_cache()
+
+    # ---- 非同步版本：在 I/O 執行器中執行對應的方法，供 async 路由使用 ----
+
+    @staticmethod
+    async def query_students_async(
+        query: StudentQuery | None = None,
+    ) -> Page[StudentBasicInfo]:
+        return await run_io(StudentCRUD.query_students, query)
+
+    @staticmethod
+    async def get_student_by_id_async(student_id: str) -> Student:
+        return await run_io(StudentCRUD.get_student_by_id, student_id)
+
+    @staticmethod
+    async def get_cached_student_async(student_id: str) -> Student:
+        return await run_io(StudentCRUD.get_cached_student, student_id)
+
+    @staticmethod
+    async def student_version_async(student_id: str) -> Version | None:
+        return await run_io(StudentCRUD.student_version, student_id)
+
+    @staticmethod
+    async def submit_import_job_async(
+        excel_file_path: Path, filename: str, major: str, incremental: bool = False
+    ) -> ImportJob:
+        return await run_io(
+            StudentCRUD.submit_import_job,
+            excel_file_path,
+            filename,
+            major,
+            incremental,
+        )
+
+    @staticmethod
+    async def get_import_job_async(job_id: str) -> ImportJob:
+        return await run_io(StudentCRUD.get_import_job, job_id)
+
+    @staticmethod
+    async def delete_all_students_async() -> int:
+        return await run_io(StudentCRUD.delete_all_students)
+
+    @staticmethod
+    async def delete_student_by_id_async(student_id: str):
+        await run_io(StudentCRUD.delete_student_by_id, student_id)
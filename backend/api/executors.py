@@ -0,0 +1,121 @@
+"""
+async 路由使用的執行器
+
+- I/O 執行器（執行緒）：學生、規則與審查結果的檔案或資料庫讀寫（見各 CRUD 的 *_async 方法）
+- 計算行程池：畢業審查與模擬等 CPU 密集的工作，在獨立的行程中執行，
+  不與事件迴圈和 I/O 執行器競爭 GIL，同時進行的審查再多，讀取資料的請求也不需排在審查之後
+- 批次審查行程池：大量學生的批次審查（見 ReviewCRUD.iter_review_students），所有批次共用
+
+行程池在第一次使用時以 spawn 建立（API 行程中有多個執行緒，不使用 fork），API 關閉時結束（見 api.main）；
+每個工作附上呼叫端目前的儲存層（見 call_with_storage），worker 行程不依賴建立當下的工作目錄，
+執行期間以 set_storage 替換的儲存層也會生效。在 worker 行程中執行的函式與參數必須可以 pickle。
+
+I/O 執行緒數由環境變數 GRADUATION_IO_WORKERS 設定；計算與批次審查的行程數分別由
+GRADUATION_CPU_WORKERS（預設為 CPU 核心數的一半）與 GRADUATION_BATCH_WORKERS（預設為 CPU 核心數）設定。
+"""
+
+import asyncio
+import functools
+import multiprocessing
+import os
+import threading
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from api.storage import Storage, get_storage, set_storage
+
+io_executor = ThreadPoolExecutor(
+    max_workers=int(os.environ.get("GRADUATION_IO_WORKERS", 32)),
+    thread_name_prefix="io",
+)
+
+
+class ProcessPool:
+    """第一次使用時以 spawn 建立的行程池，結束後下次使用時重新建立"""
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self._executor: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+
+    def get(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    def discard(self, executor: ProcessPoolExecutor | None = None, wait: bool = True):
+        """
+        結束行程池並取消尚未開始的工作
+
+        Args:
+            executor: 只在目前的行程池是這個行程池時才結束（例如 worker 行程異常終止後），
+                None 表示結束目前的行程池
+            wait: 是否等待 worker 行程結束（在事件迴圈中呼叫時應為 False）
+        """
+        with self._lock:
+            if self._executor is None or (
+                executor is not None and executor is not self._executor
+            ):
+                return
+            executor, self._executor = self._executor, None
+        executor.shutdown(wait=wait, cancel_futures=True)
+
+
+cpu_pool = ProcessPool(
+    int(os.environ.get("GRADUATION_CPU_WORKERS", max(1, (os.cpu_count() or 2) // 2)))
+)
+batch_pool = ProcessPool(
+    int(os.environ.get("GRADUATION_BATCH_WORKERS", os.cpu_count() or 1))
+)
+
+
+async def run_io[T](func: Callable[..., T], *args, **kwargs) -> T:
+    """在 I/O 執行器中執行 func 並等待結果"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        io_executor, functools.partial(func, *args, **kwargs)
+    )
+
+
+def call_with_storage[T](
+    storage: Storage, func: Callable[..., T], *args, **kwargs
+) -> T:
+    """
+    在 worker 行程中以呼叫端的儲存層執行 func
+
+    儲存層與目前的相同時沿用目前的儲存層（保留其狀態，例如 SQLite 的初始化紀錄）。
+    """
+    if get_storage() != storage:
+        set_storage(storage)
+    return func(*args, **kwargs)
+
+
+async def run_cpu[T](func: Callable[..., T], *args, **kwargs) -> T:
+    """
+    在計算行程池中以呼叫端目前的儲存層執行 func 並等待結果
+
+    func 與參數以 pickle 傳給 worker 行程，func 對參數的修改不會反映到呼叫端。
+    """
+    loop = asyncio.get_running_loop()
+    executor = cpu_pool.get()
+    try:
+        return await loop.run_in_executor(
+            executor,
+            functools.partial(
+                call_with_storage, get_storage().resolved(), func, *args, **kwargs
+            ),
+        )
+    except BrokenProcessPool:
+        # worker 行程異常終止，下次呼叫時重新建立行程池（不在事件迴圈中等待行程結束）
+        cpu_pool.discard(executor, wait=False)
+        raise
+
+
+def shutdown_process_pools():
+    """結束所有行程池（下次使用時重新建立）"""
+    cpu_pool.discard()
+    batch_pool.discard()
@@ -0,0 +1,85 @@
+"""
+HTTP 快取（ETag / Last-Modified）
+
+路由先以資料的版本（檔案修改時間或內容雜湊，見 Storage.student_version 等，不讀取或解析資料）
+建立 CacheValidator，請求帶有相符的 If-None-Match（或 If-Modified-Since）時直接返回 304。
+每個路由模組各自建立 HTTPCache，Cache-Control 可由環境變數
+GRADUATION_CACHE_CONTROL_<名稱>（例如 GRADUATION_CACHE_CONTROL_RULES=max-age=60）覆寫。
+"""
+
+import hashlib
+import os
+from datetime import timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from fastapi import Request, Response, status
+from api.storage import Version
+
+
+class CacheValidator:
+    """由一或多個資料版本組成的 ETag 與 Last-Modified"""
+
+    __slots__ = ("etag", "last_modified")
+
+    def __init__(self, *versions: Version):
+        tags = "\n".join(tag for tag, _ in versions)
+        self.etag = f'"{hashlib.sha1(tags.encode("utf-8")).hexdigest()[:20]}"'
+        # 任一資料無法取得修改時間時不提供 Last-Modified
+        modified = [last_modified for _, last_modified in versions]
+        self.last_modified = (
+            max(modified) if modified and None not in modified else None
+        )
+
+
+class HTTPCache:
+    """路由模組的 HTTP 快取設定"""
+
+    def __init__(self, name: str, cache_control: str = "no-cache"):
+        """
+        Args:
+            name: 設定名稱，對應環境變數 GRADUATION_CACHE_CONTROL_<名稱>
+            cache_control: 預設的 Cache-Control；no-cache 表示瀏覽器每次都以 ETag 重新驗證
+        """
+        self.name = name
+        self.cache_control = os.environ.get(
+            f"GRADUATION_CACHE_CONTROL_{name.upper()}", cache_control
+        )
+
+    def headers(self, validator: CacheValidator) -> dict[str, str]:
+        headers = {"ETag": validator.etag, "Cache-Control": self.cache_control}
+        if validator.last_modified is not None:
+            headers["Last-Modified"] = format_datetime(
+                validator.last_modified.astimezone(timezone.utc), usegmt=True
+            )
+        return headers
+
+    @staticmethod
+    def is_fresh(request: Request, validator: CacheValidator) -> bool:
+        """請求端快取的版本是否與目前相同（有 If-None-Match 時忽略 If-Modified-Since）"""
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+            return "*" in tags or validator.etag in tags
+
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since is None or validator.last_modified is None:
+            return False
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            return False
+        # HTTP 日期只精確到秒
+        return validator.last_modified.replace(microsecond=0) <= since
+
+    def not_modified(
+        self, request: Request, response: Response, validator: CacheValidator
+    ) -> Response | None:
+        """
+        在回應加上快取標頭；請求端的版本仍是最新時返回 304 回應（由路由直接返回），否則返回 None
+        """
+        headers = self.headers(validator)
+        if self.is_fresh(request, validator):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        response.headers.update(headers)
+        return None
@@ -1,8 +1,18 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from api.executors import shutdown_process_pools
 from api.routers import students_router, rules_router, review_router, results_router
 
-app = FastAPI(title="畢業審查系統 API")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # 結束審查與批次審查的 worker 行程
+    shutdown_process_pools()
+
+
+app = FastAPI(title="畢業審查系統 API", lifespan=lifespan)
 
 # 設定 CORS
 app.add_middleware(
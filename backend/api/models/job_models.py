@@ -0,0 +1,89 @@
+from datetime import datetime
+from typing import Literal
+from pydantic import BaseModel, Field
+from api.models.review_models import ReviewOptions
+from rule_engine.models.import_report import ExcelRowError
+
+JobStatus = Literal["pending", "running", "completed", "failed", "cancelled"]
+ImportStatus = Literal["added", "changed", "unchanged", "imported"]
+
+
+class JobInfo(BaseModel):
+    """背景工作的共同狀態"""
+
+    job_id: str
+    status: JobStatus = "pending"
+    created_at: datetime = Field(default_factory=datetime.now)
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+    message: str = ""
+    # 更新次數，每次狀態或進度改變時遞增，供 SSE 判斷是否需要推送
+    version: int = 0
+    # 已要求取消，執行中的工作會在下一個檢查點停止
+    cancel_requested: bool = False
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("completed", "failed", "cancelled")
+
+
+class ImportJobProgress(BaseModel):
+    """Excel 匯入進度"""
+
+    rows_read: int = 0
+    # 工作表記錄的資料列數（可能不準確或無法取得）
+    total_rows: int | None = None
+    students_written: int = 0
+    error_rows: int = 0
+    # 增量匯入時與既有學生資料比較的結果
+    added: int = 0
+    changed: int = 0
+    unchanged: int = 0
+    # 完整匯入時不比較，直接寫入的學生數
+    imported: int = 0
+
+
+class ImportedStudent(BaseModel):
+    """匯入報告中單一學生的結果"""
+
+    id: str
+    name: str
+    major: str
+    courses: int
+    # 增量匯入時 added：新學生；changed：資料與既有檔案不同；unchanged：與既有檔案相同
+    # 完整匯入時為 imported（不與既有檔案比較）
+    status: ImportStatus
+    # 是否寫入學生檔案（增量匯入時未變動的學生不會寫入）
+    written: bool = True
+
+
+class ImportJob(JobInfo):
+    """Excel 匯入工作，完成後 students 與 errors 為完整的匯入報告"""
+
+    filename: str
+    major: str
+    # 增量匯入：只寫入新增或變動的學生
+    incremental: bool = False
+    progress: ImportJobProgress = Field(default_factory=ImportJobProgress)
+    students: list[ImportedStudent] = []
+    errors: list[ExcelRowError] = []
+
+
+class ReviewJobProgress(BaseModel):
+    """批次審查進度"""
+
+    total: int = 0
+    completed: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    # 主修審查通過（符合畢業資格）的人數
+    eligible: int = 0
+
+
+class ReviewJob(JobInfo):
+    """批次審查工作，每位學生的結果（BatchReviewLine）依完成順序寫入結果檔案"""
+
+    options: ReviewOptions = ReviewOptions()
+    save_result: bool = True
+    include_details: bool = False
+    progress: ReviewJobProgress = Field(default_factory=ReviewJobProgress)
@@ -5,3 +5,13 @@ class APIResponse[DataT](BaseModel):
     success: bool
     message: str
     data: DataT
+
+
+class Page[ItemT](BaseModel):
+    """分頁查詢結果"""
+
+    items: list[ItemT]
+    # 符合條件的總筆數（不受 offset / limit 影響）
+    total: int
+    offset: int
+    limit: int | None
@@ -1,4 +1,9 @@
-from pydantic import BaseModel
+from datetime import datetime
+from typing import Literal
+from pydantic import BaseModel, Field
+from rule_engine.record import AllRecord, SetRecord
+
+ResultSortField = Literal["created_at", "student_id", "student_name", "file_name"]
 
 
 class ResultBasicInfo(BaseModel):
@@ -7,3 +12,39 @@ class ResultBasicInfo(BaseModel):
     file_name: str
     student_id: str
     student_name: str
+    created_at: datetime | None = None
+    # 所有審查項目皆通過；沒有任何審查項目時為 None
+    is_eligible: bool | None = None
+    # 有審查結果的項目，例如 ["main", "minor_B5"]
+    programs: list[str] = []
+
+    @classmethod
+    def from_result(
+        cls, file_name: str, data: dict, created_at: datetime | None = None
+    ) -> "ResultBasicInfo":
+        """由審查結果內容（學生基本資料與各項審查結果的字典或 ResultRecord）建立摘要"""
+        programs = {
+            key: value["is_valid"] if isinstance(value, dict) else value.is_valid
+            for key, value in data.items()
+            if (isinstance(value, dict) and "is_valid" in value)
+            or isinstance(value, (AllRecord, SetRecord))
+        }
+        return cls(
+            file_name=file_name,
+            student_id=data.get("id", ""),
+            student_name=data.get("name", ""),
+            created_at=created_at,
+            is_eligible=all(programs.values()) if programs else None,
+            programs=list(programs),
+        )
+
+
+class ResultQuery(BaseModel):
+    """審查結果列表的查詢條件"""
+
+    student_id: str | None = None
+    sort: ResultSortField = "created_at"
+    descending: bool = True
+    offset: int = Field(default=0, ge=0)
+    # None 表示不限筆數
+    limit: int | None = Field(default=None, ge=1)
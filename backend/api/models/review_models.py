@@ -1,9 +1,160 @@
-from pydantic import BaseModel
-from api.models.student_models import StudentBasicInfo
+from typing import Annotated, Literal
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+from api.models.student_models import StudentBasicInfo, StudentQuery
+from rule_engine.models.course import StudentCourse
 from rule_engine.models.result import Result
+from rule_engine.record import ResultRecord
+
+
+class RuleProfileInfo(BaseModel):
+    """單一規則節點的效能紀錄"""
+
+    path: str
+    rule_type: str
+    depth: int
+    wall_time_ms: float
+    candidates: int
+    match_calls: int
+    matches: int
 
 
 class ReviewResult(BaseModel):
     student_info: StudentBasicInfo
     is_eligible_for_graduation: bool
     evaluation_results: Result
+    # 查詢參數 profile=true 時才會附上
+    profile: list[RuleProfileInfo] | None = None
+
+
+class ReviewOptions(BaseModel):
+    """審查選項（主修、雙主修、輔系）"""
+
+    major: str | None = None
+    double_major: str | None = None
+    minor: list[str] | None = None
+
+
+class BatchReviewItem(BaseModel):
+    """批次審查中單一學生的結果（results 為輕量紀錄，需要時再以 to_model() 轉換）"""
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    student_id: str
+    success: bool
+    error: str | None = None
+    results: dict[str, ResultRecord | None] | None = None
+    # 審查成功時附上學生基本資料
+    student: StudentBasicInfo | None = None
+
+
+class BatchReviewRequest(BaseModel):
+    """
+    批次審查請求：以 student_ids 指定學生，或以 students 篩選（例如主修、入學年度），
+    兩者必須擇一
+    """
+
+    student_ids: Annotated[list[str], Field(min_length=1, max_length=20000)] | None = (
+        None
+    )
+    students: StudentQuery | None = None
+    options: ReviewOptions = ReviewOptions()
+    # 是否將每位學生的審查結果存檔
+    save_result: bool = True
+    # 是否在每一行附上主修的完整審查結果
+    include_details: bool = False
+
+    @model_validator(mode="after")
+    def validate_selection(self):
+        if (self.student_ids is None) == (self.students is None):
+            raise ValueError("student_ids 與 students 必須擇一指定")
+        return self
+
+
+class BatchReviewLine(BaseModel):
+    """批次審查串流（NDJSON）中的一行：單一學生的審查結果"""
+
+    # 學生在本批次中的位置（依 student_ids 或篩選結果的學號順序）
+    index: int
+    student_id: str
+    success: bool
+    error: str | None = None
+    student_info: StudentBasicInfo | None = None
+    is_eligible_for_graduation: bool | None = None
+    earned_credits: float | None = None
+    # 各項審查（主修、雙主修、輔系）是否通過，找不到規則者為 None
+    review_validity: dict[str, bool | None] | None = None
+    # include_details 為 True 時才附上主修審查的完整結果
+    evaluation_results: Result | None = None
+
+    @classmethod
+    def from_item(
+        cls, index: int, item: "BatchReviewItem", include_details: bool = False
+    ) -> "BatchReviewLine":
+        if not item.success:
+            return cls(
+                index=index,
+                student_id=item.student_id,
+                success=False,
+                error=item.error,
+            )
+        main_result = item.results["main"]
+        return cls(
+            index=index,
+            student_id=item.student_id,
+            success=True,
+            student_info=item.student,
+            is_eligible_for_graduation=main_result.is_valid,
+            earned_credits=main_result.earned_credits,
+            review_validity={
+                key: record.is_valid if record else None
+                for key, record in item.results.items()
+            },
+            evaluation_results=main_result.to_model() if include_details else None,
+        )
+
+
+class SimulatedCourse(BaseModel):
+    """模擬審查中假設修習的課程，未指定學年學期時視為下一個學期修課"""
+
+    course_name: str
+    course_codes: list[str]
+    credit: float
+    course_type: int = 2
+    tag: list[str] = []
+    grade: int = 60
+    category: str = " "
+    year_taken: int | None = None
+    semester_taken: Literal[0, 1, 2] | None = None
+
+    def to_student_course(self, year: int, semester: int) -> StudentCourse:
+        data = self.model_dump()
+        if data["year_taken"] is None or data["semester_taken"] is None:
+            data["year_taken"], data["semester_taken"] = year, semester
+        return StudentCourse(**data)
+
+
+class SimulationVariant(BaseModel):
+    """一組假設修習的課程"""
+
+    name: str | None = None
+    courses: list[SimulatedCourse] = []
+
+
+class SimulationRequest(ReviewOptions):
+    variants: Annotated[list[SimulationVariant], Field(min_length=1, max_length=100)]
+    include_details: bool = False
+
+
+class SimulationVariantResult(BaseModel):
+    name: str
+    is_eligible_for_graduation: bool
+    earned_credits: float
+    # 各項審查（主修、雙主修、輔系）是否通過，找不到規則者為 None
+    review_validity: dict[str, bool | None]
+    # include_details 為 True 時才附上主修審查的完整結果
+    evaluation_results: Result | None = None
+
+
+class SimulationResult(BaseModel):
+    student_info: StudentBasicInfo
+    variants: list[SimulationVariantResult]
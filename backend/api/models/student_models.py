@@ -1,7 +1,39 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+
+
+def admission_year_of(student_id: str) -> int | None:
+    """由學號推算入學學年度（與 Student.admission_year 相同），學號格式不符時返回 None"""
+    year = student_id[3:5]
+    return int(year) + 100 if year.isdigit() else None
 
 
 class StudentBasicInfo(BaseModel):
     id: str
     name: str
     major: str
+
+
+class StudentQuery(BaseModel):
+    """學生列表的查詢條件，結果依學號排序"""
+
+    # 學號或姓名包含的文字（不分大小寫）
+    search: str | None = None
+    major: str | None = None
+    # 入學學年度（由學號推算，例如 112）
+    admission_year: int | None = None
+    offset: int = Field(default=0, ge=0)
+    # None 表示不限筆數
+    limit: int | None = Field(default=None, ge=1)
+
+    def matches(self, student_id: str, name: str, major: str) -> bool:
+        if self.major is not None and major != self.major:
+            return False
+        if (
+            self.admission_year is not None
+            and admission_year_of(student_id) != self.admission_year
+        ):
+            return False
+        if self.search:
+            search = self.search.casefold()
+            return search in student_id.casefold() or search in name.casefold()
+        return True
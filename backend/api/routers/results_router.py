@@ -1,25 +1,42 @@
-from fastapi import APIRouter, HTTPException, status
+from typing import Literal
+import orjson
+from fastapi import APIRouter, HTTPException, Query, status
 
 from api.crud.result_crud import ResultCRUD
-from api.models.result_models import ResultBasicInfo
-from api.models.response_models import APIResponse
+from api.models.result_models import ResultBasicInfo, ResultQuery, ResultSortField
+from api.models.response_models import APIResponse, Page
+from api.serialization import api_response
 
 router = APIRouter(prefix="/results", tags=["results"])
 
 
-@router.get("/", response_model=APIResponse[list[ResultBasicInfo]])
-def get_all_results():
+@router.get("/", response_model=APIResponse[Page[ResultBasicInfo]])
+async def get_all_results(
+    offset: int = Query(0, ge=0, description="略過的筆數"),
+    limit: int = Query(50, ge=1, le=1000, description="每頁筆數"),
+    student_id: str | None = Query(None, description="只列出此學號的結果"),
+    sort: ResultSortField = Query("created_at", description="排序欄位"),
+    order: Literal["asc", "desc"] = Query("desc", description="排序方向"),
+):
     """
-    取得所有審查結果的基本資訊
+    分頁取得審查結果的基本資訊
 
-    返回所有已保存的審查結果列表，按建立時間倒序排列（最新的在前）
+    只讀取結果索引，不需要解析每個結果檔案；預設按建立時間倒序排列（最新的在前）
     """
     try:
-        results = ResultCRUD.get_all_results()
+        page = await ResultCRUD.get_all_results_async(
+            ResultQuery(
+                student_id=student_id,
+                sort=sort,
+                descending=order == "desc",
+                offset=offset,
+                limit=limit,
+            )
+        )
         return APIResponse(
             success=True,
-            message=f"成功取得 {len(results)} 筆審查結果",
-            data=results,
+            message=f"成功取得 {len(page.items)} 筆審查結果（共 {page.total} 筆）",
+            data=page,
         )
     except Exception as e:
         raise HTTPException(
@@ -29,7 +46,7 @@ def get_all_results():
 
 
 @router.get("/file/{filename}", response_model=APIResponse[dict])
-def get_result_by_filename(filename: str):
+async def get_result_by_filename(filename: str):
     """
     根據檔名取得審查結果的詳細資訊
 
@@ -37,12 +54,9 @@ def get_result_by_filename(filename: str):
     - filename: 結果檔案名稱，例如：AN4116089_20_Oct_2025_14_30.json
     """
     try:
-        result = ResultCRUD.get_result_by_filename(filename)
-        return APIResponse(
-            success=True,
-            message=f"成功取得審查結果 {filename}",
-            data=result,
-        )
+        # 直接輸出儲存的 JSON，不解析也不經過 response_model
+        result = orjson.Fragment(await ResultCRUD.get_result_json_async(filename))
+        return api_response(f"成功取得審查結果 {filename}", result)
     except FileNotFoundError:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -56,7 +70,7 @@ def get_result_by_filename(filename: str):
 
 
 @router.delete("/file/{filename}", response_model=APIResponse[None])
-def delete_result_by_filename(filename: str):
+async def delete_result_by_filename(filename: str):
     """
     根據檔名刪除審查結果
 
@@ -64,7 +78,7 @@ def delete_result_by_filename(filename: str):
     - filename: 結果檔案名稱
     """
     try:
-        ResultCRUD.delete_result_by_filename(filename)
+        await ResultCRUD.delete_result_by_filename_async(filename)
         return APIResponse(
             success=True,
             message=f"成功刪除審查結果 {filename}",
@@ -83,14 +97,14 @@ def delete_result_by_filename(filename: str):
 
 
 @router.delete("/", response_model=APIResponse[None])
-def delete_all_results():
+async def delete_all_results():
     """
     刪除所有審查結果
 
     ⚠️ 警告：此操作將刪除所有已保存的審查記錄，無法復原！
     """
     try:
-        deleted_count = ResultCRUD.delete_all_results()
+        deleted_count = await ResultCRUD.delete_all_results_async()
         return APIResponse(
             success=True,
             message=f"成功刪除 {deleted_count} 筆審查記錄",
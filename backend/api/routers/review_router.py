@@ -1,16 +1,195 @@
+import threading
+from collections.abc import AsyncIterator
 from fastapi import APIRouter, HTTPException, status, Query
+from fastapi.responses import FileResponse, StreamingResponse
 
+from api.models.job_models import ReviewJob
 from api.models.response_models import APIResponse
-from api.models.review_models import ReviewResult
-from api.models.student_models import StudentBasicInfo
+from api.serialization import api_response
+from api.models.review_models import (
+    BatchReviewLine,
+    BatchReviewRequest,
+    ReviewResult,
+    RuleProfileInfo,
+    SimulationRequest,
+    SimulationResult,
+)
 from api.crud.student_crud import StudentCRUD
-from api.crud.review_crud import ReviewCRUD
+from api.crud.review_crud import ReviewCRUD, SimulationInputError
+from api.executors import io_executor, run_io
+from rule_engine.profiler import EvaluationProfiler
 
 router = APIRouter(prefix="/review", tags=["review"])
 
 
+@router.post(
+    "/batch",
+    response_class=StreamingResponse,
+    responses={
+        200: {
+            "content": {"application/x-ndjson": {}},
+            "description": "每行一個 BatchReviewLine（JSON），依完成順序輸出",
+        }
+    },
+)
+async def review_students_batch(request: BatchReviewRequest):
+    """
+    批次審查多位學生，以 NDJSON 串流輸出結果（每完成一位學生就輸出一行）
+
+    - **request.student_ids**: 要審查的學號列表
+    - **request.students**: 或以篩選條件（search、major、admission_year、offset、limit）選擇學生，
+      與 GET /students/ 的查詢參數相同
+    - **request.options**: 主修、雙主修、輔系選項，套用到每位學生
+    - **request.save_result**: 是否保存每位學生的審查結果
+    - **request.include_details**: 是否在每一行附上主修的完整審查結果
+
+    每一行的 index 為學生在 student_ids（或篩選結果）中的位置；行的順序為完成順序。
+    單一學生審查失敗不會中斷批次，該行 success 為 false 並附上 error。
+    回應標頭 X-Batch-Size 為本批次的學生人數；連線中斷時尚未開始的審查會被取消。
+    """
+    student_ids = await _batch_student_ids(request)
+    items = ReviewCRUD.iter_review_students(
+        student_ids, request.options, save_result=request.save_result
+    )
+    # 取得下一位學生與結束批次不可同時進行（產生器不能在執行中關閉）
+    items_lock = threading.Lock()
+
+    def next_item():
+        with items_lock:
+            return next(items, None)
+
+    def close_items():
+        with items_lock:
+            items.close()
+
+    async def stream_lines() -> AsyncIterator[str]:
+        try:
+            while (pair := await run_io(next_item)) is not None:
+                index, item = pair
+                line = BatchReviewLine.from_item(index, item, request.include_details)
+                yield line.model_dump_json() + "\n"
+        finally:
+            # 連線中斷時明確結束批次以取消尚未開始的審查，不等到產生器被回收；
+            # 串流已被取消，不在這裡等待進行中的審查
+            io_executor.submit(close_items)
+
+    return StreamingResponse(
+        stream_lines(),
+        media_type="application/x-ndjson",
+        headers={"X-Batch-Size": str(len(student_ids))},
+    )
+
+
+@router.post(
+    "/jobs",
+    response_model=APIResponse[ReviewJob],
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def submit_review_job(request: BatchReviewRequest):
+    """
+    建立背景批次審查工作並立即返回工作狀態（請求內容與 POST /review/batch 相同）
+
+    工作依提交順序排隊執行，不受連線中斷影響；save_result 為 true 時每位學生的審查結果
+    會保存到審查結果中（GET /results/）。
+
+    - 進度：GET /review/jobs/{job_id} 輪詢，或 GET /review/jobs/{job_id}/events（Server-Sent Events）
+    - 取消：POST /review/jobs/{job_id}/cancel
+    - 結果：工作結束後以 GET /review/jobs/{job_id}/results 下載（NDJSON，每行一個 BatchReviewLine）
+    """
+    student_ids = await _batch_student_ids(request)
+    try:
+        job = await ReviewCRUD.submit_review_job_async(
+            student_ids,
+            request.options,
+            save_result=request.save_result,
+            include_details=request.include_details,
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"建立批次審查工作失敗: {str(e)}",
+        )
+    return APIResponse(
+        success=True,
+        message=f"已建立批次審查工作 {job.job_id}，共 {len(student_ids)} 位學生",
+        data=job,
+    )
+
+
+@router.get("/jobs/{job_id}", response_model=APIResponse[ReviewJob])
+async def get_review_job(job_id: str):
+    """取得批次審查工作的狀態與進度"""
+    try:
+        job = await ReviewCRUD.get_review_job_async(job_id)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    return APIResponse(success=True, message=job.message, data=job)
+
+
+@router.get("/jobs/{job_id}/events")
+async def stream_review_job(job_id: str):
+    """
+    以 Server-Sent Events 推送批次審查工作的進度
+
+    每次進度改變時送出 progress 事件，工作結束（完成、失敗或取消）時送出 done 事件後關閉連線；
+    資料皆為工作狀態。
+    """
+    try:
+        await ReviewCRUD.get_review_job_async(job_id)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+
+    async def events():
+        async for job in ReviewCRUD.watch_review_job(job_id):
+            event = "done" if job.finished else "progress"
+            yield f"event: {event}\ndata: {job.model_dump_json()}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+@router.post("/jobs/{job_id}/cancel", response_model=APIResponse[ReviewJob])
+async def cancel_review_job(job_id: str):
+    """
+    取消批次審查工作
+
+    排隊中的工作不會執行；執行中的工作在下一位學生完成後停止，已完成的結果仍可下載。
+    工作已結束時不受影響。
+    """
+    try:
+        job = await ReviewCRUD.cancel_review_job_async(job_id)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    message = f"工作 {job_id} 已結束" if job.finished else f"已要求取消工作 {job_id}"
+    return APIResponse(success=True, message=message, data=job)
+
+
+@router.get(
+    "/jobs/{job_id}/results",
+    response_class=FileResponse,
+    responses={
+        200: {
+            "content": {"application/x-ndjson": {}},
+            "description": "每行一個 BatchReviewLine（JSON），依完成順序排列",
+        }
+    },
+)
+async def download_review_job_results(job_id: str):
+    """下載已結束的批次審查工作的結果（NDJSON）"""
+    try:
+        path = await ReviewCRUD.get_review_job_results_async(job_id)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    return FileResponse(
+        path,
+        media_type="application/x-ndjson",
+        filename=f"review_job_{job_id}.ndjson",
+    )
+
+
 @router.post("/{student_id}", response_model=APIResponse[ReviewResult])
-def review_student_graduation(
+async def review_student_graduation(
     student_id: str,
     major: str | None = Query(
         None, description="主修科系代號（若不指定則使用學生本身科系）"
@@ -19,6 +198,9 @@ def review_student_graduation(
     minor: list[str] | None = Query(
         None, description="輔系科系代號列表（不分系學生必須至少提供一個）"
     ),
+    profile: bool = Query(
+        False, description="是否附上每個規則節點的效能分析（會略過結果快取）"
+    ),
 ):
     """
     對指定學生進行畢業審查計算
@@ -27,6 +209,7 @@ def review_student_graduation(
     - **major**: (查詢參數) 主修科系代號，若不指定則使用學生本身科系
     - **double_major**: (查詢參數) 雙主修科系代號，可選
     - **minor**: (查詢參數) 輔系科系代號列表，可選，可指定多個。**不分系(AN)學生必須至少提供一個輔系**
+    - **profile**: (查詢參數) 是否附上每個規則節點的耗時、候選課程數、比對與符合次數
 
     範例：
     - 一般學生: POST /review/D10944101
@@ -35,21 +218,22 @@ def review_student_graduation(
     - 含雙主修和輔系: POST /review/D10944101?double_major=EE&minor=CS&minor=MATH
     """
     try:
-        # 1. 取得學生資料
-        student = StudentCRUD.get_student_by_id(student_id)
-        if not student:
+        # 1. 確認學生存在（只取得版本，學生資料在審查的 worker 行程中讀取）
+        if await StudentCRUD.student_version_async(student_id) is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"找不到學生 {student_id}",
             )
 
         # 2. 執行審查
+        profiler = EvaluationProfiler() if profile else None
         try:
-            review_results = ReviewCRUD.review_student(
-                student=student,
+            student_basic_info, review_results = await ReviewCRUD.review_student_async(
+                student_id=student_id,
                 major_department=major,
                 double_major_department=double_major,
                 minor_departments=minor,
+                profiler=profiler,
             )
         except ValueError as e:
             raise HTTPException(
@@ -71,23 +255,20 @@ def review_student_graduation(
                 detail="主修審查失敗",
             )
 
-        # 建立學生基本資訊
-        student_basic_info = StudentBasicInfo(
-            id=student.id, name=student.name, major=student.major
-        )
+        # 建立回應 - 只返回主修審查結果（欄位與 ReviewResult 相同）
+        # 審查結果直接使用存檔時已序列化的 JSON，不轉換成模型
+        review_result = {
+            "student_info": student_basic_info,
+            "is_eligible_for_graduation": bool(main_result.is_valid),
+            "evaluation_results": main_result,
+            "profile": (
+                [RuleProfileInfo(**entry) for entry in profiler.to_list()]
+                if profiler
+                else None
+            ),
+        }
 
-        # 建立回應 - 只返回主修審查結果
-        review_result = ReviewResult(
-            student_info=student_basic_info,
-            is_eligible_for_graduation=main_result.is_valid,
-            evaluation_results=main_result,
-        )
-
-        return APIResponse(
-            success=True,
-            message=f"學生 {student_id} 畢業審查計算完成",
-            data=review_result,
-        )
+        return api_response(f"學生 {student_id} 畢業審查計算完成", review_result)
 
     except HTTPException:
         raise
@@ -101,3 +282,99 @@ def review_student_graduation(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"審查計算時發生錯誤: {str(e)}",
         )
+
+
+@router.post("/{student_id}/simulate", response_model=APIResponse[SimulationResult])
+async def simulate_student_graduation(student_id: str, request: SimulationRequest):
+    """
+    模擬審查：假設學生另外修了某些課程，是否能夠畢業
+
+    - **student_id**: 學生的學號（路徑參數）
+    - **request.variants**: 多組假設修習的課程，每組分別評估（例如每門候選課程一組）
+    - **request.major / double_major / minor**: 與 POST /review/{student_id} 的查詢參數相同
+    - **request.include_details**: 是否附上每組的主修完整審查結果
+
+    假設的課程只疊加在學生修課列表的檢視上，不會修改或儲存學生資料，也不會寫入審查結果檔案。
+    未指定學年學期的課程視為在學生最後一次修課的下一個學期修習，成績預設為 60。
+    """
+    try:
+        if await StudentCRUD.student_version_async(student_id) is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"找不到學生 {student_id}",
+            )
+
+        try:
+            student_info, outcomes = await ReviewCRUD.simulate_student_async(
+                student_id,
+                [variant.courses for variant in request.variants],
+                major_department=request.major,
+                double_major_department=request.double_major,
+                minor_departments=request.minor,
+            )
+        except SimulationInputError as e:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"假設課程資料錯誤: {str(e)}",
+            )
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e),
+            )
+        except FileNotFoundError as e:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=str(e),
+            )
+
+        variant_results = []
+        for number, (variant, outcome) in enumerate(
+            zip(request.variants, outcomes), start=1
+        ):
+            main_result = outcome["main"]
+            # 欄位與 SimulationVariantResult 相同，審查結果直接以紀錄序列化
+            variant_results.append(
+                {
+                    "name": variant.name or f"方案 {number}",
+                    "is_eligible_for_graduation": bool(main_result.is_valid),
+                    "earned_credits": float(main_result.earned_credits),
+                    "review_validity": {
+                        key: bool(record.is_valid) if record else None
+                        for key, record in outcome.items()
+                    },
+                    "evaluation_results": (
+                        main_result if request.include_details else None
+                    ),
+                }
+            )
+
+        return api_response(
+            f"學生 {student_id} 模擬審查完成，共 {len(variant_results)} 組",
+            {
+                "student_info": student_info,
+                "variants": variant_results,
+            },
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"模擬審查時發生錯誤: {str(e)}",
+        )
+
+
+async def _batch_student_ids(request: BatchReviewRequest) -> list[str]:
+    """批次審查的學號：request.student_ids，或依 request.students 篩選的結果"""
+    if request.student_ids is not None:
+        return request.student_ids
+    try:
+        page = await StudentCRUD.query_students_async(request.students)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"篩選學生時發生錯誤: {str(e)}",
+        )
+    return [student.id for student in page.items]
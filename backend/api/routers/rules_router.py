@@ -1,14 +1,19 @@
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Request, Response, status
 
 from api.crud.rule_crud import RuleCRUD
+from api.http_cache import CacheValidator, HTTPCache
 from api.models.response_models import APIResponse
 from api.models.rule_models import *
 
 router = APIRouter(prefix="/rules", tags=["rules"])
 
+# 規則與系所資訊很少變動，回應帶有 ETag，未變動時返回 304（Cache-Control 見 api.http_cache）
+http_cache = HTTPCache("rules")
+departments_cache = HTTPCache("departments")
+
 
 @router.get("/", response_model=APIResponse[list[RuleBasicInfo]])
-def get_all_rules():
+async def get_all_rules(request: Request, response: Response):
     """
     取得所有規則的基本資訊
 
@@ -18,9 +23,21 @@ def get_all_rules():
     - 適用入學年度
     - 所屬學院
     - 是否為輔系規則
+
+    支援 If-None-Match / If-Modified-Since，規則未新增或刪除時返回 304
     """
     try:
-        rules_list = RuleCRUD.get_all_rules()
+        # 列表包含系所名稱，系所資訊改變時也視為改變
+        validator = CacheValidator(
+            await RuleCRUD.rules_version_async(),
+            await RuleCRUD.departments_version_async(),
+        )
+        if (
+            cached := http_cache.not_modified(request, response, validator)
+        ) is not None:
+            return cached
+
+        rules_list = await RuleCRUD.get_all_rules_async()
         return APIResponse(
             success=True,
             message=f"成功取得 {len(rules_list)} 條規則",
@@ -37,7 +54,13 @@ def get_all_rules():
     "/{department_code}/{admission_year}/{rule_type}",
     response_model=APIResponse[RuleDetail],
 )
-def get_rule_detail(department_code: str, admission_year: int, rule_type: RuleTypeEnum):
+async def get_rule_detail(
+    department_code: str,
+    admission_year: int,
+    rule_type: RuleTypeEnum,
+    request: Request,
+    response: Response,
+):
     """
     取得特定規則的詳細資訊
 
@@ -48,9 +71,23 @@ def get_rule_detail(department_code: str, admission_year: int, rule_type: RuleTy
 
     Returns:
     - 規則的完整內容，包含所有規則條目
+
+    支援 If-None-Match / If-Modified-Since，規則未變動時返回 304，不讀取規則
     """
     try:
-        rule_detail = RuleCRUD.get_rule_detail(
+        version = await RuleCRUD.rule_version_async(
+            department_code, admission_year, rule_type
+        )
+        if version is not None:
+            validator = CacheValidator(
+                version, await RuleCRUD.departments_version_async()
+            )
+            if (
+                cached := http_cache.not_modified(request, response, validator)
+            ) is not None:
+                return cached
+
+        rule_detail = await RuleCRUD.get_rule_detail_async(
             department_code, admission_year, rule_type
         )
 
@@ -75,12 +112,12 @@ def get_rule_detail(department_code: str, admission_year: int, rule_type: RuleTy
 
 
 @router.post("/", response_model=APIResponse[RuleBasicInfo])
-def create_rule(request: CreateRuleRequest):
+async def create_rule(request: CreateRuleRequest):
     """
     新增畢業規則
     """
     try:
-        rule_detail = RuleCRUD.create_rule(request)
+        rule_detail = await RuleCRUD.create_rule_async(request)
 
         return APIResponse(
             success=True,
@@ -107,7 +144,9 @@ def create_rule(request: CreateRuleRequest):
 @router.delete(
     "/{department_code}/{admission_year}/{rule_type}", response_model=APIResponse[None]
 )
-def delete_rule(department_code: str, admission_year: int, rule_type: RuleTypeEnum):
+async def delete_rule(
+    department_code: str, admission_year: int, rule_type: RuleTypeEnum
+):
     """
     刪除規則
 
@@ -117,7 +156,9 @@ def delete_rule(department_code: str, admission_year: int, rule_type: RuleTypeEn
     - is_minor: 是否為輔系規則（選填）
     """
     try:
-        success = RuleCRUD.delete_rule(department_code, admission_year, rule_type)
+        success = await RuleCRUD.delete_rule_async(
+            department_code, admission_year, rule_type
+        )
 
         if not success:
             raise HTTPException(
@@ -140,15 +181,23 @@ def delete_rule(department_code: str, admission_year: int, rule_type: RuleTypeEn
 
 
 @router.get("/departments/all", response_model=APIResponse[dict])
-def get_all_departments():
+async def get_all_departments(request: Request, response: Response):
     """
     取得所有系所資訊
 
     Returns:
     - 所有系所的代碼、名稱、學院資訊
+
+    支援 If-None-Match / If-Modified-Since，departments_info.json 未變動時返回 304
     """
     try:
-        departments = RuleCRUD.get_departments()
+        validator = CacheValidator(await RuleCRUD.departments_version_async())
+        if (
+            cached := departments_cache.not_modified(request, response, validator)
+        ) is not None:
+            return cached
+
+        departments = await RuleCRUD.get_departments_async()
         return APIResponse(
             success=True,
             message=f"成功取得 {len(departments)} 個系所資訊",
@@ -1,26 +1,61 @@
-from fastapi import APIRouter, HTTPException, status, UploadFile, File, Form
+import uuid
+import aiofiles
+from fastapi import (
+    APIRouter,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+    UploadFile,
+    File,
+    Form,
+)
+from fastapi.responses import StreamingResponse
 from pathlib import Path
 
 from rule_engine.models.student import Student
-from rule_engine.factory import StudentFactory
 from api.crud.student_crud import StudentCRUD
-from api.models.student_models import StudentBasicInfo
-from api.models.response_models import APIResponse
+from api.http_cache import CacheValidator, HTTPCache
+from api.models.job_models import ImportJob
+from api.models.student_models import StudentBasicInfo, StudentQuery
+from api.models.response_models import APIResponse, Page
 
 router = APIRouter(prefix="/students", tags=["students"])
 
+# 學生詳細資料帶有 ETag，未變動時返回 304（Cache-Control 見 api.http_cache）
+http_cache = HTTPCache("students")
 
-@router.get("/", response_model=APIResponse[list[StudentBasicInfo]])
-def get_all_students():
+
+@router.get("/", response_model=APIResponse[Page[StudentBasicInfo]])
+async def get_all_students(
+    offset: int = Query(0, ge=0, description="略過的人數"),
+    limit: int = Query(50, ge=1, le=1000, description="每頁人數"),
+    search: str | None = Query(None, description="學號或姓名包含的文字（不分大小寫）"),
+    major: str | None = Query(None, description="只列出此主修科系的學生"),
+    admission_year: int | None = Query(
+        None, description="只列出此入學學年度的學生（例如 112）"
+    ),
+):
     """
-    取得所有學生的基本資訊（學號、姓名、主修科系）
+    分頁取得學生的基本資訊（學號、姓名、主修科系），依學號排序
+
+    只讀取學生索引，不解析修課列表
     """
     try:
-        student_list = StudentCRUD.get_all_students()
+        page = await StudentCRUD.query_students_async(
+            StudentQuery(
+                search=search,
+                major=major,
+                admission_year=admission_year,
+                offset=offset,
+                limit=limit,
+            )
+        )
         return APIResponse(
             success=True,
-            message=f"成功取得 {len(student_list)} 位學生的基本資訊",
-            data=student_list,
+            message=f"成功取得 {len(page.items)} 位學生的基本資訊（共 {page.total} 位）",
+            data=page,
         )
     except Exception as e:
         raise HTTPException(
@@ -30,12 +65,22 @@ def get_all_students():
 
 
 @router.get("/{student_id}", response_model=APIResponse[Student])
-def get_student_detail(student_id: str):
+async def get_student_detail(student_id: str, request: Request, response: Response):
     """
     根據學號取得學生的詳細資訊（包含修課列表）
+
+    支援 If-None-Match / If-Modified-Since，學生資料未變動時返回 304，不讀取修課列表
     """
     try:
-        student_info = StudentCRUD.get_student_by_id(student_id)
+        version = await StudentCRUD.student_version_async(student_id)
+        if version is not None:
+            validator = CacheValidator(version)
+            if (
+                cached := http_cache.not_modified(request, response, validator)
+            ) is not None:
+                return cached
+
+        student_info = await StudentCRUD.get_student_by_id_async(student_id)
         return APIResponse(
             success=True,
             message=f"成功取得學生 {student_id} 的詳細資訊",
@@ -48,20 +93,32 @@ def get_student_detail(student_id: str):
         )
 
 
-@router.post("/upload-excel", response_model=APIResponse[list[StudentBasicInfo]])
+@router.post(
+    "/upload-excel",
+    response_model=APIResponse[ImportJob],
+    status_code=status.HTTP_202_ACCEPTED,
+)
 async def upload_excel_students(
     file: UploadFile = File(...),
     major: str = Form(default="", description="主修科系代號"),
+    incremental: bool = Form(
+        default=False, description="增量匯入：只寫入新增或資料有變動的學生"
+    ),
 ):
     """
-    上傳 Excel 檔案並批量新增學生資料
+    上傳 Excel 檔案，建立背景匯入工作並立即返回工作狀態
 
     Parameters:
     - file: Excel 檔案 (.xlsx 格式)
     - major: 預設科系（選填，如果 Excel 中沒有科系資訊則使用此值）
+    - incremental: 是否只寫入新增或變動的學生（匯入報告中每位學生會標記新增、變動或未變動；
+      完整匯入時不與既有資料比較，標記為 imported）
 
     Excel 檔案需要包含以下欄位：
     - 學號, 姓名, 課程名稱, 課程碼, 學分數, 成績, 承抵課程別, 選必修(0,1必修，2選修), 學年, 學期
+
+    匯入進度可透過 GET /students/import-jobs/{job_id} 輪詢，
+    或以 GET /students/import-jobs/{job_id}/events（Server-Sent Events）接收推送。
     """
     file_size = 0
     temp_file: Path | None = None
@@ -77,41 +134,33 @@ async def upload_excel_students(
                 status_code=status.HTTP_400_BAD_REQUEST, detail="只支援 .xlsx 格式檔案"
             )
 
-        # 檢查檔案大小（限制為 10MB）
-
-        try:
-            # 建立臨時檔案
-            temp_file = Path(f"temp_{file.filename}")
-
-            # 寫入檔案內容並計算大小
-            with open(temp_file, "wb") as buffer:
-                while chunk := await file.read(1024):  # 讀取 1KB 塊
-                    file_size += len(chunk)
-                    if file_size > 10 * 1024 * 1024:  # 10MB 限制
-                        raise HTTPException(
-                            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-                            detail="檔案大小超過 10MB 限制",
-                        )
-                    buffer.write(chunk)
-
-            # 使用 StudentFactory 處理 Excel 檔案
-            output_path = Path("data/students")
-            students = StudentFactory.load_students_from_excel(
-                excel_file_path=temp_file, output_path=output_path, major=major
-            )
-
-            return APIResponse(
-                success=True,
-                message=f"成功從 Excel 檔案匯入 {len(students)} 位學生資料",
-                data=list(students.values()),
-            )
-
-        finally:
-            # 清理臨時檔案
-            if temp_file and temp_file.exists():
-                temp_file.unlink()
+        # 建立臨時檔案（交由匯入工作處理，結束後由工作刪除；
+        # 使用絕對路徑，背景工作執行時不受工作目錄改變影響）
+        temp_file = Path(f"temp_{uuid.uuid4().hex}.xlsx").absolute()
+
+        # 寫入檔案內容並計算大小（限制為 10MB）
+        async with aiofiles.open(temp_file, "wb") as buffer:
+            while chunk := await file.read(64 * 1024):  # 讀取 64KB 塊
+                file_size += len(chunk)
+                if file_size > 10 * 1024 * 1024:  # 10MB 限制
+                    raise HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        detail="檔案大小超過 10MB 限制",
+                    )
+                await buffer.write(chunk)
+
+        job = await StudentCRUD.submit_import_job_async(
+            temp_file, file.filename, major, incremental
+        )
+        return APIResponse(
+            success=True,
+            message=f"已建立匯入工作 {job.job_id}",
+            data=job,
+        )
 
     except HTTPException:
+        if temp_file is not None and temp_file.exists():
+            temp_file.unlink()
         raise
     except Exception as e:
         # 確保清理臨時檔案
@@ -124,13 +173,49 @@ async def upload_excel_students(
         )
 
 
+@router.get("/import-jobs/{job_id}", response_model=APIResponse[ImportJob])
+async def get_import_job(job_id: str):
+    """
+    取得 Excel 匯入工作的狀態與進度，工作結束後包含每位學生的匯入結果與錯誤報告
+    """
+    try:
+        job = await StudentCRUD.get_import_job_async(job_id)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    return APIResponse(success=True, message=job.message, data=job)
+
+
+@router.get("/import-jobs/{job_id}/events")
+async def stream_import_job(job_id: str):
+    """
+    以 Server-Sent Events 推送 Excel 匯入工作的進度
+
+    每次進度改變時送出 progress 事件（資料為工作狀態，不含匯入報告），
+    工作結束時送出 done 事件（資料為完整的工作狀態）後關閉連線。
+    """
+    try:
+        await StudentCRUD.get_import_job_async(job_id)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+
+    async def events():
+        async for job in StudentCRUD.watch_import_job(job_id):
+            if job.finished:
+                yield f"event: done\ndata: {job.model_dump_json()}\n\n"
+            else:
+                data = job.model_dump_json(exclude={"students", "errors"})
+                yield f"event: progress\ndata: {data}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
 @router.delete("/", response_model=APIResponse[None])
-def delete_all_students():
+async def delete_all_students():
     """
     刪除所有學生資料
     """
     try:
-        deleted_count = StudentCRUD.delete_all_students()
+        deleted_count = await StudentCRUD.delete_all_students_async()
         return APIResponse(
             success=True,
             message=f"成功刪除 {deleted_count} 位學生的資料",
@@ -144,12 +229,12 @@ def delete_all_students():
 
 
 @router.delete("/{student_id}", response_model=APIResponse[None])
-def delete_student(student_id: str):
+async def delete_student(student_id: str):
     """
     刪除特定學生資料
     """
     try:
-        StudentCRUD.delete_student_by_id(student_id)
+        await StudentCRUD.delete_student_by_id_async(student_id)
         return APIResponse(
             success=True,
             message=f"成功刪除學生 {student_id} 的資料",
@@ -0,0 +1,51 @@
+"""
+以 orjson 序列化 API 回應與儲存的資料
+
+審查結果紀錄（ResultRecord）直接使用 to_json() 保留的輸出，同一份結果存檔與回應時只序列化一次；
+路由中的資料已經是驗證過的模型或預先序列化的 JSON 時，以 api_response 直接輸出 APIResponse 的結構，
+略過 response_model 的再次驗證與序列化（response_model 仍用於 API 文件）。
+"""
+
+from typing import Any
+import orjson
+from fastapi import Response, status
+from pydantic import BaseModel
+from rule_engine.record import AllRecord, SetRecord
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, (AllRecord, SetRecord)):
+        return orjson.Fragment(value.to_json())
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    raise TypeError(f"無法序列化 {type(value).__name__}")
+
+
+def _pretty_default(value: Any) -> Any:
+    # 預先序列化的片段不會重新縮排，因此結果紀錄改為一般字典
+    if isinstance(value, (AllRecord, SetRecord)):
+        return value.to_dict()
+    return _default(value)
+
+
+def dumps(data: Any, pretty: bool = False) -> bytes:
+    """
+    序列化為 JSON（UTF-8），data 中可包含 pydantic 模型、結果紀錄與 orjson.Fragment
+
+    Args:
+        pretty: 是否縮排（兩個空白），預設為不含空白的緊湊格式
+    """
+    if pretty:
+        return orjson.dumps(data, default=_pretty_default, option=orjson.OPT_INDENT_2)
+    return orjson.dumps(data, default=_default)
+
+
+def api_response(
+    message: str, data: Any, status_code: int = status.HTTP_200_OK
+) -> Response:
+    """以 APIResponse 的結構（success、message、data）直接輸出回應，不經過 response_model 驗證"""
+    return Response(
+        content=dumps({"success": True, "message": message, "data": data}),
+        status_code=status_code,
+        media_type="application/json",
+    )
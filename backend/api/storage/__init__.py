@@ -0,0 +1,62 @@
+"""
+資料儲存層
+
+預設使用 JSON 檔案目錄（data/），設定環境變數 GRADUATION_STORAGE=sqlite 時改用 SQLite，
+資料庫路徑由 GRADUATION_DB 指定（預設 data/graduation.sqlite3）。
+JSON 檔案中的審查結果預設為緊湊格式，設定 GRADUATION_PRETTY_JSON=1 時縮排以便閱讀。
+每個行程保留最近讀取的已解析學生資料，人數上限由 GRADUATION_STUDENT_CACHE_SIZE 設定（預設 1024）。
+既有的 data/ 目錄可用 python -m api.storage.migrate 匯入 SQLite。
+"""
+
+import os
+from pathlib import Path
+from api.storage.base import RuleKey, Storage, Version
+from api.storage.json_storage import JsonStorage
+from api.storage.sqlite_storage import SqliteStorage
+
+__all__ = [
+    "RuleKey",
+    "Storage",
+    "Version",
+    "JsonStorage",
+    "SqliteStorage",
+    "create_storage",
+    "get_storage",
+    "set_storage",
+]
+
+
+def create_storage(backend: str | None = None, db_path: Path | None = None) -> Storage:
+    """
+    依參數或環境變數建立儲存層
+
+    Raises:
+        ValueError: 未知的儲存方式
+    """
+    backend = backend or os.environ.get("GRADUATION_STORAGE", "json")
+    match backend:
+        case "json":
+            return JsonStorage(
+                pretty=os.environ.get("GRADUATION_PRETTY_JSON", "") in ("1", "true")
+            )
+        case "sqlite":
+            return SqliteStorage(
+                db_path
+                or Path(os.environ.get("GRADUATION_DB", "data/graduation.sqlite3"))
+            )
+        case _:
+            raise ValueError(f"未知的儲存方式：{backend}")
+
+
+_storage: Storage = create_storage()
+
+
+def get_storage() -> Storage:
+    return _storage
+
+
+def set_storage(storage: Storage) -> Storage:
+    """替換目前使用的儲存層，返回原本的儲存層"""
+    global _storage
+    previous, _storage = _storage, storage
+    return previous
@@ -0,0 +1,293 @@
+import bisect
+import hashlib
+import os
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from datetime import datetime
+from api.models.response_models import Page
+from api.models.result_models import ResultBasicInfo, ResultQuery
+from api.models.student_models import StudentBasicInfo, StudentQuery
+from api.serialization import dumps
+from rule_engine.models.rule import Rule
+from rule_engine.models.student import Student
+
+# (系所代碼, 入學年度, 規則類型：major、minor 或 double_major)
+RuleKey = tuple[str, int, str]
+
+# 資料的版本：(版本標記, 最後修改時間)，資料改變時版本標記一定不同；無法取得修改時間時為 None
+Version = tuple[str, datetime | None]
+
+
+class StudentCache[K: Hashable]:
+    """
+    已解析學生資料的 LRU 快取：鍵 -> (資料的版本標記, Student)
+
+    每個行程、每種儲存方式各一份，項目數上限由環境變數 GRADUATION_STUDENT_CACHE_SIZE 設定
+    （預設 1024，0 表示不快取）。評估不會修改學生資料，快取中的物件可被多個請求共用，但呼叫端不可修改。
+    """
+
+    def __init__(self, maxsize: int | None = None):
+        self.maxsize = (
+            int(os.environ.get("GRADUATION_STUDENT_CACHE_SIZE", 1024))
+            if maxsize is None
+            else maxsize
+        )
+        self._entries: OrderedDict[K, tuple[object, Student]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: K, stamp: object) -> Student | None:
+        """版本標記相同時返回快取的學生，否則返回 None"""
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is None or cached[0] != stamp:
+                return None
+            self._entries.move_to_end(key)
+            return cached[1]
+
+    def put(self, key: K, stamp: object, student: Student):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (stamp, student)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def discard(self, key: K):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def discard_where(self, predicate: Callable[[K], bool]):
+        """移除鍵符合條件的項目（例如某個資料目錄的所有學生）"""
+        with self._lock:
+            for key in [key for key in self._entries if predicate(key)]:
+                del self._entries[key]
+
+
+class Storage(ABC):
+    """
+    學生、規則與審查結果的儲存層
+
+    找不到資料時與原本的檔案操作相同，拋出 FileNotFoundError（或返回 None / False）。
+    """
+
+    # ---- 學生 ----
+
+    @abstractmethod
+    def list_students(self) -> list[Student]:
+        """所有學生（依學號排序），無法解析的資料會被略過"""
+
+    @abstractmethod
+    def query_students(self, query: StudentQuery) -> Page[StudentBasicInfo]:
+        """
+        依條件篩選與分頁學生的基本資訊（依學號排序）
+
+        不解析修課列表；無法解析的資料會被略過。
+        """
+
+    @abstractmethod
+    def get_student(self, student_id: str) -> Student:
+        """
+        Raises:
+            FileNotFoundError: 找不到學生
+        """
+
+    @abstractmethod
+    def get_cached_student(self, student_id: str) -> Student:
+        """
+        取得學生資料（唯讀），資料未變動時直接返回已解析的物件
+
+        Raises:
+            FileNotFoundError: 找不到學生
+        """
+
+    @abstractmethod
+    def student_version(self, student_id: str) -> Version | None:
+        """學生資料的版本（不讀取修課列表），學生不存在時返回 None"""
+
+    @abstractmethod
+    def save_student(self, student: Student, fingerprint: str | None = None):
+        """新增或覆寫學生，fingerprint 為 UtilFunctions.fingerprint_student 的結果（未提供時自行計算）"""
+
+    @abstractmethod
+    def student_fingerprint(self, student_id: str) -> str | None:
+        """已儲存學生的指紋，學生不存在時返回 None"""
+
+    @abstractmethod
+    def delete_student(self, student_id: str) -> bool:
+        """刪除學生，學生不存在時返回 False"""
+
+    @abstractmethod
+    def delete_all_students(self) -> int:
+        """刪除所有學生，返回刪除的人數"""
+
+    # ---- 規則 ----
+
+    @abstractmethod
+    def list_rules(self) -> list[RuleKey]:
+        """所有規則（依系所、年度與類型排序）"""
+
+    @abstractmethod
+    def get_rule(
+        self, department: str, admission_year: int, rule_type: str
+    ) -> Rule | None:
+        """
+        Returns:
+            Rule | None: 規則不存在時返回 None
+
+        Raises:
+            ValueError: 規則內容無法解析
+        """
+
+    @abstractmethod
+    def get_cached_rule(
+        self, department: str, admission_year: int, rule_type: str
+    ) -> Rule | None:
+        """
+        取得凍結的規則（唯讀，多個審查共用），內容未變動時直接返回已解析的物件
+
+        Returns:
+            Rule | None: 規則不存在時返回 None
+
+        Raises:
+            ValueError: 規則內容無法解析
+        """
+
+    @abstractmethod
+    def rule_version(
+        self, department: str, admission_year: int, rule_type: str
+    ) -> Version | None:
+        """規則的版本（不解析規則），規則不存在時返回 None"""
+
+    def rules_version(self) -> Version:
+        """規則列表（list_rules）的版本，只隨規則的新增或刪除改變"""
+        keys = repr(self.list_rules()).encode()
+        return hashlib.sha1(keys).hexdigest(), None
+
+    @abstractmethod
+    def save_rule(
+        self,
+        department: str,
+        admission_year: int,
+        rule_type: str,
+        rule: Rule,
+        overwrite: bool = False,
+    ):
+        """
+        Raises:
+            FileExistsError: 規則已存在且 overwrite 為 False
+        """
+
+    @abstractmethod
+    def delete_rule(self, department: str, admission_year: int, rule_type: str) -> bool:
+        """刪除規則，規則不存在時返回 False"""
+
+    @abstractmethod
+    def rule_years(self, department: str, rule_type: str) -> list[int]:
+        """
+        系所某種規則的所有年度（由小到大）
+
+        Raises:
+            FileNotFoundError: 系所沒有任何規則
+        """
+
+    def find_rule(self, department: str, admission_year: int, rule_type: str) -> Rule:
+        """
+        選擇年度最大但不超過入學年度的規則
+
+        Returns:
+            Rule: 凍結的規則（見 get_cached_rule），需要修改時請先複製
+
+        Raises:
+            FileNotFoundError: 找不到適用的規則
+        """
+        years = self.rule_years(department, rule_type)
+        if not years:
+            raise FileNotFoundError(
+                f"科系 '{department}' 沒有可用的 {rule_type} 規則文件"
+            )
+
+        position = bisect.bisect_right(years, admission_year)
+        if position == 0:
+            raise FileNotFoundError(
+                f"找不到適用於入學年度 {admission_year} 的 {rule_type} 規則"
+            )
+
+        rule = self.get_cached_rule(department, years[position - 1], rule_type)
+        if rule is None:
+            raise FileNotFoundError(
+                f"找不到適用於入學年度 {admission_year} 的 {rule_type} 規則"
+            )
+        return rule
+
+    # ---- 審查結果 ----
+
+    @abstractmethod
+    def save_result(self, name: str, data: dict, created_at: datetime | None = None):
+        """
+        保存審查結果（同名時覆寫）
+
+        Args:
+            name: 結果名稱（檔名），例如 AN4116089_20_Oct_2025_14_30.json
+            data: 學生基本資料與各項審查結果（字典或 ResultRecord，紀錄以 to_json() 的輸出寫入）
+            created_at: 建立時間，預設為現在
+        """
+
+    @abstractmethod
+    def query_results(self, query: ResultQuery) -> Page[ResultBasicInfo]:
+        """
+        依條件篩選、排序與分頁審查結果的基本資訊
+
+        只讀取索引，不解析審查結果內容；排序欄位相同時依名稱排序。
+        """
+
+    def list_results(self) -> list[ResultBasicInfo]:
+        """所有審查結果的基本資訊（最新的在前）"""
+        return self.query_results(ResultQuery()).items
+
+    @abstractmethod
+    def get_result(self, name: str) -> dict:
+        """
+        Raises:
+            FileNotFoundError: 找不到審查結果
+        """
+
+    def get_result_json(self, name: str) -> bytes:
+        """
+        審查結果的 JSON（UTF-8），不經過解析，可直接放入回應
+
+        Raises:
+            FileNotFoundError: 找不到審查結果
+        """
+        return dumps(self.get_result(name))
+
+    @abstractmethod
+    def result_created_at(self, name: str) -> datetime:
+        """
+        Raises:
+            FileNotFoundError: 找不到審查結果
+        """
+
+    @abstractmethod
+    def delete_result(self, name: str) -> bool:
+        """刪除審查結果，不存在時返回 False"""
+
+    @abstractmethod
+    def delete_all_results(self) -> int:
+        """刪除所有審查結果，返回刪除的筆數"""
+
+    def flush(self):
+        """將暫存在記憶體中的索引寫回（批次寫入結束時呼叫）"""
+
+    def resolved(self) -> "Storage":
+        """
+        返回不受工作目錄改變影響的儲存層（交給背景工作或 worker 行程使用）
+
+        交給 worker 行程的儲存層必須可以 pickle，位置相同的儲存層應該相等（見 api.executors.call_with_storage）。
+        """
+        return self
@@ -0,0 +1,648 @@
+import contextlib
+import hashlib
+import json
+import os
+import re
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from api.models.response_models import Page
+from api.models.result_models import ResultBasicInfo, ResultQuery
+from api.models.student_models import StudentBasicInfo, StudentQuery
+from api.serialization import dumps
+from api.storage.base import RuleKey, Storage, StudentCache, Version
+from rule_engine.factory import RuleFactory, StudentFactory
+from rule_engine.models.rule import Rule
+from rule_engine.models.student import Student
+from rule_engine.utils import UtilFunctions
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+RULE_FILE_NAME_PATTERN = re.compile(r"^(\d+)_(minor|double_major|major)$")
+
+# 已解析的學生資料快取：學生檔案絕對路徑 -> (檔案修改時間, Student)，見 StudentCache
+_student_cache: StudentCache[Path] = StudentCache()
+
+# 學生索引：索引檔案絕對路徑 -> 學號 -> 索引項目（見 JsonStorage._load_student_index），
+# 同一個資料目錄的所有 JsonStorage 共用；有修改尚未寫回的索引記錄在 _dirty_student_indexes
+_student_indexes: dict[Path, dict[str, dict]] = {}
+_dirty_student_indexes: set[Path] = set()
+_student_index_lock = threading.Lock()
+
+# 已解析並凍結的規則：規則檔案絕對路徑 -> ((檔案修改時間, 檔案大小), Rule)
+_rule_cache: dict[Path, tuple[tuple[int, int], Rule]] = {}
+
+# 規則年度索引：系所規則資料夾絕對路徑 -> (資料夾修改時間, 規則類型 -> 排序的年度)
+# 新增或刪除規則檔案會改變資料夾的修改時間
+_rule_index: dict[Path, tuple[int, dict[str, list[int]]]] = {}
+
+# 審查結果索引：索引檔案絕對路徑 -> (索引檔案版本, 索引內容)，
+# 版本為 (修改時間, inode, 大小)，其他行程以暫存檔替換索引時一定會改變
+_result_manifests: dict[Path, tuple[tuple[int, int, int] | None, dict]] = {}
+# 同一行程內的索引讀寫；跨行程（例如批次審查的 worker 行程）另外以檔案鎖保護，見 _manifest_locked
+_manifest_lock = threading.Lock()
+
+
+class JsonStorage(Storage):
+    """
+    以 JSON 檔案目錄儲存（原本的格式）
+
+    - 學生：{data_dir}/students/{學號}.json
+    - 規則：{data_dir}/rules/{系所代碼}/{入學年度}_{規則類型}.json
+    - 審查結果：{data_dir}/evaluation_results/{名稱}
+    - 學生索引：{data_dir}/student_fingerprints.json，記錄每個學生檔案寫入時的修改時間、
+      姓名、主修與指紋，列出學生時不需解析修課列表
+    - 審查結果索引：{data_dir}/evaluation_results_index.json，記錄每個結果的摘要，列表時不需讀取結果檔案
+
+    data_dir 為相對路徑時依目前的工作目錄解析；審查結果預設以緊湊格式寫入，pretty 為 True 時縮排。
+    """
+
+    def __init__(self, data_dir: Path = Path("data"), pretty: bool = False):
+        self.data_dir = data_dir
+        self.pretty = pretty
+
+    @property
+    def students_dir(self) -> Path:
+        return self.data_dir / "students"
+
+    @property
+    def rules_dir(self) -> Path:
+        return self.data_dir / "rules"
+
+    @property
+    def results_dir(self) -> Path:
+        return self.data_dir / "evaluation_results"
+
+    @property
+    def student_index(self) -> Path:
+        return self.data_dir / "student_fingerprints.json"
+
+    @property
+    def results_manifest(self) -> Path:
+        return self.data_dir / "evaluation_results_index.json"
+
+    def resolved(self) -> "JsonStorage":
+        return JsonStorage(self.data_dir.absolute(), self.pretty)
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, JsonStorage) and (self.data_dir, self.pretty) == (
+            other.data_dir,
+            other.pretty,
+        )
+
+    def __hash__(self) -> int:
+        return hash((self.data_dir, self.pretty))
+
+    # ---- 學生 ----
+
+    def _student_file(self, student_id: str) -> Path:
+        return self.students_dir / f"{student_id}.json"
+
+    @staticmethod
+    def _file_version(path: Path) -> Version | None:
+        """以檔案的 (修改時間, 大小) 作為版本，檔案不存在時返回 None"""
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+        return (
+            f"{stat.st_mtime_ns:x}-{stat.st_size:x}",
+            datetime.fromtimestamp(stat.st_mtime, timezone.utc),
+        )
+
+    def list_students(self) -> list[Student]:
+        students: list[Student] = []
+        if not self.students_dir.exists():
+            return []
+        for student_file in sorted(self.students_dir.glob("*.json")):
+            try:
+                students.append(StudentFactory.from_json_file(student_file))
+            except Exception as e:
+                print(f"警告：跳過檔案 {student_file.name}: {e}")
+                continue
+        return students
+
+    def get_student(self, student_id: str) -> Student:
+        student_file = self._student_file(student_id)
+        if not student_file.exists():
+            raise FileNotFoundError(f"找不到學生檔案: {student_file}")
+        return StudentFactory.from_json_file(student_file)
+
+    def student_version(self, student_id: str) -> Version | None:
+        return self._file_version(self._student_file(student_id))
+
+    def get_cached_student(self, student_id: str) -> Student:
+        student_file = self._student_file(student_id).absolute()
+        try:
+            mtime = student_file.stat().st_mtime_ns
+        except FileNotFoundError:
+            _student_cache.discard(student_file)
+            raise FileNotFoundError(f"找不到學生檔案: {student_file}")
+
+        cached = _student_cache.get(student_file, mtime)
+        if cached is not None:
+            return cached
+
+        student = StudentFactory.from_json_file(student_file)
+        _student_cache.put(student_file, mtime, student)
+        return student
+
+    def _load_student_index(self) -> dict[str, dict]:
+        """
+        學號 -> {"mtime_ns": 學生檔案修改時間, "name": 姓名, "major": 主修,
+        "fingerprint": 指紋（尚未計算時沒有此鍵）}（呼叫端需持有 _student_index_lock）
+        """
+        index_file = self.student_index.absolute()
+        index = _student_indexes.get(index_file)
+        if index is not None:
+            return index
+
+        index = {}
+        if index_file.exists():
+            try:
+                with open(index_file, "r", encoding="utf-8") as f:
+                    index = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"警告：忽略無法讀取的學生索引 {index_file}: {e}")
+        _student_indexes[index_file] = index
+        return index
+
+    def _set_student_entry(self, student_id: str, entry: dict):
+        """更新學生索引（呼叫端需持有 _student_index_lock），flush 時寫回"""
+        self._load_student_index()[student_id] = entry
+        _dirty_student_indexes.add(self.student_index.absolute())
+
+    def save_student(self, student: Student, fingerprint: str | None = None):
+        student_file = self._student_file(student.id)
+        StudentFactory.save_student_to_json(student, student_file)
+        with _student_index_lock:
+            self._set_student_entry(
+                student.id,
+                {
+                    "mtime_ns": student_file.stat().st_mtime_ns,
+                    "name": student.name,
+                    "major": student.major,
+                    "fingerprint": fingerprint
+                    or UtilFunctions.fingerprint_student(student),
+                },
+            )
+
+    def student_fingerprint(self, student_id: str) -> str | None:
+        """
+        索引中記錄的修改時間與檔案相同時直接使用索引，否則讀取檔案重新計算並更新索引；
+        無法解析的檔案返回空字串（視為內容不同）
+        """
+        student_file = self._student_file(student_id)
+        try:
+            mtime = student_file.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+        with _student_index_lock:
+            entry = self._load_student_index().get(student_id)
+        if (
+            entry is not None
+            and entry.get("mtime_ns") == mtime
+            and "fingerprint" in entry
+        ):
+            return entry["fingerprint"]
+
+        try:
+            student = StudentFactory.from_json_file(student_file)
+        except ValueError:
+            return ""
+        fingerprint = UtilFunctions.fingerprint_student(student)
+        with _student_index_lock:
+            self._set_student_entry(
+                student_id,
+                {
+                    "mtime_ns": mtime,
+                    "name": student.name,
+                    "major": student.major,
+                    "fingerprint": fingerprint,
+                },
+            )
+        return fingerprint
+
+    @staticmethod
+    def _read_student_header(student_file: Path) -> tuple[str, str] | None:
+        """讀取學生檔案的姓名與主修（不驗證修課列表），格式錯誤時返回 None"""
+        try:
+            with open(student_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"警告：跳過檔案 {student_file.name}: {e}")
+            return None
+        name, major = data.get("name"), data.get("major")
+        if not isinstance(name, str) or not name.strip() or not isinstance(major, str):
+            print(f"警告：跳過檔案 {student_file.name}: 缺少姓名或主修")
+            return None
+        return name.strip(), major
+
+    def query_students(self, query: StudentQuery) -> Page[StudentBasicInfo]:
+        """
+        由學生索引取得基本資訊，只有索引中沒有或修改時間不同的檔案才會被讀取，
+        讀取的結果會寫回索引
+        """
+        if not self.students_dir.exists():
+            return Page(items=[], total=0, offset=query.offset, limit=query.limit)
+
+        with os.scandir(self.students_dir) as entries:
+            mtimes = {
+                entry.name.removesuffix(".json"): entry.stat().st_mtime_ns
+                for entry in entries
+                if entry.name.endswith(".json") and entry.is_file()
+            }
+
+        students: list[StudentBasicInfo] = []
+        with _student_index_lock:
+            index = self._load_student_index()
+            for student_id in index.keys() - mtimes.keys():
+                del index[student_id]
+                _dirty_student_indexes.add(self.student_index.absolute())
+
+            for student_id in sorted(mtimes):
+                entry = index.get(student_id)
+                if (
+                    entry is None
+                    or entry.get("mtime_ns") != mtimes[student_id]
+                    or "name" not in entry
+                ):
+                    header = self._read_student_header(self._student_file(student_id))
+                    if header is None:
+                        continue
+                    entry = {
+                        "mtime_ns": mtimes[student_id],
+                        "name": header[0],
+                        "major": header[1],
+                    }
+                    self._set_student_entry(student_id, entry)
+                if query.matches(student_id, entry["name"], entry["major"]):
+                    students.append(
+                        StudentBasicInfo(
+                            id=student_id, name=entry["name"], major=entry["major"]
+                        )
+                    )
+        self.flush()
+
+        end = None if query.limit is None else query.offset + query.limit
+        return Page(
+            items=students[query.offset : end],
+            total=len(students),
+            offset=query.offset,
+            limit=query.limit,
+        )
+
+    def delete_student(self, student_id: str) -> bool:
+        student_file = self._student_file(student_id)
+        if not student_file.exists():
+            return False
+        student_file.unlink()
+        _student_cache.discard(student_file.absolute())
+        return True
+
+    def delete_all_students(self) -> int:
+        if not self.students_dir.exists():
+            return 0
+
+        deleted_count = 0
+        for student_file in self.students_dir.glob("*.json"):
+            student_file.unlink()
+            deleted_count += 1
+        students_dir = self.students_dir.absolute()
+        _student_cache.discard_where(lambda path: path.parent == students_dir)
+        return deleted_count
+
+    def flush(self):
+        index_file = self.student_index.absolute()
+        with _student_index_lock:
+            if index_file not in _dirty_student_indexes:
+                return
+            index_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = index_file.with_name(
+                f"{index_file.name}.{os.getpid()}.{threading.get_ident()}.tmp"
+            )
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                json.dump(_student_indexes[index_file], f, ensure_ascii=False)
+            os.replace(tmp_file, index_file)
+            _dirty_student_indexes.discard(index_file)
+
+    # ---- 規則 ----
+
+    def _rule_file(self, department: str, admission_year: int, rule_type: str) -> Path:
+        return self.rules_dir / department / f"{admission_year}_{rule_type}.json"
+
+    def rule_version(
+        self, department: str, admission_year: int, rule_type: str
+    ) -> Version | None:
+        return self._file_version(
+            self._rule_file(department, admission_year, rule_type)
+        )
+
+    def rules_version(self) -> Version:
+        # 新增或刪除規則檔案會改變系所目錄的修改時間，不需要列出規則檔案
+        if not self.rules_dir.exists():
+            return "empty", None
+        stats = [(".", self.rules_dir.stat().st_mtime_ns)]
+        stats += sorted(
+            (entry.name, entry.stat().st_mtime_ns)
+            for entry in os.scandir(self.rules_dir)
+            if entry.is_dir()
+        )
+        digest = hashlib.sha1(repr(stats).encode()).hexdigest()
+        latest = max(mtime_ns for _, mtime_ns in stats)
+        return digest, datetime.fromtimestamp(latest / 1e9, timezone.utc)
+
+    def list_rules(self) -> list[RuleKey]:
+        if not self.rules_dir.exists():
+            return []
+
+        rules: list[RuleKey] = []
+        for dept_dir in sorted(self.rules_dir.iterdir()):
+            if not dept_dir.is_dir():
+                continue
+            for rule_file in sorted(dept_dir.glob("*.json")):
+                match = RULE_FILE_NAME_PATTERN.match(rule_file.stem)
+                if not match:
+                    print(f"警告：跳過檔案 {rule_file.name}: 無法解析檔名中的規則類型")
+                    continue
+                rules.append((dept_dir.name, int(match.group(1)), match.group(2)))
+        return rules
+
+    def get_rule(
+        self, department: str, admission_year: int, rule_type: str
+    ) -> Rule | None:
+        rule_file = self._rule_file(department, admission_year, rule_type)
+        if not rule_file.exists():
+            return None
+        return RuleFactory.from_json_file(rule_file)
+
+    def get_cached_rule(
+        self, department: str, admission_year: int, rule_type: str
+    ) -> Rule | None:
+        rule_file = self._rule_file(department, admission_year, rule_type).absolute()
+        try:
+            stat = rule_file.stat()
+        except FileNotFoundError:
+            _rule_cache.pop(rule_file, None)
+            return None
+
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        cached = _rule_cache.get(rule_file)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+
+        rule = RuleFactory.from_json_file(rule_file).freeze()
+        _rule_cache[rule_file] = (stamp, rule)
+        return rule
+
+    def save_rule(
+        self,
+        department: str,
+        admission_year: int,
+        rule_type: str,
+        rule: Rule,
+        overwrite: bool = False,
+    ):
+        rule_file = self._rule_file(department, admission_year, rule_type)
+        if rule_file.exists() and not overwrite:
+            raise FileExistsError(
+                f"{department} {admission_year} 學年度 {rule_type} 規則已存在"
+            )
+        rule_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(rule_file, "w", encoding="utf-8") as f:
+            json.dump(rule.model_dump(), f, ensure_ascii=False, indent=4)
+        self._evict_rule(rule_file)
+
+    def delete_rule(self, department: str, admission_year: int, rule_type: str) -> bool:
+        rule_file = self._rule_file(department, admission_year, rule_type)
+        if not rule_file.exists():
+            return False
+        rule_file.unlink()
+        self._evict_rule(rule_file)
+        return True
+
+    @staticmethod
+    def _evict_rule(rule_file: Path):
+        """規則被修改時移除快取（修改時間的精度不足時也不會拿到舊的規則）"""
+        rule_file = rule_file.absolute()
+        _rule_cache.pop(rule_file, None)
+        _rule_index.pop(rule_file.parent, None)
+
+    def rule_years(self, department: str, rule_type: str) -> list[int]:
+        if not self.rules_dir.exists():
+            raise FileNotFoundError(f"規則目錄不存在：{self.rules_dir}")
+
+        dept_dir = (self.rules_dir / department).absolute()
+        try:
+            dir_mtime = dept_dir.stat().st_mtime_ns
+        except FileNotFoundError:
+            _rule_index.pop(dept_dir, None)
+            raise FileNotFoundError(f"找不到科系 '{department}' 對應的規則資料夾")
+
+        cached = _rule_index.get(dept_dir)
+        if cached is None or cached[0] != dir_mtime:
+            years_by_type: dict[str, list[int]] = {}
+            for rule_file in dept_dir.glob("*.json"):
+                year_part, _, file_type = rule_file.stem.partition("_")
+                if year_part.isdigit():
+                    years_by_type.setdefault(file_type, []).append(int(year_part))
+            for years in years_by_type.values():
+                years.sort()
+            cached = (dir_mtime, years_by_type)
+            _rule_index[dept_dir] = cached
+        return list(cached[1].get(rule_type, []))
+
+    # ---- 審查結果 ----
+
+    @contextlib.contextmanager
+    def _manifest_locked(self):
+        """
+        持有 _manifest_lock 與索引的檔案鎖（{索引檔案}.lock），
+        多個行程同時寫入審查結果時不會覆蓋彼此的索引項目（不支援 fcntl 的平台只有行程內的鎖）
+        """
+        with _manifest_lock:
+            if fcntl is None:
+                yield
+                return
+            manifest_file = self.results_manifest.absolute()
+            manifest_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(manifest_file.with_name(f"{manifest_file.name}.lock"), "a") as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    @staticmethod
+    def _manifest_version(manifest_file: Path) -> tuple[int, int, int] | None:
+        try:
+            stat = manifest_file.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_ino, stat.st_size
+
+    def _load_manifest(self) -> dict:
+        """
+        讀取審查結果索引並與目錄同步（呼叫端需在 _manifest_locked 之中）
+
+        索引記錄同步時目錄的修改時間，目錄中有檔案新增或刪除（例如由其他行程寫入）時
+        只會讀取索引中沒有的結果檔案，並移除已不存在的項目。
+        """
+        manifest_file = self.results_manifest.absolute()
+        manifest_version = self._manifest_version(manifest_file)
+
+        cached = _result_manifests.get(manifest_file)
+        if cached is not None and cached[0] == manifest_version:
+            manifest = cached[1]
+        else:
+            manifest = {"dir_mtime_ns": None, "results": {}}
+            if manifest_version is not None:
+                try:
+                    with open(manifest_file, "r", encoding="utf-8") as f:
+                        manifest = json.load(f)
+                except (OSError, ValueError) as e:
+                    print(f"警告：重新建立無法讀取的結果索引 {manifest_file}: {e}")
+            _result_manifests[manifest_file] = (manifest_version, manifest)
+
+        if self._sync_manifest(manifest):
+            self._save_manifest(manifest)
+        return manifest
+
+    def _sync_manifest(self, manifest: dict) -> bool:
+        """目錄有變動時同步索引，返回索引是否改變"""
+        try:
+            # 先取得修改時間再列出檔案，列出之後的變動會在下次讀取時同步
+            dir_mtime = self.results_dir.stat().st_mtime_ns
+        except FileNotFoundError:
+            dir_mtime = None
+        if manifest["dir_mtime_ns"] == dir_mtime:
+            return False
+
+        entries: dict[str, dict] = manifest["results"]
+        names = (
+            {result_file.name for result_file in self.results_dir.glob("*.json")}
+            if dir_mtime is not None
+            else set()
+        )
+        for name in entries.keys() - names:
+            del entries[name]
+        for name in sorted(names - entries.keys()):
+            result_file = self.results_dir / name
+            try:
+                with open(result_file, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                created_at = datetime.fromtimestamp(result_file.stat().st_mtime)
+            except FileNotFoundError:
+                continue
+            except Exception as e:
+                print(f"警告：跳過檔案 {name}: {e}")
+                continue
+            entries[name] = ResultBasicInfo.from_result(
+                name, data, created_at
+            ).model_dump(mode="json")
+        manifest["dir_mtime_ns"] = dir_mtime
+        return True
+
+    def _save_manifest(self, manifest: dict):
+        """以暫存檔替換的方式寫入索引（呼叫端需在 _manifest_locked 之中）"""
+        manifest_file = self.results_manifest.absolute()
+        manifest_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = manifest_file.with_name(
+            f"{manifest_file.name}.{os.getpid()}.{threading.get_ident()}.tmp"
+        )
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False)
+        os.replace(tmp_file, manifest_file)
+        _result_manifests[manifest_file] = (
+            self._manifest_version(manifest_file),
+            manifest,
+        )
+
+    def save_result(self, name: str, data: dict, created_at: datetime | None = None):
+        self.results_dir.mkdir(parents=True, exist_ok=True)
+        result_file = self.results_dir / name
+        result_file.write_bytes(dumps(data, self.pretty))
+        if created_at is not None:
+            timestamp = created_at.timestamp()
+            os.utime(result_file, (timestamp, timestamp))
+        info = ResultBasicInfo.from_result(
+            name, data, datetime.fromtimestamp(result_file.stat().st_mtime)
+        )
+
+        with self._manifest_locked():
+            manifest = self._load_manifest()
+            manifest["results"][name] = info.model_dump(mode="json")
+            self._save_manifest(manifest)
+
+    def query_results(self, query: ResultQuery) -> Page[ResultBasicInfo]:
+        with self._manifest_locked():
+            entries = list(self._load_manifest()["results"].values())
+
+        if query.student_id is not None:
+            entries = [
+                entry for entry in entries if entry["student_id"] == query.student_id
+            ]
+        # 先依名稱排序，再以穩定排序依指定欄位排序；建立時間為 ISO 格式字串，可直接比較
+        entries.sort(key=lambda entry: entry["file_name"])
+        entries.sort(
+            key=lambda entry: entry[query.sort] or "", reverse=query.descending
+        )
+
+        end = None if query.limit is None else query.offset + query.limit
+        return Page(
+            items=[
+                ResultBasicInfo.model_validate(entry)
+                for entry in entries[query.offset : end]
+            ],
+            total=len(entries),
+            offset=query.offset,
+            limit=query.limit,
+        )
+
+    def get_result(self, name: str) -> dict:
+        result_file = self.results_dir / name
+        if not result_file.exists():
+            raise FileNotFoundError(f"找不到結果檔案: {name}")
+        with open(result_file, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def get_result_json(self, name: str) -> bytes:
+        result_file = self.results_dir / name
+        if not result_file.exists():
+            raise FileNotFoundError(f"找不到結果檔案: {name}")
+        return result_file.read_bytes()
+
+    def result_created_at(self, name: str) -> datetime:
+        result_file = self.results_dir / name
+        if not result_file.exists():
+            raise FileNotFoundError(f"找不到結果檔案: {name}")
+        return datetime.fromtimestamp(result_file.stat().st_mtime)
+
+    def delete_result(self, name: str) -> bool:
+        result_file = self.results_dir / name
+        if not result_file.exists():
+            return False
+        result_file.unlink()
+
+        with self._manifest_locked():
+            manifest = self._load_manifest()
+            manifest["results"].pop(name, None)
+            self._save_manifest(manifest)
+        return True
+
+    def delete_all_results(self) -> int:
+        if not self.results_dir.exists():
+            return 0
+
+        deleted_count = 0
+        for result_file in self.results_dir.glob("*.json"):
+            result_file.unlink()
+            deleted_count += 1
+
+        with self._manifest_locked():
+            self._load_manifest()
+        return deleted_count
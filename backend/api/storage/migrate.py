@@ -0,0 +1,72 @@
+"""
+將 JSON 檔案目錄中的學生、規則與審查結果匯入 SQLite
+
+    python -m api.storage.migrate [--data-dir data] [--db data/graduation.sqlite3]
+"""
+
+import argparse
+from pathlib import Path
+from api.storage.base import Storage
+from api.storage.json_storage import JsonStorage
+from api.storage.sqlite_storage import SqliteStorage
+
+
+def migrate(source: Storage, target: Storage) -> dict[str, int]:
+    """
+    複製所有資料（同學號、同規則、同名結果會被覆寫）
+
+    Returns:
+        dict[str, int]: 各類資料複製的筆數
+    """
+    counts = {"students": 0, "rules": 0, "results": 0}
+
+    for student in source.list_students():
+        target.save_student(student)
+        counts["students"] += 1
+
+    for department, admission_year, rule_type in source.list_rules():
+        try:
+            rule = source.get_rule(department, admission_year, rule_type)
+        except ValueError as e:
+            print(f"警告：跳過規則 {department} {admission_year} {rule_type}: {e}")
+            continue
+        if rule is None:
+            continue
+        target.save_rule(department, admission_year, rule_type, rule, overwrite=True)
+        counts["rules"] += 1
+
+    for info in source.list_results():
+        target.save_result(
+            info.file_name,
+            source.get_result(info.file_name),
+            created_at=source.result_created_at(info.file_name),
+        )
+        counts["results"] += 1
+
+    target.flush()
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="將 data/ 目錄匯入 SQLite 資料庫")
+    parser.add_argument(
+        "--data-dir", type=Path, default=Path("data"), help="JSON 資料目錄"
+    )
+    parser.add_argument(
+        "--db",
+        type=Path,
+        default=Path("data/graduation.sqlite3"),
+        help="SQLite 資料庫路徑（不存在時建立）",
+    )
+    args = parser.parse_args()
+
+    counts = migrate(JsonStorage(args.data_dir), SqliteStorage(args.db))
+    print(
+        f"✅ 已匯入 {counts['students']} 位學生、{counts['rules']} 條規則、"
+        f"{counts['results']} 筆審查結果至 {args.db}"
+    )
+    print("設定環境變數 GRADUATION_STORAGE=sqlite 後啟動 API 即可使用")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,507 @@
+import hashlib
+import json
+import sqlite3
+import threading
+from collections.abc import Iterable
+from contextlib import closing, contextmanager
+from datetime import datetime
+from pathlib import Path
+from api.models.response_models import Page
+from api.models.result_models import ResultBasicInfo, ResultQuery
+from api.models.student_models import StudentBasicInfo, StudentQuery
+from api.serialization import dumps
+from api.storage.base import RuleKey, Storage, StudentCache, Version
+from rule_engine.factory import RuleFactory
+from rule_engine.models.course import StudentCourse
+from rule_engine.models.rule import Rule
+from rule_engine.models.student import Student
+from rule_engine.utils import UtilFunctions
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS students (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    major TEXT NOT NULL,
+    admission_year INTEGER NOT NULL,
+    -- UtilFunctions.fingerprint_student，也用於判斷快取中的學生是否過期
+    fingerprint TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS students_major ON students (major, admission_year);
+
+CREATE TABLE IF NOT EXISTS courses (
+    student_id TEXT NOT NULL,
+    -- 課程在修課列表中的位置（評估依此順序承認課程）
+    position INTEGER NOT NULL,
+    course_name TEXT NOT NULL,
+    course_codes TEXT NOT NULL,
+    credit REAL NOT NULL,
+    course_type INTEGER NOT NULL,
+    tag TEXT NOT NULL,
+    grade INTEGER NOT NULL,
+    category TEXT NOT NULL,
+    year_taken INTEGER NOT NULL,
+    semester_taken INTEGER NOT NULL,
+    recognized INTEGER NOT NULL,
+    PRIMARY KEY (student_id, position)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS courses_name ON courses (course_name);
+
+CREATE TABLE IF NOT EXISTS rules (
+    department TEXT NOT NULL,
+    admission_year INTEGER NOT NULL,
+    rule_type TEXT NOT NULL,
+    content TEXT NOT NULL,
+    PRIMARY KEY (department, rule_type, admission_year)
+);
+
+CREATE TABLE IF NOT EXISTS results (
+    name TEXT PRIMARY KEY,
+    student_id TEXT NOT NULL,
+    student_name TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    data TEXT NOT NULL,
+    -- ResultBasicInfo 的 is_eligible 與 programs（JSON 陣列）
+    is_eligible INTEGER,
+    programs TEXT
+);
+CREATE INDEX IF NOT EXISTS results_created ON results (created_at);
+CREATE INDEX IF NOT EXISTS results_student ON results (student_id, created_at);
+"""
+
+COURSE_COLUMNS = (
+    "course_name",
+    "course_codes",
+    "credit",
+    "course_type",
+    "tag",
+    "grade",
+    "category",
+    "year_taken",
+    "semester_taken",
+    "recognized",
+)
+
+# 已解析的學生資料快取：(資料庫絕對路徑, 學號) -> (指紋, Student)，見 StudentCache
+_student_cache: StudentCache[tuple[Path, str]] = StudentCache()
+
+# 已解析並凍結的規則：(資料庫絕對路徑, 系所, 年度, 類型) -> (規則 JSON, Rule)
+# 讀取 JSON 字串並比較遠比重新驗證規則便宜
+_rule_cache: dict[tuple[Path, str, int, str], tuple[str, Rule]] = {}
+
+
+class SqliteStorage(Storage):
+    """
+    以 SQLite 資料庫儲存
+
+    學生與修課資料正規化為 students / courses 兩張表，規則以（系所、類型、年度）為主鍵，
+    審查結果另外記錄學號、姓名與建立時間並建立索引，列表與查詢不需要解析每一筆資料。
+    每次操作開啟新的連線，可在多個執行緒中使用。
+    """
+
+    def __init__(self, db_path: Path = Path("data/graduation.sqlite3")):
+        self.db_path = db_path
+        self._initialized: set[Path] = set()
+        self._lock = threading.Lock()
+
+    def resolved(self) -> "SqliteStorage":
+        return SqliteStorage(self.db_path.absolute())
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, SqliteStorage) and self.db_path == other.db_path
+
+    def __hash__(self) -> int:
+        return hash(self.db_path)
+
+    def __reduce__(self):
+        # 傳給 worker 行程時只帶資料庫路徑，連線的初始化狀態在各行程重新記錄
+        return SqliteStorage, (self.db_path,)
+
+    @contextmanager
+    def _connect(self):
+        """開啟連線並在區塊結束時提交（發生例外時回復）"""
+        db_path = self.db_path.absolute()
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(sqlite3.connect(db_path, timeout=30)) as connection:
+            with self._lock:
+                if db_path not in self._initialized:
+                    connection.execute("PRAGMA journal_mode=WAL")
+                    connection.executescript(SCHEMA)
+                    self._initialized.add(db_path)
+            with connection:
+                yield connection
+
+    # ---- 學生 ----
+
+    @staticmethod
+    def _course_row(student_id: str, position: int, course: StudentCourse) -> tuple:
+        return (
+            student_id,
+            position,
+            course.course_name,
+            json.dumps(course.course_codes, ensure_ascii=False),
+            course.credit,
+            course.course_type,
+            json.dumps(course.tag, ensure_ascii=False),
+            course.grade,
+            course.category,
+            course.year_taken,
+            course.semester_taken,
+            int(course.recognized),
+        )
+
+    @staticmethod
+    def _build_students(
+        headers: Iterable[tuple[str, str, str]], course_rows: Iterable[tuple]
+    ) -> list[Student]:
+        """由學生列與（依學號、位置排序的）課程列建立學生"""
+        courses: dict[str, list[dict]] = {}
+        for student_id, *values in course_rows:
+            course = dict(zip(COURSE_COLUMNS, values))
+            course["course_codes"] = json.loads(course["course_codes"])
+            course["tag"] = json.loads(course["tag"])
+            course["recognized"] = bool(course["recognized"])
+            courses.setdefault(student_id, []).append(course)
+
+        students = []
+        for student_id, name, major in headers:
+            try:
+                students.append(
+                    Student(
+                        id=student_id,
+                        name=name,
+                        major=major,
+                        courses=courses.get(student_id, []),
+                    )
+                )
+            except ValueError as e:
+                print(f"警告：跳過學生 {student_id}: {e}")
+        return students
+
+    def list_students(self) -> list[Student]:
+        with self._connect() as connection:
+            headers = connection.execute(
+                "SELECT id, name, major FROM students ORDER BY id"
+            ).fetchall()
+            course_rows = connection.execute(
+                f"SELECT student_id, {', '.join(COURSE_COLUMNS)} FROM courses "
+                "ORDER BY student_id, position"
+            )
+            return self._build_students(headers, course_rows)
+
+    def query_students(self, query: StudentQuery) -> Page[StudentBasicInfo]:
+        conditions, params = [], []
+        if query.major is not None:
+            conditions.append("major = ?")
+            params.append(query.major)
+        if query.admission_year is not None:
+            conditions.append("admission_year = ?")
+            params.append(query.admission_year)
+        if query.search:
+            # instr 不把 % 與 _ 當作萬用字元；lower 只轉換 ASCII，與學號的比對一致
+            conditions.append("(instr(lower(id), ?) > 0 OR instr(lower(name), ?) > 0)")
+            params += [query.search.lower()] * 2
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        with self._connect() as connection:
+            total = connection.execute(
+                f"SELECT COUNT(*) FROM students {where}", params
+            ).fetchone()[0]
+            rows = connection.execute(
+                f"SELECT id, name, major FROM students {where} "
+                "ORDER BY id LIMIT ? OFFSET ?",
+                [*params, -1 if query.limit is None else query.limit, query.offset],
+            ).fetchall()
+
+        return Page(
+            items=[
+                StudentBasicInfo(id=student_id, name=name, major=major)
+                for student_id, name, major in rows
+            ],
+            total=total,
+            offset=query.offset,
+            limit=query.limit,
+        )
+
+    def _load_student(self, connection: sqlite3.Connection, student_id: str) -> Student:
+        header = connection.execute(
+            "SELECT id, name, major FROM students WHERE id = ?", (student_id,)
+        ).fetchone()
+        if header is None:
+            raise FileNotFoundError(f"找不到學生: {student_id}")
+        course_rows = connection.execute(
+            f"SELECT student_id, {', '.join(COURSE_COLUMNS)} FROM courses "
+            "WHERE student_id = ? ORDER BY position",
+            (student_id,),
+        )
+        students = self._build_students([header], course_rows)
+        if not students:
+            raise ValueError(f"無法解析學生資料: {student_id}")
+        return students[0]
+
+    def get_student(self, student_id: str) -> Student:
+        with self._connect() as connection:
+            return self._load_student(connection, student_id)
+
+    def get_cached_student(self, student_id: str) -> Student:
+        key = (self.db_path.absolute(), student_id)
+        with self._connect() as connection:
+            row = connection.execute(
+                "SELECT fingerprint FROM students WHERE id = ?", (student_id,)
+            ).fetchone()
+            if row is None:
+                _student_cache.discard(key)
+                raise FileNotFoundError(f"找不到學生: {student_id}")
+
+            cached = _student_cache.get(key, row[0])
+            if cached is not None:
+                return cached
+
+            student = self._load_student(connection, student_id)
+            _student_cache.put(key, row[0], student)
+            return student
+
+    def save_student(self, student: Student, fingerprint: str | None = None):
+        fingerprint = fingerprint or UtilFunctions.fingerprint_student(student)
+        with self._connect() as connection:
+            connection.execute(
+                "INSERT INTO students (id, name, major, admission_year, fingerprint) "
+                "VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (id) DO UPDATE SET name = excluded.name, "
+                "major = excluded.major, admission_year = excluded.admission_year, "
+                "fingerprint = excluded.fingerprint",
+                (
+                    student.id,
+                    student.name,
+                    student.major,
+                    student.admission_year,
+                    fingerprint,
+                ),
+            )
+            connection.execute(
+                "DELETE FROM courses WHERE student_id = ?", (student.id,)
+            )
+            connection.executemany(
+                f"INSERT INTO courses VALUES ({', '.join('?' * (len(COURSE_COLUMNS) + 2))})",
+                [
+                    self._course_row(student.id, position, course)
+                    for position, course in enumerate(student.courses)
+                ],
+            )
+
+    def student_fingerprint(self, student_id: str) -> str | None:
+        with self._connect() as connection:
+            row = connection.execute(
+                "SELECT fingerprint FROM students WHERE id = ?", (student_id,)
+            ).fetchone()
+        return row[0] if row is not None else None
+
+    def student_version(self, student_id: str) -> Version | None:
+        # 指紋涵蓋基本資料與修課列表
+        fingerprint = self.student_fingerprint(student_id)
+        return (fingerprint, None) if fingerprint is not None else None
+
+    def delete_student(self, student_id: str) -> bool:
+        with self._connect() as connection:
+            connection.execute(
+                "DELETE FROM courses WHERE student_id = ?", (student_id,)
+            )
+            deleted = connection.execute(
+                "DELETE FROM students WHERE id = ?", (student_id,)
+            ).rowcount
+        _student_cache.discard((self.db_path.absolute(), student_id))
+        return deleted > 0
+
+    def delete_all_students(self) -> int:
+        with self._connect() as connection:
+            connection.execute("DELETE FROM courses")
+            deleted = connection.execute("DELETE FROM students").rowcount
+        db_path = self.db_path.absolute()
+        _student_cache.discard_where(lambda key: key[0] == db_path)
+        return deleted
+
+    # ---- 規則 ----
+
+    def list_rules(self) -> list[RuleKey]:
+        with self._connect() as connection:
+            rows = connection.execute(
+                "SELECT department, admission_year, rule_type FROM rules "
+                "ORDER BY department, admission_year || '_' || rule_type"
+            ).fetchall()
+        return [tuple(row) for row in rows]
+
+    def get_rule(
+        self, department: str, admission_year: int, rule_type: str
+    ) -> Rule | None:
+        with self._connect() as connection:
+            row = connection.execute(
+                "SELECT content FROM rules "
+                "WHERE department = ? AND admission_year = ? AND rule_type = ?",
+                (department, admission_year, rule_type),
+            ).fetchone()
+        if row is None:
+            return None
+        return RuleFactory.from_json_string(row[0])
+
+    def rule_version(
+        self, department: str, admission_year: int, rule_type: str
+    ) -> Version | None:
+        with self._connect() as connection:
+            row = connection.execute(
+                "SELECT content FROM rules "
+                "WHERE department = ? AND admission_year = ? AND rule_type = ?",
+                (department, admission_year, rule_type),
+            ).fetchone()
+        if row is None:
+            return None
+        return hashlib.sha1(row[0].encode("utf-8")).hexdigest(), None
+
+    def get_cached_rule(
+        self, department: str, admission_year: int, rule_type: str
+    ) -> Rule | None:
+        key = (self.db_path.absolute(), department, admission_year, rule_type)
+        with self._connect() as connection:
+            row = connection.execute(
+                "SELECT content FROM rules "
+                "WHERE department = ? AND admission_year = ? AND rule_type = ?",
+                (department, admission_year, rule_type),
+            ).fetchone()
+        if row is None:
+            _rule_cache.pop(key, None)
+            return None
+
+        cached = _rule_cache.get(key)
+        if cached is not None and cached[0] == row[0]:
+            return cached[1]
+
+        rule = RuleFactory.from_json_string(row[0]).freeze()
+        _rule_cache[key] = (row[0], rule)
+        return rule
+
+    def save_rule(
+        self,
+        department: str,
+        admission_year: int,
+        rule_type: str,
+        rule: Rule,
+        overwrite: bool = False,
+    ):
+        content = rule.model_dump_json()
+        with self._connect() as connection:
+            if overwrite:
+                connection.execute(
+                    "INSERT OR REPLACE INTO rules VALUES (?, ?, ?, ?)",
+                    (department, admission_year, rule_type, content),
+                )
+                return
+            try:
+                connection.execute(
+                    "INSERT INTO rules VALUES (?, ?, ?, ?)",
+                    (department, admission_year, rule_type, content),
+                )
+            except sqlite3.IntegrityError:
+                raise FileExistsError(
+                    f"{department} {admission_year} 學年度 {rule_type} 規則已存在"
+                )
+
+    def delete_rule(self, department: str, admission_year: int, rule_type: str) -> bool:
+        with self._connect() as connection:
+            deleted = connection.execute(
+                "DELETE FROM rules "
+                "WHERE department = ? AND admission_year = ? AND rule_type = ?",
+                (department, admission_year, rule_type),
+            ).rowcount
+        return deleted > 0
+
+    def rule_years(self, department: str, rule_type: str) -> list[int]:
+        with self._connect() as connection:
+            rows = connection.execute(
+                "SELECT admission_year, rule_type FROM rules WHERE department = ?",
+                (department,),
+            ).fetchall()
+        if not rows:
+            raise FileNotFoundError(f"找不到科系 '{department}' 對應的規則")
+        return sorted(year for year, row_type in rows if row_type == rule_type)
+
+    # ---- 審查結果 ----
+
+    def save_result(self, name: str, data: dict, created_at: datetime | None = None):
+        info = ResultBasicInfo.from_result(name, data, created_at or datetime.now())
+        with self._connect() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO results "
+                "(name, student_id, student_name, created_at, data, is_eligible, programs) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    name,
+                    info.student_id,
+                    info.student_name,
+                    info.created_at.isoformat(),
+                    dumps(data).decode(),
+                    info.is_eligible,
+                    json.dumps(info.programs),
+                ),
+            )
+
+    def query_results(self, query: ResultQuery) -> Page[ResultBasicInfo]:
+        sort_column = "name" if query.sort == "file_name" else query.sort
+        where, params = "", []
+        if query.student_id is not None:
+            where, params = "WHERE student_id = ?", [query.student_id]
+
+        with self._connect() as connection:
+            total = connection.execute(
+                f"SELECT COUNT(*) FROM results {where}", params
+            ).fetchone()[0]
+            rows = connection.execute(
+                "SELECT name, student_id, student_name, created_at, is_eligible, programs "
+                f"FROM results {where} "
+                f"ORDER BY {sort_column} {'DESC' if query.descending else 'ASC'}, name "
+                "LIMIT ? OFFSET ?",
+                [*params, -1 if query.limit is None else query.limit, query.offset],
+            ).fetchall()
+
+        return Page(
+            items=[
+                ResultBasicInfo(
+                    file_name=name,
+                    student_id=student_id,
+                    student_name=student_name,
+                    created_at=datetime.fromisoformat(created_at),
+                    is_eligible=None if is_eligible is None else bool(is_eligible),
+                    programs=json.loads(programs),
+                )
+                for name, student_id, student_name, created_at, is_eligible, programs in rows
+            ],
+            total=total,
+            offset=query.offset,
+            limit=query.limit,
+        )
+
+    def _result_column(self, name: str, column: str):
+        with self._connect() as connection:
+            row = connection.execute(
+                f"SELECT {column} FROM results WHERE name = ?", (name,)
+            ).fetchone()
+        if row is None:
+            raise FileNotFoundError(f"找不到結果: {name}")
+        return row[0]
+
+    def get_result(self, name: str) -> dict:
+        return json.loads(self._result_column(name, "data"))
+
+    def get_result_json(self, name: str) -> bytes:
+        return self._result_column(name, "data").encode()
+
+    def result_created_at(self, name: str) -> datetime:
+        return datetime.fromisoformat(self._result_column(name, "created_at"))
+
+    def delete_result(self, name: str) -> bool:
+        with self._connect() as connection:
+            deleted = connection.execute(
+                "DELETE FROM results WHERE name = ?", (name,)
+            ).rowcount
+        return deleted > 0
+
+    def delete_all_results(self) -> int:
+        with self._connect() as connection:
+            return connection.execute("DELETE FROM results").rowcount
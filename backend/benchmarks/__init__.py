@@ -0,0 +1,10 @@
+"""
+效能測試
+
+- generator: 以固定亂數種子產生學生修課資料與巢狀規則
+- run: 執行各項效能測試並輸出 JSON 結果，可與先前的結果比較以發現效能退步
+
+執行方式（於 backend 目錄）：
+    python -m benchmarks.run --students 200 --courses 60 --output bench.json
+    python -m benchmarks.run --compare bench.json
+"""
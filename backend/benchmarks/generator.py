@@ -0,0 +1,200 @@
+import json
+import random
+from pathlib import Path
+import pandas as pd
+from rule_engine.factory import RuleFactory, StudentFactory
+from rule_engine.models.course import StudentCourse
+from rule_engine.models.rule import Rule
+from rule_engine.models.student import Student
+
+DATA_DIR = Path(__file__).resolve().parents[1] / "data"
+SAMPLE_STUDENT = DATA_DIR / "students" / "AN4116089.json"
+
+# Excel 匯入的欄位（與 StudentFactory.load_students_from_excel 相同）
+EXCEL_COLUMNS = [
+    "學號",
+    "姓名",
+    "課程名稱",
+    "課程碼",
+    "學分數",
+    "成績",
+    "承抵課程別",
+    "選必修(0,1必修，2選修)",
+    "學年",
+    "學期",
+]
+
+SURNAMES = "陳林黃張李王吳劉蔡楊許鄭謝郭洪曾邱廖賴周"
+GIVEN_NAMES = "品瑞家豪怡君冠宇雅婷承翰詩涵宗翰佳穎柏宇欣妤"
+SUBJECT_WORDS = [
+    "文學",
+    "語言學",
+    "歷史",
+    "經濟學",
+    "統計",
+    "微積分",
+    "程式設計",
+    "物理",
+    "化學",
+    "管理",
+    "法律",
+    "心理學",
+]
+ORDINALS = ["（一）", "（二）", "（三）", "（四）", "概論", "導論", "專題", "實習"]
+
+
+class DataGenerator:
+    """
+    以固定亂數種子產生效能測試資料
+
+    課程的學分、成績、承抵類別、選必修與修課學期分布參考範例學生 AN4116089，
+    課程名稱與代碼一部分取自範例學生，其餘依系所代碼合成，
+    因此同一個種子每次都會產生完全相同的學生與規則。
+    """
+
+    def __init__(self, seed: int = 0):
+        self.seed = seed
+        self.random = random.Random(seed)
+
+        sample = StudentFactory.from_json_file(SAMPLE_STUDENT)
+        self.sample_courses = sample.courses
+        with open(DATA_DIR / "departments_info.json", "r", encoding="utf-8") as f:
+            self.departments = sorted(json.load(f).keys())
+
+        self.credits = [course.credit for course in sample.courses]
+        self.grades = [course.grade for course in sample.courses] + [40, 55]
+        self.categories = [course.category for course in sample.courses]
+        self.course_types = [course.course_type for course in sample.courses]
+        self.catalog = self._build_catalog(400)
+
+    def _build_catalog(self, size: int) -> list[tuple[str, str]]:
+        """課程目錄：(課程名稱, 課程代碼)，包含範例學生的課程與合成課程"""
+        catalog = {
+            (course.course_name, course.course_codes[0])
+            for course in self.sample_courses
+        }
+        while len(catalog) < size:
+            department = self.random.choice(self.departments)
+            name = self.random.choice(SUBJECT_WORDS) + self.random.choice(ORDINALS)
+            code = f"{department}{self.random.randint(10000, 99999)}"
+            catalog.add((name, code))
+        return sorted(catalog)
+
+    def course(self, year: int, semester: int) -> StudentCourse:
+        name, code = self.random.choice(self.catalog)
+        return StudentCourse(
+            course_name=name,
+            course_codes=[code],
+            credit=self.random.choice(self.credits),
+            course_type=self.random.choice(self.course_types),
+            tag=["coursera"] if self.random.random() < 0.02 else [],
+            grade=self.random.choice(self.grades),
+            category=self.random.choice(self.categories),
+            year_taken=year,
+            semester_taken=semester,
+        )
+
+    def student(self, index: int, n_courses: int = 60) -> Student:
+        """
+        產生第 index 位學生
+
+        學號格式為 系所代碼 + 1 碼序號 + 入學年度後兩碼 + 4 碼序號，
+        index 小於 100000 時不會重複
+        """
+        major = self.random.choice(self.departments)
+        admission_year = self.random.randint(108, 112)
+        student_id = (
+            f"{major}{(index // 10000) % 10}{admission_year - 100:02d}"
+            f"{index % 10000:04d}"
+        )
+        name = (
+            self.random.choice(SURNAMES)
+            + self.random.choice(GIVEN_NAMES)
+            + self.random.choice(GIVEN_NAMES)
+        )
+
+        courses = []
+        for i in range(n_courses):
+            # 大約每學期 10 門課，依序排列
+            term = i // 10
+            courses.append(self.course(admission_year + term // 2, term % 2 + 1))
+
+        return Student(name=name, id=student_id, major=major, courses=courses)
+
+    def students(self, n_students: int, n_courses: int = 60) -> list[Student]:
+        return [self.student(index, n_courses) for index in range(n_students)]
+
+    def rule_dict(self, depth: int = 3, breadth: int = 4) -> dict:
+        """產生巢狀 RuleSet / RuleAll 規則（dict 形式）"""
+        return self._rule_node("畢業規則", depth, breadth)
+
+    def rule(self, depth: int = 3, breadth: int = 4) -> Rule:
+        return RuleFactory.from_dict(self.rule_dict(depth, breadth))
+
+    def _rule_node(self, name: str, depth: int, breadth: int) -> dict:
+        if depth > 0:
+            return {
+                "name": name,
+                "rule_type": "rule_set",
+                "sub_rule_logic": "AND" if self.random.random() < 0.8 else "OR",
+                "requirement": self.random.choice(
+                    [
+                        {"type": "meaningless"},
+                        {"type": "min_credits", "min_credits": 10},
+                    ]
+                ),
+                "sub_rules": [
+                    self._rule_node(f"{name}-{i + 1}", depth - 1, breadth)
+                    for i in range(breadth)
+                ],
+            }
+
+        criteria: dict = {}
+        if self.random.random() < 0.6:
+            criteria["department_codes"] = self.random.sample(self.departments, 2)
+        if self.random.random() < 0.3:
+            criteria["course_name_pattern"] = f"^{self.random.choice(SUBJECT_WORDS)}"
+        if self.random.random() < 0.2:
+            criteria["categories"] = [" ", "X"]
+        if self.random.random() < 0.2:
+            criteria["allow_external_substitute_after_fail"] = True
+
+        rule = {"name": name, "rule_type": "rule_all", "course_criteria": criteria}
+        if self.random.random() < 0.4:
+            rule["course_list"] = [
+                course_name
+                for course_name, _ in self.random.sample(
+                    self.catalog, self.random.randint(2, 12)
+                )
+            ]
+            rule["requirement"] = {"type": "all"}
+        else:
+            rule["requirement"] = {
+                "type": "min_credits",
+                "min_credits": self.random.randint(3, 20),
+            }
+        return rule
+
+    @staticmethod
+    def write_excel(students: list[Student], file_path: Path):
+        """將學生資料寫成教務處匯出的 Excel 格式"""
+        rows = [
+            [
+                student.id,
+                student.name,
+                course.course_name,
+                course.course_codes[0],
+                course.credit,
+                course.grade,
+                course.category,
+                course.course_type,
+                course.year_taken,
+                course.semester_taken,
+            ]
+            for student in students
+            for course in student.courses
+        ]
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        pd.DataFrame(rows, columns=EXCEL_COLUMNS).to_excel(
+            file_path, index=False, engine="openpyxl"
+        )
@@ -0,0 +1,295 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from datetime import datetime
+from pathlib import Path
+from benchmarks.generator import DATA_DIR, DataGenerator
+from rule_engine.evaluator import Evaluator
+from rule_engine.factory import RuleFactory, StudentFactory
+from rule_engine.utils import UtilFunctions
+
+BENCHMARKS: dict[str, Callable[["BenchmarkContext"], Callable[[], int]]] = {}
+
+
+def benchmark(name: str):
+    """
+    註冊效能測試
+
+    被裝飾的函式負責準備資料，並返回一個可重複呼叫的函式；
+    該函式每次呼叫執行一輪測試並返回本輪完成的操作次數。
+    """
+
+    def decorator(setup: Callable[["BenchmarkContext"], Callable[[], int]]):
+        BENCHMARKS[name] = setup
+        return setup
+
+    return decorator
+
+
+class BenchmarkContext:
+    """各項效能測試共用的資料與暫存目錄"""
+
+    def __init__(self, n_students: int, n_courses: int, seed: int, work_dir: Path):
+        self.n_students = n_students
+        self.n_courses = n_courses
+        self.seed = seed
+        self.work_dir = work_dir
+
+        generator = DataGenerator(seed)
+        self.students = generator.students(n_students, n_courses)
+        self.rule = generator.rule()
+        self.rule_files = sorted((DATA_DIR / "rules").glob("*/*.json"))
+
+        self.generated_rule_file = work_dir / "generated_rule.json"
+        with open(self.generated_rule_file, "w", encoding="utf-8") as f:
+            json.dump(generator.rule_dict(), f, ensure_ascii=False)
+
+        self.excel_file = work_dir / "students.xlsx"
+        DataGenerator.write_excel(self.students, self.excel_file)
+
+
+@benchmark("evaluator.evaluate")
+def bench_evaluate(ctx: BenchmarkContext) -> Callable[[], int]:
+    evaluator = Evaluator()
+    rules = [ctx.rule] + [RuleFactory.from_json_file(f) for f in ctx.rule_files]
+
+    def run() -> int:
+        for student in ctx.students:
+            for rule in rules:
+                evaluator.evaluate(rule, student.courses)
+        return len(ctx.students) * len(rules)
+
+    return run
+
+
+@benchmark("utils.match_criteria")
+def bench_match_criteria(ctx: BenchmarkContext) -> Callable[[], int]:
+    criteria_list = []
+
+    def collect(rule):
+        if rule.rule_type == "rule_all":
+            criteria_list.append(rule.course_criteria)
+        else:
+            for sub_rule in rule.sub_rules:
+                collect(sub_rule)
+
+    collect(ctx.rule)
+    courses = [course for student in ctx.students for course in student.courses]
+
+    def run() -> int:
+        for criteria in criteria_list:
+            for course in courses:
+                UtilFunctions.match_criteria(course, criteria)
+        return len(criteria_list) * len(courses)
+
+    return run
+
+
+@benchmark("rule_factory.from_json_file")
+def bench_rule_from_json(ctx: BenchmarkContext) -> Callable[[], int]:
+    rule_files = ctx.rule_files + [ctx.generated_rule_file]
+
+    def run() -> int:
+        for rule_file in rule_files:
+            RuleFactory.from_json_file(rule_file)
+        return len(rule_files)
+
+    return run
+
+
+@benchmark("student_factory.load_students_from_excel")
+def bench_load_excel(ctx: BenchmarkContext) -> Callable[[], int]:
+    output_dir = ctx.work_dir / "excel_students"
+
+    def run() -> int:
+        # 未指定科系時學生資料無法通過驗證，因此指定一個預設科系
+        students = StudentFactory.load_students_from_excel(
+            ctx.excel_file, output_dir, major="AN"
+        )
+        return len(students)
+
+    return run
+
+
+@benchmark("student_factory.load_students_from_excel_vectorized")
+def bench_load_excel_vectorized(ctx: BenchmarkContext) -> Callable[[], int]:
+    output_dir = ctx.work_dir / "excel_students_vectorized"
+
+    def run() -> int:
+        students, _ = StudentFactory.load_students_from_excel_vectorized(
+            ctx.excel_file, output_dir, major="AN"
+        )
+        return len(students)
+
+    return run
+
+
+@benchmark("api.review")
+def bench_api_review(ctx: BenchmarkContext) -> Callable[[], int]:
+    """透過本機 ASGI client 呼叫 POST /review/{student_id}（不使用結果快取）"""
+    from fastapi.testclient import TestClient
+    from api.executors import shutdown_process_pools
+    from api.main import app
+
+    # API 以目前目錄下的 data/ 為資料目錄
+    api_dir = ctx.work_dir / "api"
+    shutil.copytree(DATA_DIR / "rules", api_dir / "data" / "rules")
+    shutil.copy(DATA_DIR / "departments_info.json", api_dir / "data")
+    # 產生的學生沒有對應的規則，以範例學生（不分系）進行審查
+    student_ids = []
+    for student in ctx.students:
+        student = student.model_copy(
+            update={"major": "AN", "id": f"AN{student.id[2:]}"}
+        )
+        StudentFactory.save_student_to_json(
+            student, api_dir / "data" / "students" / f"{student.id}.json"
+        )
+        student_ids.append(student.id)
+
+    # 審查在計算行程池中執行：以環境變數關閉 worker 行程的結果快取，
+    # 行程池在暖身時以 api_dir 為工作目錄重新建立
+    os.environ["GRADUATION_REVIEW_CACHE_SIZE"] = "0"
+    os.environ.pop("GRADUATION_REVIEW_CACHE_DIR", None)
+    shutdown_process_pools()
+    client = TestClient(app)
+
+    def run() -> int:
+        cwd = os.getcwd()
+        os.chdir(api_dir)
+        try:
+            for student_id in student_ids:
+                response = client.post(f"/review/{student_id}", params={"minor": "B5"})
+                response.raise_for_status()
+        finally:
+            os.chdir(cwd)
+        return len(student_ids)
+
+    return run
+
+
+def run_benchmarks(
+    n_students: int = 100,
+    n_courses: int = 60,
+    repeat: int = 5,
+    seed: int = 0,
+    selected: list[str] | None = None,
+) -> dict:
+    """
+    執行效能測試
+
+    Returns:
+        dict: 可直接輸出為 JSON 的結果，benchmarks 中每項包含每輪耗時統計與每秒操作數
+    """
+    names = selected or list(BENCHMARKS)
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        raise ValueError(f"未知的效能測試：{', '.join(unknown)}")
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        ctx = BenchmarkContext(n_students, n_courses, seed, Path(tmp))
+        for name in names:
+            run = BENCHMARKS[name](ctx)
+            run()  # 暖身（編譯正規表示式、匯入模組等）
+            timings = []
+            ops = 0
+            for _ in range(repeat):
+                start = time.perf_counter()
+                ops = run()
+                timings.append(time.perf_counter() - start)
+            median = statistics.median(timings)
+            results.append(
+                {
+                    "name": name,
+                    "repeat": repeat,
+                    "ops": ops,
+                    "min_s": min(timings),
+                    "median_s": median,
+                    "mean_s": statistics.fmean(timings),
+                    "max_s": max(timings),
+                    "ops_per_s": ops / median if median > 0 else None,
+                }
+            )
+
+    return {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "students": n_students,
+            "courses": n_courses,
+            "repeat": repeat,
+            "seed": seed,
+        },
+        "benchmarks": results,
+    }
+
+
+def compare_results(current: dict, baseline: dict, threshold: float) -> list[str]:
+    """
+    與先前的結果比較
+
+    Returns:
+        list[str]: 中位數耗時比基準慢超過 threshold（比例）的效能測試說明
+    """
+    baseline_by_name = {item["name"]: item for item in baseline["benchmarks"]}
+    regressions = []
+    for item in current["benchmarks"]:
+        base = baseline_by_name.get(item["name"])
+        if base is None or base["ops"] != item["ops"] or base["median_s"] <= 0:
+            continue
+        ratio = item["median_s"] / base["median_s"]
+        if ratio > 1 + threshold:
+            regressions.append(
+                f"{item['name']}: {base['median_s'] * 1000:.2f} ms -> "
+                f"{item['median_s'] * 1000:.2f} ms ({ratio:.2f}x)"
+            )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="畢業審查系統效能測試")
+    parser.add_argument("--students", type=int, default=100, help="產生的學生人數")
+    parser.add_argument("--courses", type=int, default=60, help="每位學生的修課數")
+    parser.add_argument("--repeat", type=int, default=5, help="每項測試的執行輪數")
+    parser.add_argument("--seed", type=int, default=0, help="資料產生器的亂數種子")
+    parser.add_argument(
+        "--only", nargs="*", choices=list(BENCHMARKS), help="只執行指定的測試"
+    )
+    parser.add_argument("--output", type=Path, help="將結果寫入 JSON 檔案")
+    parser.add_argument("--compare", type=Path, help="與先前輸出的 JSON 結果比較")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="比較時視為效能退步的變慢比例（預設 0.2 即 20%%）",
+    )
+    args = parser.parse_args()
+
+    results = run_benchmarks(
+        args.students, args.courses, args.repeat, args.seed, args.only
+    )
+    output = json.dumps(results, ensure_ascii=False, indent=2)
+    if args.output:
+        args.output.write_text(output, encoding="utf-8")
+    print(output)
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        regressions = compare_results(results, baseline, args.threshold)
+        if regressions:
+            print("效能退步：", file=sys.stderr)
+            for line in regressions:
+                print(f"  {line}", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
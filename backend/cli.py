@@ -1,10 +1,14 @@
 import os
 import sys
+import argparse
 import json
 from pathlib import Path
 from datetime import datetime
 from rule_engine.factory import StudentFactory, RuleFactory
 from rule_engine.evaluator import Evaluator
+from rule_engine.departments import department_registry
+from rule_engine.excel_stream import ExcelStudentStream
+from rule_engine.profiler import EvaluationProfiler
 from rule_engine.utils import UtilFunctions
 from rule_engine.models.student import Student
 from rule_engine.models.rule import *
@@ -12,9 +16,11 @@ from rule_engine.models.result import Result, SetResult, AllResult
 
 
 class GraduationSystemCLI:
-    def __init__(self):
+    def __init__(self, profile: bool = False):
         self.students: dict[str, Student] = {}
         self.evaluator = Evaluator()
+        # 是否在審查後顯示每個規則節點的效能分析
+        self.profile = profile
         self.students_dir = Path("data/students")
         self.rules_dir = Path("data/rules")
 
@@ -69,10 +75,19 @@ class GraduationSystemCLI:
 
         try:
             print("正在載入學生資料...")
-            self.students = StudentFactory.load_students_from_excel(
-                input_path, output_path, major
-            )
+            # 串流讀取 Excel，每讀完一位學生就存檔
+            stream = ExcelStudentStream(input_path, major)
+            self.students = {}
+            for student in stream:
+                StudentFactory.save_student_to_json(
+                    student, output_path / f"{student.id}.json"
+                )
+                self.students[student.id] = student
             print(f"✅ 學生資料載入完成，共載入 {len(self.students)} 位學生")
+            if stream.errors:
+                print(f"⚠️ {len(stream.errors)} 列資料有誤已略過：")
+                for error in stream.errors:
+                    print(f"  第 {error.row} 列：{'；'.join(error.errors)}")
         except Exception as e:
             print(f"❌ 載入失敗：{e}")
 
@@ -258,7 +273,7 @@ class GraduationSystemCLI:
         try:
             rule = RuleFactory.from_json_file(selected_rule_file)
             dept_code = selected_rule_file.parent.name
-            dept_codes_in_college = UtilFunctions().get_department_code(dept_code)
+            dept_codes_in_college = department_registry.same_college(dept_code)
             print(f"✅ 成功載入規則：{selected_rule_file}")
             return (rule, dept_codes_in_college)
 
@@ -491,6 +506,17 @@ class GraduationSystemCLI:
         elif result.result_type == "rule_all":
             course_list.extend(result.finished_course_list)
 
+    def display_profile(self, profiler: EvaluationProfiler):
+        """顯示規則評估效能分析"""
+        print("\n--- 規則效能分析 ---")
+        print(profiler.format_report())
+        print("\n耗時最多的規則：")
+        for entry in profiler.hottest(5):
+            print(
+                f"  {entry.wall_time * 1000:.3f} ms  {entry.path}"
+                f"（候選 {entry.candidates}，比對 {entry.match_calls}，符合 {entry.matches}）"
+            )
+
     def perform_evaluation(self, student: Student, rule: Rule):
         """執行畢業審查評估"""
         print(f"\n--- 執行畢業審查 ---")
@@ -501,11 +527,16 @@ class GraduationSystemCLI:
         try:
             # 執行評估
             print("正在進行畢業審查...")
-            result = self.evaluator.evaluate(rule, student.courses)
+            profiler = EvaluationProfiler() if self.profile else None
+            evaluator = Evaluator(profiler) if profiler else self.evaluator
+            result = evaluator.evaluate(rule, student.courses)
 
             # 顯示詳細結果
             self.display_evaluation_result(student, rule, result)
 
+            if profiler:
+                self.display_profile(profiler)
+
             # 顯示統計摘要
             self.display_summary_statistics(student, result)
 
@@ -544,3 +575,19 @@ class GraduationSystemCLI:
                 print("❌ 無效的選項，請重新選擇")
 
             input("\n按 Enter 繼續...")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="畢業審查系統 CLI")
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="審查後顯示每個規則節點的耗時、候選課程數與比對次數",
+    )
+    args = parser.parse_args()
+
+    GraduationSystemCLI(profile=args.profile).run()
+
+
+if __name__ == "__main__":
+    main()
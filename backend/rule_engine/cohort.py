@@ -0,0 +1,424 @@
+import re
+import numpy as np
+from rule_engine.models.course import StudentCourse
+from rule_engine.models.rule import *
+from rule_engine.models.student import Student
+from rule_engine.record import CourseRecord, AllRecord, SetRecord, ResultRecord
+from rule_engine.utils import UtilFunctions
+
+
+class CohortCourses:
+    """
+    多位學生修課資料的欄式（columnar）表示
+
+    每一列為一門學生課程，依學生順序串接；課程代碼與課程標籤另外攤平成
+    (擁有課程列, 值) 的陣列，供向量化比對使用。
+    """
+
+    def __init__(self, students: list[Student]):
+        self.students = students
+        self.courses: list[StudentCourse] = [
+            course for student in students for course in student.courses
+        ]
+        size = len(self.courses)
+
+        self.student = np.repeat(
+            np.arange(len(students), dtype=np.int64),
+            [len(student.courses) for student in students],
+        )
+        self.credit = np.fromiter(
+            (c.credit for c in self.courses), dtype=np.float64, count=size
+        )
+        self.grade = np.fromiter(
+            (c.grade for c in self.courses), dtype=np.int64, count=size
+        )
+        self.course_type = np.fromiter(
+            (c.course_type for c in self.courses), dtype=np.int64, count=size
+        )
+        self.year_taken = np.fromiter(
+            (c.year_taken for c in self.courses), dtype=np.int64, count=size
+        )
+        self.semester_taken = np.fromiter(
+            (c.semester_taken for c in self.courses), dtype=np.int64, count=size
+        )
+
+        # 課程名稱與承抵類別以代號表示，字串比對只需在不重複值上做一次
+        self.names, self.name_id = self._encode(c.course_name for c in self.courses)
+        self.categories, self.category_id = self._encode(
+            c.category for c in self.courses
+        )
+        name_rank = np.empty(len(self.names), dtype=np.int64)
+        name_rank[sorted(range(len(self.names)), key=self.names.__getitem__)] = (
+            np.arange(len(self.names))
+        )
+
+        # 攤平的課程代碼（每門課至少一個代碼）
+        code_counts = [len(c.course_codes) for c in self.courses]
+        self.code_start = np.concatenate(([0], np.cumsum(code_counts)[:-1])).astype(
+            np.int64
+        )
+        self.codes, self.code_id = self._encode(
+            code for c in self.courses for code in c.course_codes
+        )
+
+        # 攤平的課程標籤（課程可以沒有標籤）
+        self.tag_owner = np.repeat(
+            np.arange(size, dtype=np.int64), [len(c.tag) for c in self.courses]
+        )
+        self.tags, self.tag_id = self._encode(
+            tag for c in self.courses for tag in c.tag
+        )
+
+        # 與單一學生評估相同的排序：(學生, 課程名稱, 學年, 學期, 成績, 原始順序)
+        self.order = np.lexsort(
+            (
+                self.grade,
+                self.semester_taken,
+                self.year_taken,
+                name_rank[self.name_id],
+                self.student,
+            )
+        )
+
+    @staticmethod
+    def _encode(values) -> tuple[list[str], np.ndarray]:
+        vocabulary: dict[str, int] = {}
+        ids = [vocabulary.setdefault(value, len(vocabulary)) for value in values]
+        return list(vocabulary), np.asarray(ids, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self.courses)
+
+
+class CohortEvaluator:
+    """
+    以 NumPy 向量化方式一次評估整批學生
+
+    每個 RuleAll 的篩選條件會轉換成整批課程的布林遮罩，學分與門數以分組加總計算；
+    需要依序處理的情況（外系承抵、course_list 中有重複課程）則在各學生的候選課程上
+    逐筆處理。輸出與逐一呼叫 Evaluator.evaluate 的結果相同。
+    """
+
+    def __init__(self):
+        self._status_cache: dict[int, str] = {}
+
+    def evaluate(self, rule: Rule, students: list[Student]) -> list[ResultRecord]:
+        cohort = CohortCourses(students)
+        recognized = np.zeros(len(cohort), dtype=bool)
+        try:
+            return self._evaluate_rule(rule, cohort, recognized)
+        except Exception as e:
+            raise TypeError(f"未知的規則類型：{rule.rule_type}") from e
+
+    def _evaluate_rule(
+        self, rule: Rule, cohort: CohortCourses, recognized: np.ndarray
+    ) -> list[ResultRecord]:
+        if isinstance(rule, RuleSet):
+            return self._evaluate_set(rule, cohort, recognized)
+        if isinstance(rule, RuleAll):
+            return self._evaluate_all(rule, cohort, recognized)
+        raise TypeError(f"未知的規則類型：{rule.rule_type}")
+
+    def _evaluate_set(
+        self, rule: RuleSet, cohort: CohortCourses, recognized: np.ndarray
+    ) -> list[ResultRecord]:
+        sub_results_by_rule = [
+            self._evaluate_rule(sub_rule, cohort, recognized)
+            for sub_rule in rule.sub_rules
+        ]
+        combine = all if rule.sub_rule_logic == "AND" else any
+
+        results: list[ResultRecord] = []
+        for student_index in range(len(cohort.students)):
+            result = SetRecord(rule.name, rule.description, rule.sub_rule_logic)
+            result.sub_results = [sub[student_index] for sub in sub_results_by_rule]
+            result.is_valid = combine(sub.is_valid for sub in result.sub_results)
+            result.earned_credits = sum(
+                sub.earned_credits for sub in result.sub_results
+            )
+            results.append(result)
+        return results
+
+    def _evaluate_all(
+        self, rule: RuleAll, cohort: CohortCourses, recognized: np.ndarray
+    ) -> list[ResultRecord]:
+        student_count = len(cohort.students)
+        criteria_mask = self._criteria_mask(rule.course_criteria, cohort)
+        name_mask = self._course_list_mask(rule.course_list, cohort)
+        candidates = ~recognized & name_mask
+
+        course_list = rule.course_list
+        sequential = rule.course_criteria.allow_external_substitute_after_fail or (
+            course_list is not None and len(set(course_list)) != len(course_list)
+        )
+
+        # finished[i]: 第 i 位學生依序被承認的課程列；substituted 為外系承抵的課程列
+        substituted: set[int] = set()
+        if sequential:
+            loose_mask = self._criteria_mask(rule.course_criteria, cohort, grade=60)
+            finished = self._match_sequential(
+                rule,
+                cohort,
+                recognized,
+                candidates,
+                criteria_mask,
+                loose_mask,
+                substituted,
+            )
+            rows = np.fromiter(
+                (row for student_rows in finished for row in student_rows),
+                dtype=np.int64,
+            )
+        else:
+            matched = candidates & criteria_mask
+            recognized |= matched
+            rows = cohort.order[matched[cohort.order]]
+            finished = self._split_by_student(cohort, rows)
+
+        # 分組加總每位學生的學分與門數
+        owners = cohort.student[rows]
+        total_credits = np.bincount(
+            owners, weights=cohort.credit[rows], minlength=student_count
+        )
+        total_courses = np.bincount(owners, minlength=student_count)
+        is_valid, earned_credits = self._apply_requirement(
+            rule, total_credits, total_courses
+        )
+
+        results: list[ResultRecord] = []
+        for student_index in range(student_count):
+            result = AllRecord(rule.name, rule.description, course_list)
+            result.is_valid = is_valid[student_index]
+            result.earned_credits = earned_credits[student_index]
+            result.finished_course_list = [
+                self._result_course(
+                    cohort.courses[row], "外系承抵" if row in substituted else None
+                )
+                for row in finished[student_index]
+            ]
+            results.append(result)
+        return results
+
+    def _match_sequential(
+        self,
+        rule: RuleAll,
+        cohort: CohortCourses,
+        recognized: np.ndarray,
+        candidates: np.ndarray,
+        criteria_mask: np.ndarray,
+        loose_mask: np.ndarray,
+        substituted: set[int],
+    ) -> list[list[int]]:
+        """逐一處理每位學生的候選課程，規則與 RuleAllEvaluator 相同"""
+        allow_substitute = rule.course_criteria.allow_external_substitute_after_fail
+        candidate_rows = cohort.order[candidates[cohort.order]]
+        name_id = cohort.name_id
+        grade = cohort.grade
+
+        finished: list[list[int]] = []
+        for rows in self._split_by_student(cohort, candidate_rows):
+            if rule.course_list is not None:
+                # 依 course_list 順序（含重複）展開後再穩定排序
+                by_name: dict[str, list[int]] = {}
+                for row in sorted(rows):
+                    by_name.setdefault(cohort.names[name_id[row]], []).append(row)
+                rows = [
+                    row
+                    for course_name in rule.course_list
+                    for row in by_name.get(course_name, [])
+                ]
+                rows.sort(
+                    key=lambda r: (
+                        cohort.names[name_id[r]],
+                        cohort.year_taken[r],
+                        cohort.semester_taken[r],
+                        grade[r],
+                    )
+                )
+
+            student_finished: list[int] = []
+            finished.append(student_finished)
+            i = 0
+            while i < len(rows):
+                row = rows[i]
+                if criteria_mask[row]:
+                    student_finished.append(row)
+                    recognized[row] = True
+                    i += 1
+                elif allow_substitute and grade[row] < 60:
+                    j = i + 1
+                    while j < len(rows) and name_id[rows[j]] == name_id[row]:
+                        j += 1
+                    same_name_rows = rows[i + 1 : j]
+                    has_passing = any(grade[r] >= 60 for r in same_name_rows)
+                    if has_passing and loose_mask[row]:
+                        student_finished.append(row)
+                        substituted.add(row)
+                        recognized[same_name_rows] = True
+                        i = j
+                        continue
+                    i += 1
+                else:
+                    i += 1
+        return finished
+
+    @staticmethod
+    def _split_by_student(cohort: CohortCourses, rows: np.ndarray) -> list[list[int]]:
+        """將依學生排序的課程列切分為每位學生一個列表"""
+        bounds = np.searchsorted(
+            cohort.student[rows], np.arange(len(cohort.students) + 1)
+        ).tolist()
+        return [
+            rows[bounds[i] : bounds[i + 1]].tolist()
+            for i in range(len(cohort.students))
+        ]
+
+    def _course_list_mask(
+        self, course_list: list[str] | None, cohort: CohortCourses
+    ) -> np.ndarray:
+        if course_list is None:
+            return np.ones(len(cohort), dtype=bool)
+        required = set(course_list)
+        name_ok = np.array([name in required for name in cohort.names], dtype=bool)
+        return name_ok[cohort.name_id]
+
+    def _criteria_mask(
+        self, criteria: CourseCriteria, cohort: CohortCourses, grade: int | None = None
+    ) -> np.ndarray:
+        """將篩選條件轉換為整批課程的布林遮罩，語意同 CriteriaMatcher.match"""
+        size = len(cohort)
+        mask = np.ones(size, dtype=bool)
+        if size == 0:
+            return mask
+
+        # 成績條件（指定 grade 時以該成績取代所有課程的成績）
+        min_grade = 0 if criteria.allow_fail else 60
+        if grade is None:
+            grades = cohort.grade
+            mask &= ((grades >= min_grade) & (grades <= 100)) | np.isin(
+                grades, (555, 999)
+            )
+        elif not (min_grade <= grade <= 100) and grade not in (555, 999):
+            return np.zeros(size, dtype=bool)
+
+        if criteria.course_types:
+            mask &= np.isin(cohort.course_type, criteria.course_types)
+
+        if criteria.categories:
+            allowed = set(criteria.categories)
+            category_ok = np.array(
+                [category in allowed for category in cohort.categories], dtype=bool
+            )
+            mask &= category_ok[cohort.category_id]
+
+        if criteria.tags:
+            for tag in criteria.tags:
+                has_tag = np.zeros(size, dtype=bool)
+                if tag in cohort.tags:
+                    tag_id = cohort.tags.index(tag)
+                    has_tag[cohort.tag_owner[cohort.tag_id == tag_id]] = True
+                mask &= has_tag
+
+        # 系所條件
+        if criteria.department_codes:
+            mask &= self._any_code(cohort, tuple(criteria.department_codes))
+            if criteria.blacklist_courses:
+                blacklist = tuple(criteria.blacklist_courses)
+                mask &= ~self._name_predicate(cohort, lambda name: name in blacklist)
+
+        if criteria.exclude_department_codes:
+            excluded = self._any_code(cohort, tuple(criteria.exclude_department_codes))
+            if criteria.whitelist_courses:
+                whitelist = tuple(criteria.whitelist_courses)
+                excluded &= self._name_predicate(
+                    cohort, lambda name: name not in whitelist
+                )
+            mask &= ~excluded
+
+        # 課程代碼模式（所有代碼都需符合）
+        if criteria.course_code_pattern:
+            pattern = re.compile(criteria.course_code_pattern)
+            code_ok = np.array(
+                [pattern.match(code) is not None for code in cohort.codes], dtype=bool
+            )
+            mask &= np.logical_and.reduceat(code_ok[cohort.code_id], cohort.code_start)
+
+        # 課程名稱模式
+        if criteria.course_name_pattern:
+            pattern = re.compile(criteria.course_name_pattern)
+            mask &= self._name_predicate(
+                cohort, lambda name: pattern.match(name) is not None
+            )
+
+        return mask
+
+    @staticmethod
+    def _any_code(cohort: CohortCourses, prefixes: tuple[str, ...]) -> np.ndarray:
+        code_ok = np.array(
+            [code.startswith(prefixes) for code in cohort.codes], dtype=bool
+        )
+        return np.logical_or.reduceat(code_ok[cohort.code_id], cohort.code_start)
+
+    @staticmethod
+    def _name_predicate(cohort: CohortCourses, predicate) -> np.ndarray:
+        name_ok = np.array([predicate(name) for name in cohort.names], dtype=bool)
+        return name_ok[cohort.name_id]
+
+    @staticmethod
+    def _apply_requirement(
+        rule: RuleAll, total_credits: np.ndarray, total_courses: np.ndarray
+    ) -> tuple[list[bool], list[float]]:
+        """向量化的 UtilFunctions.apply_requirement（RuleAll 部分）"""
+        requirement = rule.requirement
+        match requirement.type:
+            case RequirementType.ALL | RequirementType.PREREQUISITE:
+                assert rule.course_list is not None
+                is_valid = total_courses == len(rule.course_list)
+                earned = (
+                    total_credits
+                    if requirement.type == RequirementType.ALL
+                    else np.zeros_like(total_credits)
+                )
+            case RequirementType.MIN_CREDITS:
+                is_valid = total_credits >= (requirement.min_credits or 0)
+                earned = total_credits
+            case RequirementType.MAX_CREDITS:
+                is_valid = np.ones(len(total_credits), dtype=bool)
+                earned = np.where(
+                    total_credits > (requirement.max_credits or float("inf")),
+                    requirement.max_credits or 0,
+                    total_credits,
+                )
+            case RequirementType.MIN_COURSES:
+                is_valid = total_courses >= (requirement.min_courses or 0)
+                earned = total_credits
+            case RequirementType.MAX_COURSES:
+                is_valid = np.ones(len(total_credits), dtype=bool)
+                earned = np.where(
+                    total_courses > (requirement.max_courses or float("inf")),
+                    requirement.max_courses or 0,
+                    total_credits,
+                )
+            case RequirementType.CREDIT_RANGE:
+                if requirement.min_credits is None or requirement.max_credits is None:
+                    raise ValueError(
+                        "學分區間需求需要同時指定 min_credits 與 max_credits"
+                    )
+                is_valid = (requirement.min_credits <= total_credits) & (
+                    total_credits <= requirement.max_credits
+                )
+                earned = np.minimum(
+                    np.maximum(total_credits, requirement.min_credits),
+                    requirement.max_credits,
+                )
+            case _:
+                raise ValueError(f"未知的需求類型: {requirement.type}")
+        return is_valid.tolist(), earned.astype(np.float64).tolist()
+
+    def _result_course(self, course: StudentCourse, status: str | None) -> CourseRecord:
+        if status is None:
+            status = self._status_cache.get(course.grade)
+            if status is None:
+                status = UtilFunctions.get_status(course.grade)
+                self._status_cache[course.grade] = status
+        return CourseRecord.from_student_course(course, status)
@@ -0,0 +1,42 @@
+from collections.abc import Sequence
+from rule_engine.models.course import StudentCourse
+from rule_engine.models.rule import CourseCriteria
+from rule_engine.course_index import CourseIndex
+from rule_engine.profiler import EvaluationProfiler
+
+
+class EvaluationContext:
+    """
+    單次評估的狀態
+
+    「課程是否已被承認」以課程位置為索引記錄在 recognized（bytearray）中，
+    不再寫回 StudentCourse.recognized，因此學生資料在評估過程中不會被修改，
+    同一位學生可以同時（或在多個執行緒中）對不同規則進行評估。
+    profiler 不為 None 時，評估器會將每個規則節點的效能紀錄寫入其中。
+    """
+
+    __slots__ = ("courses", "index", "recognized", "profiler")
+
+    def __init__(
+        self,
+        courses: Sequence[StudentCourse],
+        index: CourseIndex | None = None,
+        profiler: EvaluationProfiler | None = None,
+    ):
+        self.courses = courses
+        # 索引建立後不會再變動，可在同一位學生的多次評估間共用
+        self.index = index if index is not None else CourseIndex(courses)
+        self.recognized = bytearray(len(courses))
+        self.profiler = profiler
+
+    def is_recognized(self, position: int) -> bool:
+        return bool(self.recognized[position])
+
+    def mark_recognized(self, position: int):
+        self.recognized[position] = 1
+
+    def candidates(
+        self, course_list: list[str] | None, criteria: CourseCriteria
+    ) -> list[int]:
+        """取得尚未被承認的候選課程位置，已依 (課程名稱, 學年, 學期, 成績) 排序"""
+        return self.index.candidate_positions(course_list, criteria, self.recognized)
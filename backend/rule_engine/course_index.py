@@ -0,0 +1,129 @@
+from collections.abc import Sequence
+from rule_engine.models.course import StudentCourse
+from rule_engine.models.rule import CourseCriteria
+
+# 系所代碼長度（departments_info.json 中皆為兩碼）
+DEPARTMENT_PREFIX_LENGTH = 2
+
+
+class CourseIndex:
+    """
+    學生修課索引
+
+    每次評估只建立一次，依課程名稱、系所前綴（課程代碼前兩碼）與承抵類別記錄課程位置，
+    讓規則樹中的每個 RuleAll 都能直接取得候選課程，而不必重新掃描整份修課列表。
+    """
+
+    __slots__ = (
+        "courses",
+        "_sort_keys",
+        "_by_name",
+        "_by_department",
+        "_by_category",
+    )
+
+    def __init__(self, courses: Sequence[StudentCourse]):
+        self.courses = courses
+        self._sort_keys: list[tuple] = []
+        self._by_name: dict[str, list[int]] = {}
+        self._by_department: dict[str, list[int]] = {}
+        self._by_category: dict[str, list[int]] = {}
+
+        for position, course in enumerate(courses):
+            self._sort_keys.append(
+                (
+                    course.course_name,
+                    course.year_taken,
+                    course.semester_taken,
+                    course.grade,
+                )
+            )
+            self._by_name.setdefault(course.course_name, []).append(position)
+            self._by_category.setdefault(course.category, []).append(position)
+            departments = {
+                code[:DEPARTMENT_PREFIX_LENGTH] for code in course.course_codes
+            }
+            for department in departments:
+                self._by_department.setdefault(department, []).append(position)
+
+    def positions_by_name(self, course_name: str) -> list[int]:
+        return self._by_name.get(course_name, [])
+
+    def positions_by_department(self, department_code: str) -> list[int]:
+        return self._by_department.get(department_code[:DEPARTMENT_PREFIX_LENGTH], [])
+
+    def positions_by_category(self, category: str) -> list[int]:
+        return self._by_category.get(category, [])
+
+    def _narrow_positions(self, criteria: CourseCriteria) -> list[int] | None:
+        """
+        依篩選條件中的系所與承抵類別縮小候選範圍
+
+        Returns:
+            依原始順序排列的課程位置，若條件無法用於縮小範圍則返回 None
+        """
+        # 外系承抵需要看到同名的外系課程，不能預先依條件排除
+        if criteria.allow_external_substitute_after_fail:
+            return None
+
+        narrowed: set[int] | None = None
+        if criteria.department_codes and all(
+            len(dept) >= DEPARTMENT_PREFIX_LENGTH for dept in criteria.department_codes
+        ):
+            narrowed = set()
+            for dept in criteria.department_codes:
+                narrowed.update(self.positions_by_department(dept))
+
+        if criteria.categories:
+            by_category: set[int] = set()
+            for category in criteria.categories:
+                by_category.update(self.positions_by_category(category))
+            narrowed = by_category if narrowed is None else narrowed & by_category
+
+        if narrowed is None:
+            return None
+        return sorted(narrowed)
+
+    def candidate_positions(
+        self,
+        course_list: list[str] | None,
+        criteria: CourseCriteria,
+        recognized: bytearray | None = None,
+    ) -> list[int]:
+        """
+        取得 RuleAll 的候選課程位置，並依 (課程名稱, 修課學年, 修課學期, 成績) 排序
+
+        Args:
+            course_list: 規則的課程列表
+            criteria: 課程篩選條件
+            recognized: 以課程位置為索引的已承認標記，已承認的課程不列入候選
+        """
+        if course_list is not None:
+            positions = [
+                position
+                for course_name in course_list
+                for position in self.positions_by_name(course_name)
+            ]
+        else:
+            narrowed = self._narrow_positions(criteria)
+            positions = (
+                narrowed if narrowed is not None else list(range(len(self.courses)))
+            )
+
+        if recognized is not None:
+            positions = [p for p in positions if not recognized[p]]
+        positions.sort(key=self._sort_keys.__getitem__)
+        return positions
+
+    def candidates(
+        self,
+        course_list: list[str] | None,
+        criteria: CourseCriteria,
+        recognized: bytearray | None = None,
+    ) -> list[StudentCourse]:
+        """同 candidate_positions，但返回課程本身"""
+        courses = self.courses
+        return [
+            courses[p]
+            for p in self.candidate_positions(course_list, criteria, recognized)
+        ]
@@ -0,0 +1,139 @@
+import json
+import threading
+from pathlib import Path
+
+
+class DepartmentSnapshot:
+    """某一版 departments_info.json 的內容與預先計算的對照表（唯讀）"""
+
+    __slots__ = ("stamp", "departments", "college_of", "departments_of")
+
+    def __init__(
+        self,
+        stamp: tuple[int, int],
+        departments: dict[str, dict[str, str]],
+        college_of: dict[str, str],
+        departments_of: dict[str, tuple[str, ...]],
+    ):
+        # 檔案的 (修改時間, 大小)，改變時重新載入
+        self.stamp = stamp
+        # 系所代碼 -> {"name_zh_tw", "name_en", "college"}
+        self.departments = departments
+        # 系所代碼 -> 學院名稱
+        self.college_of = college_of
+        # 學院名稱 -> 該學院的系所代碼（依檔案中的順序）
+        self.departments_of = departments_of
+
+    @classmethod
+    def from_file(cls, path: Path, stamp: tuple[int, int]) -> "DepartmentSnapshot":
+        try:
+            departments = json.loads(path.read_text(encoding="utf-8"))
+        except json.JSONDecodeError:
+            raise ValueError("departments_info.json 檔案格式錯誤")
+        except Exception as e:
+            raise IOError(f"讀取 departments_info.json 檔案時發生錯誤: {e}")
+
+        college_of: dict[str, str] = {}
+        departments_of: dict[str, list[str]] = {}
+        for code, info in departments.items():
+            college = info.get("college")
+            if college is None:
+                continue
+            college_of[code] = college
+            departments_of.setdefault(college, []).append(code)
+
+        return cls(
+            stamp=stamp,
+            departments=departments,
+            college_of=college_of,
+            departments_of={
+                college: tuple(codes) for college, codes in departments_of.items()
+            },
+        )
+
+
+# 已載入的系所資料：檔案絕對路徑 -> DepartmentSnapshot
+_snapshots: dict[Path, DepartmentSnapshot] = {}
+_lock = threading.Lock()
+
+
+class DepartmentRegistry:
+    """
+    系所與學院查詢
+
+    departments_info.json 只在第一次使用或檔案變動（修改時間或大小改變）時讀取，
+    並預先建立系所 -> 學院與學院 -> 系所的對照表。
+    path 為相對路徑時依目前的工作目錄解析。
+    """
+
+    def __init__(self, path: Path = Path("data/departments_info.json")):
+        self.path = path
+
+    def stamp(self) -> tuple[int, int] | None:
+        """檔案目前的 (修改時間, 大小)，不讀取檔案內容；檔案不存在時返回 None"""
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def snapshot(self) -> DepartmentSnapshot:
+        """
+        取得目前的系所資料（唯讀）
+
+        Raises:
+            FileNotFoundError: 找不到 departments_info.json
+            ValueError: 檔案格式錯誤
+        """
+        path = self.path.absolute()
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            _snapshots.pop(path, None)
+            raise FileNotFoundError("找不到 departments_info.json 檔案")
+
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        snapshot = _snapshots.get(path)
+        if snapshot is not None and snapshot.stamp == stamp:
+            return snapshot
+
+        with _lock:
+            snapshot = _snapshots.get(path)
+            if snapshot is None or snapshot.stamp != stamp:
+                snapshot = DepartmentSnapshot.from_file(path, stamp)
+                _snapshots[path] = snapshot
+        return snapshot
+
+    def departments(self) -> dict[str, dict[str, str]]:
+        """所有系所資訊（系所代碼 -> 系所資訊），返回的字典不可修改"""
+        return self.snapshot().departments
+
+    def get(self, department_code: str) -> dict[str, str] | None:
+        """系所資訊，系所不存在時返回 None"""
+        return self.snapshot().departments.get(department_code)
+
+    def college_of(self, department_code: str) -> str:
+        """
+        Raises:
+            ValueError: 找不到系所或系所沒有學院資訊
+        """
+        college = self.snapshot().college_of.get(department_code)
+        if college is None:
+            raise ValueError(f"找不到系所 {department_code} 所屬的學院")
+        return college
+
+    def departments_in_college(self, college: str) -> list[str]:
+        """學院中的所有系所代碼（新的列表，可自由修改）"""
+        return list(self.snapshot().departments_of.get(college, ()))
+
+    def same_college(self, department_code: str) -> list[str]:
+        """
+        與系所同學院的所有系所代碼（包含自己），例如不分系學生依專長系調整課程條件時使用
+
+        Raises:
+            ValueError: 找不到系所或系所沒有學院資訊
+        """
+        return self.departments_in_college(self.college_of(department_code))
+
+
+department_registry = DepartmentRegistry()
@@ -1,20 +1,25 @@
-from typing import Protocol
+from collections.abc import Sequence
+from typing import Protocol, TYPE_CHECKING
 from abc import abstractmethod
-from pydantic import TypeAdapter
-from rule_engine.models.course import StudentCourse, ResultCourse
+from rule_engine.models.course import StudentCourse
+from rule_engine.course_index import CourseIndex
+from rule_engine.context import EvaluationContext
+from rule_engine.profiler import EvaluationProfiler
+from rule_engine.cohort import CohortEvaluator
+from rule_engine.models.student import Student
 from rule_engine.models.rule import *
 from rule_engine.exception import *
 from rule_engine.utils import UtilFunctions
 from rule_engine.models.result import *
+from rule_engine.record import CourseRecord, AllRecord, SetRecord, ResultRecord
+
+if TYPE_CHECKING:
+    from rule_engine.incremental import CourseDelta, EvaluationState
 
 
 class RuleEvaluator(Protocol):
     @abstractmethod
-    def evaluate(
-        self,
-        rule: Rule,
-        student_courses: list[StudentCourse],
-    ) -> Result: ...
+    def evaluate(self, rule: Rule, context: EvaluationContext) -> ResultRecord: ...
 
 
 class EvaluatorRegistry:
@@ -43,24 +48,29 @@ def register_evaluator(rule_type: str):
     return decorator
 
 
+def evaluate_rule(rule: Rule, context: EvaluationContext) -> ResultRecord:
+    """以註冊的評估器評估規則，啟用效能分析時記錄此規則節點"""
+    evaluator = evaluator_registry.create_evaluator(rule.rule_type)
+    profiler = context.profiler
+    if profiler is None:
+        return evaluator.evaluate(rule, context)
+    with profiler.node(rule):
+        return evaluator.evaluate(rule, context)
+
+
 @register_evaluator("rule_set")
 class RuleSetEvaluator:
-    def evaluate(self, rule: RuleSet, student_courses: list[StudentCourse]) -> Result:
-        adapter = TypeAdapter(Result)
-        result = adapter.validate_python(
-            {
-                "result_type": "rule_set",
-                "name": rule.name,
-                "description": rule.description,
-                "sub_rule_logic": rule.sub_rule_logic,
-            }
-        )
-        assert isinstance(result, SetResult)
-
+    def evaluate(self, rule: RuleSet, context: EvaluationContext) -> ResultRecord:
+        sub_results = []
         for sub_rule in rule.sub_rules:
-            evaluator = evaluator_registry.create_evaluator(sub_rule.rule_type)
-            sub_result = evaluator.evaluate(sub_rule, student_courses)
-            result.sub_results.append(sub_result)
+            sub_results.append(evaluate_rule(sub_rule, context))
+        return self.combine(rule, sub_results)
+
+    @staticmethod
+    def combine(rule: RuleSet, sub_results: list[ResultRecord]) -> SetRecord:
+        """依 AND/OR 邏輯彙整子規則結果"""
+        result = SetRecord(rule.name, rule.description, rule.sub_rule_logic)
+        result.sub_results = sub_results
 
         if rule.sub_rule_logic == "AND":
             result.is_valid = all(sub.is_valid for sub in result.sub_results)
@@ -73,70 +83,56 @@ class RuleSetEvaluator:
 
 @register_evaluator("rule_all")
 class RuleAllEvaluator:
-    def evaluate(self, rule: RuleAll, student_courses: list[StudentCourse]) -> Result:
-        adapter = TypeAdapter(Result)
-        result = adapter.validate_python(
-            {
-                "result_type": "rule_all",
-                "name": rule.name,
-                "description": rule.description,
-                "required_course_list": rule.course_list,
-            }
-        )
-        assert isinstance(result, AllResult)
-        matched_courses: list[ResultCourse] = []
-        matching_courses: list[StudentCourse] = []
-
-        if rule.course_list is None:
-            matching_courses = [sc for sc in student_courses if not sc.recognized]
-        else:
-            result.required_course_list = rule.course_list
-            for course in rule.course_list:
-                for student_course in student_courses:
-                    if not student_course.recognized:
-                        if student_course.course_name == course:
-                            matching_courses.append(student_course)
-
-        sorted_matching_courses = sorted(
-            matching_courses,
-            key=lambda c: (c.course_name, c.year_taken, c.semester_taken, c.grade),
-        )
-
-        if sorted_matching_courses:
+    def evaluate(self, rule: RuleAll, context: EvaluationContext) -> ResultRecord:
+        # 候選課程位置由索引取得，已依 (課程名稱, 學年, 學期, 成績) 排序
+        sorted_positions = context.candidates(rule.course_list, rule.course_criteria)
+        return self.evaluate_candidates(rule, context, sorted_positions)
+
+    def evaluate_candidates(
+        self, rule: RuleAll, context: EvaluationContext, sorted_positions: list[int]
+    ) -> AllRecord:
+        """以已排序的候選課程位置評估規則，並在 context 中標記被承認的課程"""
+        result = AllRecord(rule.name, rule.description, rule.course_list)
+        matcher = UtilFunctions.compile_criteria(rule.course_criteria)
+        matched_courses: list[CourseRecord] = []
+        courses = context.courses
+
+        match = matcher.match
+        profile = context.profiler.current if context.profiler is not None else None
+        if profile is not None:
+            profile.candidates += len(sorted_positions)
+            match = profile.count_calls(match)
+
+        if sorted_positions:
             i = 0
-            while i < len(sorted_matching_courses):
-                current_course = sorted_matching_courses[i]
-                if UtilFunctions.match_criteria(current_course, rule.course_criteria):
+            while i < len(sorted_positions):
+                current_course = courses[sorted_positions[i]]
+                if match(current_course):
                     matched_courses.append(
-                        ResultCourse(
-                            course_name=current_course.course_name,
-                            course_codes=current_course.course_codes,
-                            credit=current_course.credit,
-                            course_type=current_course.course_type,
-                            tag=current_course.tag,
-                            year_taken=current_course.year_taken,
-                            semester_taken=current_course.semester_taken,
-                            status=UtilFunctions.get_status(current_course.grade),
+                        CourseRecord.from_student_course(
+                            current_course,
+                            UtilFunctions.get_status(current_course.grade),
                         )
                     )
-                    current_course.recognized = True
+                    context.mark_recognized(sorted_positions[i])
                     result.earned_credits += current_course.credit
                     i += 1
                 elif (
                     rule.course_criteria.allow_external_substitute_after_fail
                     and current_course.grade < 60
                 ):
-                    same_name_courses = []
+                    same_name_positions = []
                     j = i + 1
                     while (
-                        j < len(sorted_matching_courses)
-                        and sorted_matching_courses[j].course_name
+                        j < len(sorted_positions)
+                        and courses[sorted_positions[j]].course_name
                         == current_course.course_name
                     ):
-                        same_name_courses.append(sorted_matching_courses[j])
+                        same_name_positions.append(sorted_positions[j])
                         j += 1
                     best_passing_course = None
-                    for course in same_name_courses:
+                    for position in same_name_positions:
+                        course = courses[position]
                         if course.grade >= 60:
                             if (
                                 best_passing_course is None
@@ -145,44 +141,89 @@ class RuleAllEvaluator:
                                 best_passing_course = course
 
                     if best_passing_course:
-                        temp_course = current_course.model_copy(update={"grade": 60})
-                        if UtilFunctions.match_criteria(
-                            temp_course, rule.course_criteria
-                        ):
+                        if match(current_course, grade=60):
                             matched_courses.append(
-                                ResultCourse(
-                                    course_name=current_course.course_name,
-                                    course_codes=current_course.course_codes,
-                                    credit=current_course.credit,
-                                    course_type=current_course.course_type,
-                                    tag=current_course.tag,
-                                    year_taken=current_course.year_taken,
-                                    semester_taken=current_course.semester_taken,
-                                    status="外系承抵",
+                                CourseRecord.from_student_course(
+                                    current_course, "外系承抵"
                                 )
                             )
-                            for course in same_name_courses:
-                                course.recognized = True
+                            for position in same_name_positions:
+                                context.mark_recognized(position)
                             result.earned_credits += current_course.credit
                             i = j
+                            continue
+                    i += 1
                 else:
                     i += 1
             result.finished_course_list = matched_courses
+        if profile is not None:
+            profile.matches += len(matched_courses)
         UtilFunctions.apply_requirement(rule, result)
         return result
 
 
 class Evaluator:
-    def __init__(self):
+    def __init__(self, profiler: EvaluationProfiler | None = None):
+        """
+        Args:
+            profiler: 傳入時記錄每個規則節點的耗時、候選課程數與比對次數
+        """
         self.registry = evaluator_registry
+        self.profiler = profiler
 
-    def evaluate(self, rule: Rule, student_courses: list[StudentCourse]) -> Result:
-        for course in student_courses:
-            course.recognized = False
+    def evaluate(self, rule: Rule, student_courses: Sequence[StudentCourse]) -> Result:
+        return self.evaluate_record(rule, student_courses).to_model()
 
+    def evaluate_record(
+        self,
+        rule: Rule,
+        student_courses: Sequence[StudentCourse],
+        index: CourseIndex | None = None,
+    ) -> ResultRecord:
+        """
+        評估並返回輕量結果紀錄，需要 pydantic 模型時再呼叫 to_model()
+
+        評估狀態保存在每次評估各自的 EvaluationContext 中，不會修改 student_courses，
+        因此同一份修課資料可同時用於多條規則或多個執行緒。
+        index 可傳入同一份修課資料先前建立的 CourseIndex 以重複使用。
+        """
+        context = EvaluationContext(student_courses, index, self.profiler)
         try:
-            evaluator = self.registry.create_evaluator(rule.rule_type)
-            result = evaluator.evaluate(rule, student_courses)
+            result = evaluate_rule(rule, context)
         except Exception as e:
             raise TypeError(f"未知的規則類型：{rule.rule_type}") from e
         return result
+
+    def evaluate_with_state(
+        self, rule: Rule, student_courses: Sequence[StudentCourse]
+    ) -> tuple[ResultRecord, "EvaluationState"]:
+        """完整評估並返回評估狀態，供之後 evaluate_incremental 使用"""
+        from rule_engine.incremental import IncrementalEvaluator
+
+        return IncrementalEvaluator().evaluate(rule, list(student_courses))
+
+    def evaluate_incremental(
+        self, rule: Rule, state: "EvaluationState", delta: "CourseDelta"
+    ) -> tuple[ResultRecord, "EvaluationState"]:
+        """
+        依上次的評估狀態與課程異動（新增、移除、成績更新）進行增量評估，
+        只重新評估候選課程有變動的 RuleAll，結果與對 state.courses 套用異動後完整評估相同
+        """
+        from rule_engine.incremental import IncrementalEvaluator
+
+        return IncrementalEvaluator().evaluate_delta(rule, state, delta)
+
+    def evaluate_cohort(self, rule: Rule, students: list[Student]) -> list[Result]:
+        """
+        一次評估多位學生（欄式向量化），結果依 students 順序排列，
+        與逐一呼叫 evaluate(rule, student.courses) 的結果相同
+        """
+        return [
+            record.to_model() for record in self.evaluate_cohort_records(rule, students)
+        ]
+
+    def evaluate_cohort_records(
+        self, rule: Rule, students: list[Student]
+    ) -> list[ResultRecord]:
+        """同 evaluate_cohort，但返回輕量結果紀錄"""
+        return CohortEvaluator().evaluate(rule, students)
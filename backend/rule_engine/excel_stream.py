@@ -0,0 +1,272 @@
+"""
+串流匯入教務處匯出的 Excel
+
+以 openpyxl 的唯讀模式逐列讀取，不會把整個活頁簿載入成 DataFrame：
+- 資料列依學號排序或聚集（同一位學生的課程連續排列）時，每讀完一位學生就立即產生該學生
+- 資料列未依學號聚集時，先將資料列寫入暫存的 SQLite 檔案，再依學號讀回
+兩種方式都以固定列數為一批，交給 StudentFactory.students_from_dataframe 檢查與轉換，
+因此建立的學生與錯誤報告和向量化匯入相同，記憶體用量只與批次大小有關
+（另外只保留已讀過的學號集合以判斷資料是否聚集）。
+"""
+
+import json
+import sqlite3
+import tempfile
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+import pandas as pd
+from openpyxl import load_workbook
+from rule_engine.factory import EXCEL_COLUMNS, StudentFactory
+from rule_engine.models.import_report import ExcelRowError
+from rule_engine.models.student import Student
+
+# pandas 讀取 Excel 時預設視為缺值的文字，串流讀取時同樣視為空白
+NA_TEXT = frozenset(
+    {
+        "",
+        "#N/A",
+        "#N/A N/A",
+        "#NA",
+        "-1.#IND",
+        "-1.#QNAN",
+        "-NaN",
+        "-nan",
+        "1.#IND",
+        "1.#QNAN",
+        "<NA>",
+        "N/A",
+        "NA",
+        "NULL",
+        "NaN",
+        "None",
+        "n/a",
+        "nan",
+        "null",
+    }
+)
+
+# (Excel 列號, 依 EXCEL_COLUMNS 順序排列的欄位值)
+ExcelRow = tuple[int, tuple]
+
+
+class ExcelStudentStream:
+    """
+    逐位產生 Excel 中的學生
+
+    迭代時依序產生合法的學生（聚集的檔案依檔案順序，未聚集的檔案依學號排序），
+    不合法的資料列彙整在 errors 中，迭代結束後即為完整的錯誤報告。
+    迭代期間可從其他執行緒讀取 rows_read 與 total_rows 作為進度。
+
+    Args:
+        excel_file_path: Excel 檔案路徑（讀取第一個工作表）
+        major: 學生的主修科系
+        clustered: 資料列是否依學號聚集；None 表示先掃描一次學號欄位判斷，
+            True 時若發現未聚集的資料列會拋出 ValueError
+        chunk_rows: 每批交給 students_from_dataframe 轉換的最少資料列數
+        spill_dir: 未聚集時暫存 SQLite 檔案的目錄（預設為系統暫存目錄）
+    """
+
+    def __init__(
+        self,
+        excel_file_path: Path,
+        major: str,
+        clustered: bool | None = None,
+        chunk_rows: int = 5000,
+        spill_dir: Path | None = None,
+    ):
+        if not excel_file_path.exists():
+            raise FileNotFoundError(f"Excel 檔案不存在：{excel_file_path}")
+        self.excel_file_path = excel_file_path
+        self.major = major
+        self.clustered = clustered
+        self.chunk_rows = max(1, chunk_rows)
+        self.spill_dir = spill_dir
+        self.errors: list[ExcelRowError] = []
+        # 已讀取的資料列數（不含判斷是否聚集時的掃描）
+        self.rows_read = 0
+        # 工作表記錄的資料列數，檔案沒有記錄時為 None
+        self.total_rows: int | None = None
+
+    def __iter__(self) -> Iterator[Student]:
+        self.errors = []
+        self.rows_read = 0
+        if self.clustered is None:
+            self.clustered = self.is_clustered()
+        if self.clustered:
+            groups = self._clustered_groups()
+        else:
+            groups = self._spilled_groups()
+        yield from self._convert(groups)
+        self.errors.sort(key=lambda error: error.row)
+
+    def is_clustered(self) -> bool:
+        """只讀取學號欄位，檢查同一位學生的資料列是否連續排列"""
+        seen: set[str] = set()
+        previous = None
+        for _, (student_id, *_) in self._rows(["學號"], count=False):
+            if not isinstance(student_id, str) or student_id == previous:
+                continue
+            if student_id in seen:
+                return False
+            seen.add(student_id)
+            previous = student_id
+        return True
+
+    def _rows(
+        self, columns: Iterable[str] = EXCEL_COLUMNS, count: bool = True
+    ) -> Iterator[ExcelRow]:
+        """
+        逐列讀取指定欄位，數值與缺值的轉換方式與 pandas.read_excel 相同，略過空白列
+
+        count 為 True 時更新 rows_read 與 total_rows
+        """
+        try:
+            workbook = load_workbook(
+                self.excel_file_path, read_only=True, data_only=True
+            )
+        except Exception as e:
+            raise ValueError(f"無法讀取 Excel 檔案：{e}")
+
+        try:
+            sheet = workbook.worksheets[0]
+            if count and sheet.max_row is not None:
+                self.total_rows = max(0, sheet.max_row - 1)
+            header = [
+                str(value).strip() if value is not None else ""
+                for value in next(sheet.iter_rows(max_row=1, values_only=True), ())
+            ]
+            columns = list(columns)
+            missing = [column for column in columns if column not in header]
+            if missing:
+                raise ValueError(f"Excel 缺少欄位：{', '.join(missing)}")
+
+            # 只讀取需要的欄位範圍
+            first = min(header.index(column) for column in columns)
+            last = max(header.index(column) for column in columns)
+            positions = [header.index(column) - first for column in columns]
+            rows = sheet.iter_rows(
+                min_row=2, min_col=first + 1, max_col=last + 1, values_only=True
+            )
+            for number, values in enumerate(rows, start=2):
+                row = tuple(
+                    self._convert_cell(values[p]) if p < len(values) else None
+                    for p in positions
+                )
+                if any(value is not None for value in row):
+                    if count:
+                        self.rows_read += 1
+                    yield number, row
+        finally:
+            workbook.close()
+
+    @staticmethod
+    def _convert_cell(value):
+        if isinstance(value, float) and value.is_integer():
+            return int(value)
+        if isinstance(value, str) and value in NA_TEXT:
+            return None
+        return value
+
+    def _clustered_groups(self) -> Iterator[list[ExcelRow]]:
+        """依檔案順序產生每位學生的資料列（學號不是文字的資料列各自成為一組）"""
+        finished: set[str] = set()
+        group: list[ExcelRow] = []
+        current = None
+        for row in self._rows():
+            student_id = row[1][0]
+            if not isinstance(student_id, str):
+                yield [row]
+                continue
+            if student_id != current:
+                if group:
+                    yield group
+                if student_id in finished:
+                    raise ValueError(
+                        f"Excel 資料未依學號排序：學號 {student_id} 出現在第 {row[0]} 列"
+                    )
+                finished.add(student_id)
+                group = []
+                current = student_id
+            group.append(row)
+        if group:
+            yield group
+
+    def _spilled_groups(self) -> Iterator[list[ExcelRow]]:
+        """將資料列寫入暫存的 SQLite 檔案，再依學號（相同學號依列號）產生每位學生的資料列"""
+        with tempfile.TemporaryDirectory(dir=self.spill_dir) as tmp:
+            connection = sqlite3.connect(Path(tmp) / "rows.sqlite3")
+            try:
+                connection.execute(
+                    "CREATE TABLE excel_rows (student_id TEXT, row INTEGER, data TEXT)"
+                )
+                batch = []
+                for number, values in self._rows():
+                    student_id = values[0] if isinstance(values[0], str) else None
+                    batch.append(
+                        (
+                            student_id,
+                            number,
+                            json.dumps(values, ensure_ascii=False, default=str),
+                        )
+                    )
+                    if len(batch) >= self.chunk_rows:
+                        connection.executemany(
+                            "INSERT INTO excel_rows VALUES (?, ?, ?)", batch
+                        )
+                        batch = []
+                connection.executemany("INSERT INTO excel_rows VALUES (?, ?, ?)", batch)
+                connection.execute(
+                    "CREATE INDEX excel_rows_student ON excel_rows (student_id, row)"
+                )
+                connection.commit()
+
+                group: list[ExcelRow] = []
+                current = None
+                cursor = connection.execute(
+                    "SELECT student_id, row, data FROM excel_rows "
+                    "ORDER BY student_id, row"
+                )
+                for student_id, number, data in cursor:
+                    row = (number, tuple(json.loads(data)))
+                    if student_id is None:
+                        yield [row]
+                        continue
+                    if student_id != current:
+                        if group:
+                            yield group
+                        group = []
+                        current = student_id
+                    group.append(row)
+                if group:
+                    yield group
+            finally:
+                connection.close()
+
+    def _convert(self, groups: Iterator[list[ExcelRow]]) -> Iterator[Student]:
+        """將每位學生的資料列累積到 chunk_rows 列後批次轉換，依分組順序產生學生"""
+        chunk: list[list[ExcelRow]] = []
+        size = 0
+        for group in groups:
+            chunk.append(group)
+            size += len(group)
+            if size >= self.chunk_rows:
+                yield from self._convert_chunk(chunk)
+                chunk = []
+                size = 0
+        if chunk:
+            yield from self._convert_chunk(chunk)
+
+    def _convert_chunk(self, chunk: list[list[ExcelRow]]) -> Iterator[Student]:
+        rows = [row for group in chunk for row in group]
+        # 以「列號 - 2」為索引，錯誤報告中的列號與 Excel 相同
+        df = pd.DataFrame(
+            [values for _, values in rows],
+            columns=list(EXCEL_COLUMNS.values()),
+            index=[number - 2 for number, _ in rows],
+        )
+        students, errors = StudentFactory.students_from_dataframe(df, self.major)
+        self.errors.extend(errors)
+        for group in chunk:
+            student = students.pop(group[0][1][0], None)
+            if student is not None:
+                yield student
@@ -1,11 +1,36 @@
 import json
+import re
+import numpy as np
 import pandas as pd
 from pathlib import Path
 from pydantic import TypeAdapter, ValidationError
 from typing import Union
 from rule_engine.models.rule import Rule
 from rule_engine.models.student import Student
-from rule_engine.models.course import StudentCourse, BaseCourse
+from rule_engine.models.course import (
+    StudentCourse,
+    BaseCourse,
+    SPECIAL_GRADES,
+    VALID_CATEGORIES,
+)
+from rule_engine.models.import_report import ExcelRowError
+
+# 教務處匯出 Excel 的欄位與內部欄位名稱對照
+EXCEL_COLUMNS = {
+    "學號": "id",
+    "姓名": "name",
+    "課程名稱": "course_name",
+    "課程碼": "course_code",
+    "學分數": "credit",
+    "成績": "grade",
+    "承抵課程別": "category",
+    "選必修(0,1必修，2選修)": "course_type",
+    "學年": "year_taken",
+    "學期": "semester_taken",
+}
+
+# int() 可以接受的整數文字
+INTEGER_TEXT = re.compile(r"\s*[+-]?\d+\s*")
 
 
 class RuleFactory:
@@ -141,6 +166,18 @@ class StudentFactory:
 
         return StudentFactory.from_dict(student_data)
 
+    @staticmethod
+    def read_excel_dataframe(excel_file_path: Path) -> pd.DataFrame:
+        """讀取教務處匯出的 Excel，只保留需要的欄位並改為內部欄位名稱"""
+        try:
+            df = pd.read_excel(excel_file_path, engine="openpyxl")
+        except Exception as e:
+            raise ValueError(f"無法讀取 Excel 檔案：{e}")
+
+        df = df[list(EXCEL_COLUMNS)]
+        df.columns = list(EXCEL_COLUMNS.values())
+        return df
+
     @staticmethod
     def load_students_from_excel(
         excel_file_path: Path,
@@ -151,39 +188,8 @@ class StudentFactory:
         if not excel_file_path.exists():
             raise FileNotFoundError(f"Excel 檔案不存在：{excel_file_path}")
 
-        # 讀取 Excel 文件
-        try:
-            df = pd.read_excel(excel_file_path, engine="openpyxl")
-        except Exception as e:
-            raise ValueError(f"無法讀取 Excel 檔案：{e}")
-
-        # 標準化列名
-        df = df[
-            [
-                "學號",
-                "姓名",
-                "課程名稱",
-                "課程碼",
-                "學分數",
-                "成績",
-                "承抵課程別",
-                "選必修(0,1必修，2選修)",
-                "學年",
-                "學期",
-            ]
-        ]
-        df.columns = [
-            "id",
-            "name",
-            "course_name",
-            "course_code",
-            "credit",
-            "grade",
-            "category",
-            "course_type",
-            "year_taken",
-            "semester_taken",
-        ]
+        # 讀取 Excel 文件並標準化列名
+        df = StudentFactory.read_excel_dataframe(excel_file_path)
 
         # 清理數據
         df = df.dropna(subset=["id", "name", "course_name"])
@@ -206,3 +212,204 @@ class StudentFactory:
                 print(f"警告：跳過學生 {id}: {e}")
                 continue
         return students
+
+    @staticmethod
+    def students_from_dataframe(
+        df: pd.DataFrame, major: str
+    ) -> tuple[dict[str, Student], list[ExcelRowError]]:
+        """
+        以整欄（向量化）方式檢查並轉換 Excel 資料，批次建立學生
+
+        學分、成績、選必修、承抵類別、學年、學期等欄位一次以 pandas 轉型與檢查，
+        不合法的資料列不會建立課程，所有錯誤彙整在同一份報告中返回。
+        轉換規則與 CourseFactory.from_excel_row 相同（例如成績空白視為 0、數值無條件捨去為整數）。
+
+        Args:
+            df: read_excel_dataframe 的結果，索引為「Excel 列號 - 2」（預設的 0, 1, 2...）
+            major: 學生的主修科系
+
+        Returns:
+            (依學號排序的學生, 不合法資料列的錯誤報告)
+        """
+        excel_rows = (df.index + 2).tolist()
+        df = df.reset_index(drop=True)
+        problems: list[tuple[pd.Series, str]] = []
+
+        def is_str(column: pd.Series) -> pd.Series:
+            return column.map(lambda value: isinstance(value, str)).astype(bool)
+
+        def numeric(column: str, integer: bool = False) -> tuple[pd.Series, pd.Series]:
+            """
+            轉為數值，返回 (數值, 原本有值但無法轉換的遮罩)
+
+            integer 為 True 時與 int() 相同：文字只接受整數寫法（"85.7" 無法轉換），
+            數值則之後無條件捨去
+            """
+            raw = df[column]
+            if integer:
+                raw = raw.map(
+                    lambda value: (
+                        value
+                        if not isinstance(value, str) or INTEGER_TEXT.fullmatch(value)
+                        else np.nan
+                    )
+                )
+            values = pd.to_numeric(raw, errors="coerce")
+            return values, df[column].notna() & values.isna()
+
+        missing = df[["id", "name", "course_name"]].isna().any(axis=1)
+        problems.append((missing, "缺少學號、姓名或課程名稱"))
+
+        id_ok = is_str(df["id"])
+        problems.append((~missing & ~id_ok, "學號必須為文字"))
+
+        name_ok = is_str(df["course_name"])
+        course_name = df["course_name"].where(name_ok).str.strip()
+        problems.append(
+            (~missing & (~name_ok | course_name.eq("")), "課程名稱不能為空")
+        )
+
+        problems.append((~is_str(df["course_code"]), "缺少課程代碼"))
+
+        credit, credit_bad = numeric("credit")
+        problems.append((credit.isna() | (credit < 0), "學分數必須為非負數字"))
+
+        grade, grade_bad = numeric("grade", integer=True)
+        grade = np.trunc(grade.fillna(0))
+        problems.append((grade_bad, "成績必須為數字"))
+        problems.append(
+            (
+                ~grade_bad
+                & ((grade < 0) | (grade > 100))
+                & ~grade.isin(SPECIAL_GRADES),
+                "成績必須在0到100之間，或為特殊值111, 555, 777, 999",
+            )
+        )
+
+        course_type, _ = numeric("course_type", integer=True)
+        course_type = np.trunc(course_type)
+        problems.append((~course_type.isin([0, 1, 2, 3]), "選修必修類別錯誤"))
+
+        category = df["category"]
+        problems.append(
+            (~(is_str(category) & category.isin(VALID_CATEGORIES)), "承抵課程類別錯誤")
+        )
+
+        year_taken, _ = numeric("year_taken", integer=True)
+        year_taken = np.trunc(year_taken)
+        problems.append((year_taken.isna(), "修課學年必須為數字"))
+
+        semester_taken, _ = numeric("semester_taken", integer=True)
+        semester_taken = np.trunc(semester_taken)
+        problems.append((~semester_taken.isin([0, 1, 2]), "修課學期必須為 0、1 或 2"))
+
+        invalid = pd.Series(False, index=df.index)
+        for mask, _ in problems:
+            invalid |= mask
+
+        # 以合法的學號分組（與原本 groupby 相同，依學號排序），課程維持原始列順序
+        grouped = ~missing & id_ok
+        student_rows: dict[str, list[int]] = {}
+        for row, student_id in zip(
+            df.index[grouped].tolist(), df["id"][grouped].tolist()
+        ):
+            student_rows.setdefault(student_id, []).append(row)
+
+        valid = ~invalid
+        columns = {
+            "course_name": course_name.where(valid).tolist(),
+            "course_code": df["course_code"].tolist(),
+            "credit": credit.where(valid).astype(float).tolist(),
+            "grade": grade.where(valid, 0).astype(int).tolist(),
+            "category": category.tolist(),
+            "course_type": course_type.where(valid, 0).astype(int).tolist(),
+            "year_taken": year_taken.where(valid, 0).astype(int).tolist(),
+            "semester_taken": semester_taken.where(valid, 0).astype(int).tolist(),
+        }
+        valid_rows = valid.tolist()
+        names = df["name"].tolist()
+
+        students: dict[str, Student] = {}
+        student_errors: dict[int, str] = {}
+        for student_id in sorted(student_rows):
+            rows = student_rows[student_id]
+            # 欄位已整欄檢查過，直接建立課程而不逐欄驗證
+            courses = [
+                StudentCourse.model_construct(
+                    course_name=columns["course_name"][row],
+                    course_codes=[columns["course_code"][row]],
+                    credit=columns["credit"][row],
+                    course_type=columns["course_type"][row],
+                    tag=[],
+                    grade=columns["grade"][row],
+                    category=columns["category"][row],
+                    year_taken=columns["year_taken"][row],
+                    semester_taken=columns["semester_taken"][row],
+                    recognized=False,
+                )
+                for row in rows
+                if valid_rows[row]
+            ]
+            try:
+                students[student_id] = Student(
+                    name=names[rows[0]],
+                    id=student_id,
+                    major=major,
+                    courses=courses,
+                )
+            except ValidationError as e:
+                message = "學生資料錯誤：" + "；".join(
+                    error["msg"] for error in e.errors()
+                )
+                for row in rows:
+                    student_errors[row] = message
+
+        errors: list[ExcelRowError] = []
+        problem_matrix = np.column_stack([mask.to_numpy() for mask, _ in problems])
+        messages_by_column = [message for _, message in problems]
+        ids = df["id"].tolist()
+        raw_names = df["course_name"].tolist()
+        invalid_rows = set(df.index[invalid].tolist()) | set(student_errors)
+        for row in sorted(invalid_rows):
+            messages = [
+                messages_by_column[column]
+                for column in np.flatnonzero(problem_matrix[row])
+            ]
+            if row in student_errors:
+                messages.append(student_errors[row])
+            student_id = ids[row]
+            name = raw_names[row]
+            errors.append(
+                ExcelRowError(
+                    row=excel_rows[row],
+                    student_id=student_id if isinstance(student_id, str) else None,
+                    course_name=name if isinstance(name, str) else None,
+                    errors=messages,
+                )
+            )
+        return students, errors
+
+    @staticmethod
+    def load_students_from_excel_vectorized(
+        excel_file_path: Path,
+        output_path: Path,
+        major: str = "",
+    ) -> tuple[dict[str, Student], list[ExcelRowError]]:
+        """
+        從 Excel 文件批次建立學生（向量化版本），並將每位學生存為 JSON
+
+        與 load_students_from_excel 建立的學生相同，但大量資料時快得多，
+        且不合法的資料列會彙整成錯誤報告返回，而不是逐列印出警告。
+        """
+        if not excel_file_path.exists():
+            raise FileNotFoundError(f"Excel 檔案不存在：{excel_file_path}")
+
+        df = StudentFactory.read_excel_dataframe(excel_file_path)
+        students, errors = StudentFactory.students_from_dataframe(df, major)
+
+        output_path.mkdir(parents=True, exist_ok=True)
+        for student_id, student in students.items():
+            StudentFactory.save_student_to_json(
+                student, output_path / f"{student_id}.json"
+            )
+        return students, errors
@@ -0,0 +1,215 @@
+"""
+增量評估
+
+成績單新增一個學期時，大部分 RuleAll 的候選課程完全沒有變動。
+完整評估後保留每個節點的狀態（候選課程、被承認的課程與結果紀錄），
+套用課程異動後依序走訪規則樹：
+- RuleAll 的候選課程（同樣的課程物件、同樣的順序）與上次相同時，結果與承認的課程必定相同，直接沿用
+- 否則重新評估該 RuleAll
+- RuleSet 只有在子規則結果改變時才重新以 AND/OR 彙整
+
+因為 RuleAll 會依序消耗課程，前面的規則承認的課程改變時，後面規則的候選課程也會跟著改變而被重新評估，
+所以結果與對異動後的修課列表做完整評估相同。
+比對候選課程時以物件身分判斷，因此課程物件在評估後不可被修改（成績更新請透過 CourseDelta）。
+"""
+
+from collections.abc import Iterator
+from rule_engine.context import EvaluationContext
+from rule_engine.evaluator import (
+    RuleAllEvaluator,
+    RuleSetEvaluator,
+    evaluator_registry,
+)
+from rule_engine.models.course import StudentCourse
+from rule_engine.models.rule import Rule, RuleAll, RuleSet
+from rule_engine.record import ResultRecord
+from rule_engine.utils import UtilFunctions
+
+CourseKey = tuple[str, tuple[str, ...], int, int]
+
+
+def course_key(course: StudentCourse) -> CourseKey:
+    """課程識別鍵：(課程名稱, 課程代碼, 修課學年, 修課學期)"""
+    return (
+        course.course_name,
+        tuple(course.course_codes),
+        course.year_taken,
+        course.semester_taken,
+    )
+
+
+class CourseDelta:
+    """修課列表的異動：新增、移除與成績更新的課程"""
+
+    __slots__ = ("added", "removed", "regraded")
+
+    def __init__(
+        self,
+        added: list[StudentCourse] | None = None,
+        removed: list[StudentCourse] | None = None,
+        regraded: list[StudentCourse] | None = None,
+    ):
+        self.added = added or []
+        self.removed = removed or []
+        self.regraded = regraded or []
+
+    def apply(self, courses: list[StudentCourse]) -> list[StudentCourse]:
+        """
+        返回套用異動後的新修課列表（不修改原列表）
+
+        移除的課程從列表中刪除，成績更新的課程在原位置取代，新增的課程附加在最後；
+        未變動的課程保留原本的物件。
+
+        Raises:
+            ValueError: 要移除或更新的課程不在修課列表中
+        """
+        positions: dict[CourseKey, int] = {}
+        for position, course in enumerate(courses):
+            positions.setdefault(course_key(course), position)
+
+        updated: list[StudentCourse | None] = list(courses)
+        for course in self.regraded:
+            position = positions.get(course_key(course))
+            if position is None or updated[position] is None:
+                raise ValueError(f"找不到要更新成績的課程：{course.course_name}")
+            updated[position] = course
+        for course in self.removed:
+            position = positions.get(course_key(course))
+            if position is None or updated[position] is None:
+                raise ValueError(f"找不到要移除的課程：{course.course_name}")
+            updated[position] = None
+
+        return [course for course in updated if course is not None] + list(self.added)
+
+
+class NodeState:
+    """單一規則節點上次評估的狀態（RuleSet 只記錄結果）"""
+
+    __slots__ = ("record", "candidates", "consumed")
+
+    def __init__(
+        self,
+        record: ResultRecord,
+        candidates: list[StudentCourse] | None = None,
+        consumed: list[int] | None = None,
+    ):
+        self.record = record
+        # RuleAll 的候選課程物件（依評估順序）
+        self.candidates = candidates
+        # 被承認的候選課程在 candidates 中的位置
+        self.consumed = consumed
+
+
+class EvaluationState:
+    """一次評估的完整狀態，節點依規則樹前序排列"""
+
+    __slots__ = ("rule_digest", "courses", "record", "nodes")
+
+    def __init__(
+        self,
+        rule_digest: str,
+        courses: list[StudentCourse],
+        record: ResultRecord,
+        nodes: list[NodeState],
+    ):
+        self.rule_digest = rule_digest
+        self.courses = courses
+        self.record = record
+        self.nodes = nodes
+
+
+class IncrementalEvaluator:
+    def __init__(self):
+        self.registry = evaluator_registry
+
+    def evaluate(
+        self, rule: Rule, courses: list[StudentCourse]
+    ) -> tuple[ResultRecord, EvaluationState]:
+        """完整評估，並返回之後可用於增量評估的狀態"""
+        return self._run(rule, list(courses), None, UtilFunctions.rule_digest(rule))
+
+    def evaluate_delta(
+        self, rule: Rule, state: EvaluationState, delta: CourseDelta
+    ) -> tuple[ResultRecord, EvaluationState]:
+        """
+        套用課程異動並只重新評估受影響的節點
+
+        Raises:
+            ValueError: 規則與狀態建立時的規則不同，或異動的課程不存在
+        """
+        rule_digest = UtilFunctions.rule_digest(rule)
+        if rule_digest != state.rule_digest:
+            raise ValueError("規則內容已改變，無法進行增量評估")
+        courses = delta.apply(state.courses)
+        return self._run(rule, courses, iter(state.nodes), rule_digest)
+
+    def _run(
+        self,
+        rule: Rule,
+        courses: list[StudentCourse],
+        previous: Iterator[NodeState] | None,
+        rule_digest: str,
+    ) -> tuple[ResultRecord, EvaluationState]:
+        context = EvaluationContext(courses)
+        nodes: list[NodeState] = []
+        try:
+            record, _ = self._evaluate_node(rule, context, previous, nodes)
+        except Exception as e:
+            raise TypeError(f"未知的規則類型：{rule.rule_type}") from e
+        return record, EvaluationState(rule_digest, courses, record, nodes)
+
+    def _evaluate_node(
+        self,
+        rule: Rule,
+        context: EvaluationContext,
+        previous: Iterator[NodeState] | None,
+        nodes: list[NodeState],
+    ) -> tuple[ResultRecord, bool]:
+        """
+        評估單一節點
+
+        Returns:
+            (結果紀錄, 結果是否與上次不同)
+        """
+        old = next(previous) if previous is not None else None
+
+        if isinstance(rule, RuleSet):
+            # 先保留位置，子規則評估完後再決定沿用或重新彙整
+            slot = len(nodes)
+            nodes.append(old)
+            sub_results = []
+            changed = old is None
+            for sub_rule in rule.sub_rules:
+                sub_result, sub_changed = self._evaluate_node(
+                    sub_rule, context, previous, nodes
+                )
+                sub_results.append(sub_result)
+                changed = changed or sub_changed
+            if changed:
+                nodes[slot] = NodeState(RuleSetEvaluator.combine(rule, sub_results))
+            return nodes[slot].record, changed
+
+        if isinstance(rule, RuleAll):
+            positions = context.candidates(rule.course_list, rule.course_criteria)
+            candidates = [context.courses[p] for p in positions]
+            if (
+                old is not None
+                and old.candidates is not None
+                and len(old.candidates) == len(candidates)
+                and all(a is b for a, b in zip(old.candidates, candidates))
+            ):
+                for i in old.consumed:
+                    context.mark_recognized(positions[i])
+                nodes.append(old)
+                return old.record, False
+
+            record = RuleAllEvaluator().evaluate_candidates(rule, context, positions)
+            consumed = [i for i, p in enumerate(positions) if context.is_recognized(p)]
+            nodes.append(NodeState(record, candidates, consumed))
+            return record, True
+
+        # 其他規則類型沒有可沿用的狀態，每次都重新評估
+        evaluator = self.registry.create_evaluator(rule.rule_type)
+        record = evaluator.evaluate(rule, context)
+        nodes.append(NodeState(record))
+        return record, True
@@ -0,0 +1,143 @@
+import re
+from rule_engine.models.course import StudentCourse
+from rule_engine.models.rule import CourseCriteria
+
+
+class _PrefixSet:
+    """系所代碼前綴查詢，前綴長度一致時使用 frozenset，否則退回 startswith"""
+
+    __slots__ = ("_length", "_prefixes", "_prefix_tuple")
+
+    def __init__(self, prefixes: list[str]):
+        lengths = {len(prefix) for prefix in prefixes}
+        self._length = lengths.pop() if len(lengths) == 1 else None
+        self._prefixes = frozenset(prefixes)
+        self._prefix_tuple = tuple(prefixes)
+
+    def any_match(self, codes: list[str]) -> bool:
+        if self._length is not None:
+            length = self._length
+            prefixes = self._prefixes
+            for code in codes:
+                if code[:length] in prefixes:
+                    return True
+            return False
+        prefix_tuple = self._prefix_tuple
+        for code in codes:
+            if code.startswith(prefix_tuple):
+                return True
+        return False
+
+
+class CriteriaMatcher:
+    """
+    已編譯的課程篩選條件
+
+    將 CourseCriteria 的每個欄位預先轉換成可重複使用的結構（已編譯的正則表達式、
+    frozenset、前綴查詢表、成績下限），使比對單一課程時不需要再解讀條件內容。
+    """
+
+    __slots__ = (
+        "_code_pattern",
+        "_name_pattern",
+        "_departments",
+        "_blacklist",
+        "_exclude_departments",
+        "_whitelist",
+        "_course_types",
+        "_categories",
+        "_tags",
+        "_min_grade",
+    )
+
+    def __init__(self, criteria: CourseCriteria):
+        self._code_pattern = (
+            re.compile(criteria.course_code_pattern)
+            if criteria.course_code_pattern
+            else None
+        )
+        self._name_pattern = (
+            re.compile(criteria.course_name_pattern)
+            if criteria.course_name_pattern
+            else None
+        )
+        self._departments = (
+            _PrefixSet(criteria.department_codes) if criteria.department_codes else None
+        )
+        self._blacklist = (
+            tuple(criteria.blacklist_courses) if criteria.blacklist_courses else None
+        )
+        self._exclude_departments = (
+            _PrefixSet(criteria.exclude_department_codes)
+            if criteria.exclude_department_codes
+            else None
+        )
+        self._whitelist = (
+            tuple(criteria.whitelist_courses) if criteria.whitelist_courses else None
+        )
+        self._course_types = (
+            frozenset(criteria.course_types) if criteria.course_types else None
+        )
+        self._categories = (
+            frozenset(criteria.categories) if criteria.categories else None
+        )
+        self._tags = tuple(criteria.tags) if criteria.tags else None
+        # 成績條件：允許不及格時 0~100 皆可，否則需及格；555（抵免）與 999（修課中）一律承認
+        self._min_grade = 0 if criteria.allow_fail else 60
+
+    def match(self, course: StudentCourse, grade: int | None = None) -> bool:
+        """
+        檢查學生課程是否符合篩選條件
+
+        Args:
+            course: 學生課程
+            grade: 以此成績取代課程原本的成績進行比對（用於外系承抵）
+        """
+        if grade is None:
+            grade = course.grade
+        if not (self._min_grade <= grade <= 100) and grade != 555 and grade != 999:
+            return False
+
+        if self._course_types is not None:
+            if course.course_type not in self._course_types:
+                return False
+
+        if self._categories is not None:
+            if course.category not in self._categories:
+                return False
+
+        if self._tags is not None:
+            course_tags = course.tag
+            for tag in self._tags:
+                if tag not in course_tags:
+                    return False
+
+        codes = course.course_codes
+
+        # 系所條件
+        if self._departments is not None:
+            if not self._departments.any_match(codes):
+                return False
+            if self._blacklist is not None and course.course_name in self._blacklist:
+                return False
+
+        if self._exclude_departments is not None:
+            if self._exclude_departments.any_match(codes):
+                if self._whitelist is None:
+                    return False
+                if course.course_name not in self._whitelist:
+                    return False
+
+        # 課程代碼模式
+        if self._code_pattern is not None:
+            code_match = self._code_pattern.match
+            for code in codes:
+                if not code_match(code):
+                    return False
+
+        # 課程名稱模式
+        if self._name_pattern is not None:
+            if not self._name_pattern.match(course.course_name):
+                return False
+
+        return True
@@ -1,6 +1,31 @@
 from pydantic import BaseModel, Field, field_validator
 from typing import Literal, Annotated
 
+# 成績的特殊值（999 修課中、555 抵免等）
+SPECIAL_GRADES = (111, 555, 777, 999)
+# 承抵課程類別
+VALID_CATEGORIES = (
+    " ",
+    "A",
+    "B",
+    "D",
+    "E",
+    "F",
+    "J",
+    "K",
+    "L",
+    "N",
+    "P",
+    "Q",
+    "R",
+    "S",
+    "T",
+    "U",
+    "X",
+    "Y",
+    "Z",
+)
+
 
 class BaseCourse(BaseModel):
     course_name: Annotated[str, Field(..., min_length=1, description="課程名稱")]
@@ -40,39 +65,24 @@ class StudentCourse(BaseCourse):
     ]
     year_taken: Annotated[int, Field(..., description="修課學年")]
     semester_taken: Annotated[Literal[0, 1, 2], Field(..., description="修課學期")]
-    recognized: Annotated[bool, Field(False, description="是否檢查過")]
+    recognized: Annotated[
+        bool,
+        Field(
+            False, description="是否檢查過（保留欄位，評估改由 EvaluationContext 記錄）"
+        ),
+    ]
 
     @field_validator("grade", mode="after")
     @classmethod
     def validate_grade(cls, v: int) -> int:
-        if (v < 0 or v > 100) and (v not in [111, 555, 777, 999]):
+        if (v < 0 or v > 100) and (v not in SPECIAL_GRADES):
             raise ValueError("成績必須在0到100之間，或為特殊值111, 555, 777, 999")
         return v
 
     @field_validator("category", mode="after")
     @classmethod
     def validate_category(cls, v: str) -> str:
-        if v not in [
-            " ",
-            "A",
-            "B",
-            "D",
-            "E",
-            "F",
-            "J",
-            "K",
-            "L",
-            "N",
-            "P",
-            "Q",
-            "R",
-            "S",
-            "T",
-            "U",
-            "X",
-            "Y",
-            "Z",
-        ]:
+        if v not in VALID_CATEGORIES:
             raise ValueError("承抵課程類別錯誤")
         return v
 
@@ -0,0 +1,11 @@
+from pydantic import BaseModel, Field
+from typing import Annotated
+
+
+class ExcelRowError(BaseModel):
+    row: Annotated[
+        int, Field(..., description="Excel 列號（第 1 列為標題，資料從第 2 列開始）")
+    ]
+    student_id: Annotated[str | None, Field(None, description="學號")]
+    course_name: Annotated[str | None, Field(None, description="課程名稱")]
+    errors: Annotated[list[str], Field(..., description="該列所有錯誤訊息")]
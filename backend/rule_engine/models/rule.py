@@ -1,11 +1,82 @@
 from __future__ import annotations
-from typing import Literal, Annotated, Union
-from pydantic import BaseModel, Field, field_validator, model_validator
+import copy
+from typing import Any, Literal, Annotated, Self, Union
+from pydantic import BaseModel, Field, PrivateAttr, field_validator, model_validator
 from rule_engine.models.course import BaseCourse
 from enum import Enum
 
+FROZEN_MESSAGE = "規則已凍結（多個審查共用），請先以 model_copy(deep=True) 複製"
 
-class CourseCriteria(BaseModel):
+
+class FrozenList(list):
+    """凍結規則中的列表，任何修改都會拋出 TypeError；深複製的結果為一般的 list"""
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError(FROZEN_MESSAGE)
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _readonly
+    append = extend = insert = pop = remove = clear = sort = reverse = _readonly
+
+    def __copy__(self) -> list:
+        return list(self)
+
+    def __deepcopy__(self, memo: dict) -> list:
+        return [copy.deepcopy(item, memo) for item in self]
+
+    def __reduce__(self):
+        return FrozenList, (list(self),)
+
+
+class FreezableModel(BaseModel):
+    """
+    可凍結的規則模型
+
+    freeze 後修改欄位（或欄位中的列表）會拋出 TypeError，
+    model_copy(deep=True) 得到的複本不會被凍結。
+    """
+
+    _frozen: bool = PrivateAttr(default=False)
+
+    def __setattr__(self, name: str, value: Any):
+        if self._frozen and not name.startswith("_"):
+            raise TypeError(FROZEN_MESSAGE)
+        super().__setattr__(name, value)
+
+    def freeze(self) -> Self:
+        """凍結自己與所有子規則、條件及需求（不可逆），返回自己"""
+        for name in type(self).model_fields:
+            value = self.__dict__[name]
+            if isinstance(value, list):
+                for item in value:
+                    if isinstance(item, FreezableModel):
+                        item.freeze()
+                self.__dict__[name] = FrozenList(value)
+            elif isinstance(value, FreezableModel):
+                value.freeze()
+        self._frozen = True
+        return self
+
+    @property
+    def frozen(self) -> bool:
+        return self._frozen
+
+    def __deepcopy__(self, memo: dict[int, Any] | None = None) -> Self:
+        copied = super().__deepcopy__(memo)
+        copied._frozen = False
+        return copied
+
+    def __eq__(self, other: Any) -> bool:
+        # 凍結狀態與比對器快取等私有屬性不影響相等性
+        if not isinstance(other, BaseModel):
+            return NotImplemented
+        return (
+            type(self) is type(other)
+            and self.__dict__ == other.__dict__
+            and self.__pydantic_extra__ == other.__pydantic_extra__
+        )
+
+
+class CourseCriteria(FreezableModel):
     """課程篩選條件"""
 
     # 基本條件
@@ -51,6 +122,15 @@ class CourseCriteria(BaseModel):
         bool, Field(description="是否允許外系同名課程承抵未通過的課程")
     ] = False
 
+    # 已編譯的比對器快取（見 UtilFunctions.compile_criteria）
+    _matcher: Any = PrivateAttr(default=None)
+
+    def __setattr__(self, name: str, value: Any):
+        super().__setattr__(name, value)
+        # 條件被修改時（例如不分系調整 department_codes）需重新編譯
+        if not name.startswith("_"):
+            self._matcher = None
+
 
 class RequirementType(str, Enum):
     ALL = "all"
@@ -63,7 +143,7 @@ class RequirementType(str, Enum):
     MEANINGLESS = "meaningless"
 
 
-class RuleRequirement(BaseModel):
+class RuleRequirement(FreezableModel):
     """規則需求"""
 
     type: RequirementType = Field(..., description="需求類型")
@@ -154,7 +234,7 @@ class RuleRequirement(BaseModel):
         return self
 
 
-class BaseRule(BaseModel):
+class BaseRule(FreezableModel):
     name: Annotated[str, Field(..., min_length=1, description="規則名稱")]
     description: Annotated[
         str | None, Field(None, min_length=1, description="規則描述")
@@ -0,0 +1,60 @@
+from collections.abc import Sequence
+from typing import overload
+from rule_engine.models.course import StudentCourse
+
+
+class CourseOverlay(Sequence[StudentCourse]):
+    """
+    修課列表的寫入時複製（copy-on-write）檢視
+
+    以原始修課列表為底，疊加假設的新增課程或取代特定位置的課程，
+    不複製也不修改原始列表，可用於「如果修了這些課」的模擬評估。
+    評估時原始列表中的課程位置保持不變，新增的課程排在最後。
+    """
+
+    __slots__ = ("_base", "_added", "_replaced")
+
+    def __init__(
+        self,
+        base: Sequence[StudentCourse],
+        added: Sequence[StudentCourse] = (),
+        replaced: dict[int, StudentCourse] | None = None,
+    ):
+        self._base = base
+        self._added = tuple(added)
+        self._replaced = dict(replaced) if replaced else {}
+        for position in self._replaced:
+            if not 0 <= position < len(base):
+                raise IndexError(f"取代的課程位置超出範圍：{position}")
+
+    def __len__(self) -> int:
+        return len(self._base) + len(self._added)
+
+    @overload
+    def __getitem__(self, position: int) -> StudentCourse: ...
+
+    @overload
+    def __getitem__(self, position: slice) -> list[StudentCourse]: ...
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self[i] for i in range(*position.indices(len(self)))]
+        if position < 0:
+            position += len(self)
+        base_length = len(self._base)
+        if 0 <= position < base_length:
+            course = self._replaced.get(position)
+            return course if course is not None else self._base[position]
+        if base_length <= position < len(self):
+            return self._added[position - base_length]
+        raise IndexError("課程位置超出範圍")
+
+    def __iter__(self):
+        replaced = self._replaced
+        for position, course in enumerate(self._base):
+            yield replaced.get(position, course)
+        yield from self._added
+
+    def with_courses(self, added: Sequence[StudentCourse]) -> "CourseOverlay":
+        """在目前的檢視上再疊加新增的課程（仍共用原始列表）"""
+        return CourseOverlay(self._base, self._added + tuple(added), self._replaced)
@@ -0,0 +1,113 @@
+"""
+規則評估效能分析
+
+啟用時（將 EvaluationProfiler 傳給 Evaluator），每個規則節點會記錄：
+- 耗時（含子規則）
+- 候選課程數
+- 篩選條件比對（match_criteria）次數與符合次數
+
+未啟用時評估器不做任何額外計數。
+"""
+
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from rule_engine.models.rule import Rule
+
+
+class RuleProfile:
+    """單一規則節點的效能紀錄"""
+
+    __slots__ = (
+        "path",
+        "rule_type",
+        "depth",
+        "wall_time",
+        "candidates",
+        "match_calls",
+        "matches",
+    )
+
+    def __init__(self, path: str, rule_type: str, depth: int):
+        # 由根規則到此規則的名稱，以 " > " 連接
+        self.path = path
+        self.rule_type = rule_type
+        self.depth = depth
+        self.wall_time = 0.0
+        self.candidates = 0
+        self.match_calls = 0
+        self.matches = 0
+
+    def count_calls(self, match: Callable[..., bool]) -> Callable[..., bool]:
+        """包裝比對函式，每次呼叫時累加 match_calls"""
+
+        def counted(*args, **kwargs) -> bool:
+            self.match_calls += 1
+            return match(*args, **kwargs)
+
+        return counted
+
+    def to_dict(self) -> dict:
+        return {
+            "path": self.path,
+            "rule_type": self.rule_type,
+            "depth": self.depth,
+            "wall_time_ms": self.wall_time * 1000,
+            "candidates": self.candidates,
+            "match_calls": self.match_calls,
+            "matches": self.matches,
+        }
+
+
+class EvaluationProfiler:
+    """
+    收集評估過程中每個規則節點的效能紀錄
+
+    同一個 profiler 可用於多次評估，紀錄依評估順序（規則樹前序）累積在 entries 中。
+    """
+
+    def __init__(self):
+        self.entries: list[RuleProfile] = []
+        self._stack: list[RuleProfile] = []
+
+    @property
+    def current(self) -> RuleProfile | None:
+        """目前正在評估的規則節點"""
+        return self._stack[-1] if self._stack else None
+
+    @contextmanager
+    def node(self, rule: Rule) -> Iterator[RuleProfile]:
+        """記錄一個規則節點的評估，with 區塊內評估的規則視為其子規則"""
+        parent = self.current
+        path = f"{parent.path} > {rule.name}" if parent else rule.name
+        entry = RuleProfile(path, rule.rule_type, len(self._stack))
+        self.entries.append(entry)
+        self._stack.append(entry)
+        start = time.perf_counter()
+        try:
+            yield entry
+        finally:
+            entry.wall_time = time.perf_counter() - start
+            self._stack.pop()
+
+    def to_list(self) -> list[dict]:
+        return [entry.to_dict() for entry in self.entries]
+
+    def hottest(self, limit: int = 10) -> list[RuleProfile]:
+        """耗時最多的 RuleAll 節點（RuleSet 的耗時包含子規則，不列入比較）"""
+        leaves = [entry for entry in self.entries if entry.rule_type == "rule_all"]
+        return sorted(leaves, key=lambda entry: entry.wall_time, reverse=True)[:limit]
+
+    def format_report(self) -> str:
+        """以縮排的表格呈現各規則節點的效能紀錄"""
+        lines = [
+            f"{'耗時(ms)':>10} {'候選':>6} {'比對':>6} {'符合':>6}  規則",
+        ]
+        for entry in self.entries:
+            name = entry.path.rsplit(" > ", 1)[-1]
+            lines.append(
+                f"{entry.wall_time * 1000:>10.3f} {entry.candidates:>6} "
+                f"{entry.match_calls:>6} {entry.matches:>6}  "
+                f"{'  ' * entry.depth}{name}"
+            )
+        return "\n".join(lines)
@@ -0,0 +1,230 @@
+"""
+評估過程使用的輕量結果紀錄
+
+評估器內部以 __slots__ 的一般物件記錄結果，避免每個節點、每門課程都經過 pydantic 驗證；
+只有在需要序列化（to_dict / to_json）或交給 API 回應（to_model）時才轉換。
+欄位名稱與順序與 rule_engine.models.result 中的模型相同，
+to_json 的輸出與模型的 model_dump_json 完全一致。
+"""
+
+from __future__ import annotations
+from typing import Literal, Union
+import orjson
+from pydantic import TypeAdapter
+from rule_engine.models.course import StudentCourse
+from rule_engine.models.result import Result
+
+_result_adapter: TypeAdapter[Result] = TypeAdapter(Result)
+
+
+class CourseRecord:
+    """對應 ResultCourse"""
+
+    __slots__ = (
+        "course_name",
+        "course_codes",
+        "credit",
+        "course_type",
+        "tag",
+        "status",
+        "year_taken",
+        "semester_taken",
+    )
+
+    def __init__(
+        self,
+        course_name: str,
+        course_codes: list[str],
+        credit: float,
+        course_type: int,
+        tag: list[str],
+        status: str,
+        year_taken: int,
+        semester_taken: int,
+    ):
+        self.course_name = course_name
+        self.course_codes = course_codes
+        self.credit = credit
+        self.course_type = course_type
+        self.tag = tag
+        self.status = status
+        self.year_taken = year_taken
+        self.semester_taken = semester_taken
+
+    @classmethod
+    def from_student_course(cls, course: StudentCourse, status: str) -> CourseRecord:
+        return cls(
+            course.course_name,
+            course.course_codes,
+            course.credit,
+            course.course_type,
+            course.tag,
+            status,
+            course.year_taken,
+            course.semester_taken,
+        )
+
+    @classmethod
+    def from_dict(cls, data: dict) -> CourseRecord:
+        return cls(
+            data["course_name"],
+            data["course_codes"],
+            data["credit"],
+            data["course_type"],
+            data["tag"],
+            data["status"],
+            data["year_taken"],
+            data["semester_taken"],
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "course_name": self.course_name,
+            "course_codes": list(self.course_codes),
+            "credit": float(self.credit),
+            "course_type": self.course_type,
+            "tag": list(self.tag),
+            "status": self.status,
+            "year_taken": self.year_taken,
+            "semester_taken": self.semester_taken,
+        }
+
+
+class AllRecord:
+    """對應 AllResult"""
+
+    __slots__ = (
+        "name",
+        "description",
+        "is_valid",
+        "earned_credits",
+        "finished_course_list",
+        "required_course_list",
+        "_json",
+    )
+    result_type: Literal["rule_all"] = "rule_all"
+
+    def __init__(
+        self,
+        name: str,
+        description: str | None,
+        required_course_list: list[str] | None = None,
+    ):
+        self.name = name
+        self.description = description
+        self.is_valid = True
+        self.earned_credits: float = 0.0
+        self.finished_course_list: list[CourseRecord] = []
+        self.required_course_list = required_course_list
+        self._json: bytes | None = None
+
+    @classmethod
+    def from_dict(cls, data: dict) -> AllRecord:
+        record = cls(
+            data["name"], data.get("description"), data.get("required_course_list")
+        )
+        record.is_valid = data["is_valid"]
+        record.earned_credits = data["earned_credits"]
+        record.finished_course_list = [
+            CourseRecord.from_dict(course) for course in data["finished_course_list"]
+        ]
+        return record
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "description": self.description,
+            "is_valid": bool(self.is_valid),
+            "earned_credits": float(self.earned_credits),
+            "result_type": self.result_type,
+            "finished_course_list": [
+                course.to_dict() for course in self.finished_course_list
+            ],
+            "required_course_list": (
+                list(self.required_course_list)
+                if self.required_course_list is not None
+                else None
+            ),
+        }
+
+    def to_json(self) -> bytes:
+        """
+        序列化為 JSON（UTF-8），結果會被保留重複使用（例如同時存檔與回應），
+        因此只能在評估完成、紀錄不再修改後呼叫
+        """
+        if self._json is None:
+            self._json = orjson.dumps(self.to_dict())
+        return self._json
+
+    def to_model(self) -> Result:
+        return _result_adapter.validate_python(self.to_dict())
+
+
+class SetRecord:
+    """對應 SetResult"""
+
+    __slots__ = (
+        "name",
+        "description",
+        "is_valid",
+        "earned_credits",
+        "sub_results",
+        "sub_rule_logic",
+        "_json",
+    )
+    result_type: Literal["rule_set"] = "rule_set"
+
+    def __init__(
+        self,
+        name: str,
+        description: str | None,
+        sub_rule_logic: Literal["AND", "OR"] = "AND",
+    ):
+        self.name = name
+        self.description = description
+        self.is_valid = True
+        self.earned_credits: float = 0.0
+        self.sub_results: list[ResultRecord] = []
+        self.sub_rule_logic = sub_rule_logic
+        self._json: bytes | None = None
+
+    @classmethod
+    def from_dict(cls, data: dict) -> SetRecord:
+        record = cls(data["name"], data.get("description"), data["sub_rule_logic"])
+        record.is_valid = data["is_valid"]
+        record.earned_credits = data["earned_credits"]
+        record.sub_results = [record_from_dict(sub) for sub in data["sub_results"]]
+        return record
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "description": self.description,
+            "is_valid": bool(self.is_valid),
+            "earned_credits": float(self.earned_credits),
+            "result_type": self.result_type,
+            "sub_results": [sub.to_dict() for sub in self.sub_results],
+            "sub_rule_logic": self.sub_rule_logic,
+        }
+
+    def to_json(self) -> bytes:
+        """
+        序列化為 JSON（UTF-8），結果會被保留重複使用（例如同時存檔與回應），
+        因此只能在評估完成、紀錄不再修改後呼叫
+        """
+        if self._json is None:
+            self._json = orjson.dumps(self.to_dict())
+        return self._json
+
+    def to_model(self) -> Result:
+        return _result_adapter.validate_python(self.to_dict())
+
+
+ResultRecord = Union[SetRecord, AllRecord]
+
+
+def record_from_dict(data: dict) -> ResultRecord:
+    """由 to_dict() 的輸出還原結果紀錄"""
+    if data["result_type"] == "rule_set":
+        return SetRecord.from_dict(data)
+    return AllRecord.from_dict(data)
@@ -0,0 +1,172 @@
+"""
+評估結果快取
+
+以內容雜湊（規則 JSON、修課列表指紋與審查選項）作為鍵，
+規則或成績單任何改變都會得到新的鍵，舊的項目自然失效，不需要另外清除。
+快取分為兩層：
+- 記憶體 LRU：同一行程內重複審查直接取用
+- 磁碟（選用）：每個鍵一個 JSON 檔，可跨行程（例如批次審查的 worker）與重新啟動共用，
+  檔案數超過上限時刪除最久未使用的檔案
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from rule_engine.record import ResultRecord, record_from_dict
+
+
+class CachedResults:
+    """快取項目：各項審查結果"""
+
+    __slots__ = ("results",)
+
+    def __init__(self, results: dict[str, ResultRecord | None]):
+        # 快取中的紀錄會被多個請求共用，取出後不可修改
+        self.results = results
+
+    def to_dict(self) -> dict:
+        return {
+            "results": {
+                key: record.to_dict() if record else None
+                for key, record in self.results.items()
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "CachedResults":
+        return cls(
+            {
+                key: record_from_dict(record) if record else None
+                for key, record in data["results"].items()
+            }
+        )
+
+
+class ResultCache:
+    def __init__(
+        self,
+        maxsize: int = 256,
+        disk_dir: Path | None = None,
+        disk_maxsize: int = 4096,
+    ):
+        """
+        Args:
+            maxsize: 記憶體層最多保留的項目數
+            disk_dir: 磁碟層目錄，None 表示只使用記憶體
+            disk_maxsize: 磁碟層最多保留的檔案數
+        """
+        self.maxsize = maxsize
+        self.disk_dir = disk_dir
+        self.disk_maxsize = disk_maxsize
+        self._entries: OrderedDict[str, CachedResults] = OrderedDict()
+        self._lock = threading.Lock()
+        # 磁碟層的檔案數（None 表示尚未計算），只在寫入新檔案時累加，超過上限時重新計算
+        self._disk_count: int | None = None
+
+    @staticmethod
+    def make_key(**parts) -> str:
+        """將各部分以正規化 JSON 串接後取 SHA-256 作為快取鍵"""
+        canonical = json.dumps(
+            parts, ensure_ascii=False, sort_keys=True, separators=(",", ":")
+        )
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def _disk_path(self, key: str) -> Path | None:
+        if self.disk_dir is None:
+            return None
+        return self.disk_dir / f"{key}.json"
+
+    def get(self, key: str) -> CachedResults | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+
+        path = self._disk_path(key)
+        if path is None or not path.exists():
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = CachedResults.from_dict(json.load(f))
+        except (OSError, ValueError, KeyError):
+            # 損毀或寫到一半的檔案視為未命中
+            return None
+
+        # 更新修改時間，清理時依此保留最近使用的檔案
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self._remember(key, entry)
+        return entry
+
+    def put(self, key: str, entry: CachedResults):
+        self._remember(key, entry)
+
+        path = self._disk_path(key)
+        if path is None:
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        is_new = not path.exists()
+        # 先寫入暫存檔再取代，避免其他行程讀到寫到一半的檔案；
+        # 暫存檔名包含行程與執行緒，同時寫入同一個鍵時不會共用暫存檔
+        tmp_path = path.with_name(
+            f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp"
+        )
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entry.to_dict(), f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+        if not is_new:
+            return
+        with self._lock:
+            if self._disk_count is not None:
+                self._disk_count += 1
+            needs_prune = (
+                self._disk_count is None or self._disk_count > self.disk_maxsize
+            )
+        if needs_prune:
+            self._prune_disk()
+
+    def clear(self, include_disk: bool = False):
+        """
+        清除記憶體層
+
+        Args:
+            include_disk: 是否一併刪除磁碟層的檔案
+        """
+        with self._lock:
+            self._entries.clear()
+        if include_disk and self.disk_dir is not None:
+            for path in self.disk_dir.glob("*.json"):
+                path.unlink(missing_ok=True)
+            with self._lock:
+                self._disk_count = 0
+
+    def _prune_disk(self):
+        """磁碟層的檔案數超過上限時，依修改時間刪除最舊的檔案"""
+        files: list[tuple[float, Path]] = []
+        for path in self.disk_dir.glob("*.json"):
+            try:
+                files.append((path.stat().st_mtime, path))
+            except OSError:
+                # 其他行程剛刪除的檔案
+                continue
+        excess = len(files) - self.disk_maxsize
+        if excess > 0:
+            files.sort()
+            for _, path in files[:excess]:
+                path.unlink(missing_ok=True)
+        with self._lock:
+            self._disk_count = min(len(files), self.disk_maxsize)
+
+    def _remember(self, key: str, entry: CachedResults):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
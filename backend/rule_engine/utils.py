@@ -1,7 +1,15 @@
-import re
+import hashlib
+from collections.abc import Sequence
+from pydantic import TypeAdapter
 from rule_engine.models.course import StudentCourse
 from rule_engine.models.rule import *
-from rule_engine.models.result import Result, AllResult
+from rule_engine.models.result import Result
+from rule_engine.models.student import Student
+from rule_engine.departments import department_registry
+from rule_engine.matcher import CriteriaMatcher
+from rule_engine.record import ResultRecord
+
+_courses_adapter: TypeAdapter[list[StudentCourse]] = TypeAdapter(list[StudentCourse])
 
 
 class UtilFunctions:
@@ -19,86 +27,58 @@ class UtilFunctions:
             return "未知狀態"
 
     @staticmethod
-    def match_criteria(
-        course: StudentCourse,
-        criteria: CourseCriteria,
-    ) -> bool:
-        """檢查學生課程是否符合篩選條件"""
-
-        # 課程名稱模式
-        if criteria.course_code_pattern:
-            if not all(
-                re.match(criteria.course_code_pattern, code)
-                for code in course.course_codes
-            ):
-                return False
+    def fingerprint_courses(courses: Sequence[StudentCourse]) -> str:
+        """
+        計算修課列表的指紋（SHA-256），任何課程內容、順序或數量改變都會得到不同的值
 
-        # 課程代碼模式
-        if criteria.course_name_pattern:
-            if not re.match(criteria.course_name_pattern, course.course_name):
-                return False
+        recognized 為評估過程的狀態，不列入指紋
+        """
+        data = _courses_adapter.dump_json(
+            list(courses), exclude={"__all__": {"recognized"}}
+        )
+        return hashlib.sha256(data).hexdigest()
 
-        # 系所條件
-        if criteria.department_codes:
-            if not any(
-                code.startswith(dept)
-                for code in course.course_codes
-                for dept in criteria.department_codes
-            ):
-                return False
-            else:
-                if criteria.blacklist_courses:
-                    if course.course_name in criteria.blacklist_courses:
-                        return False
-
-        if criteria.exclude_department_codes:
-            if any(
-                code.startswith(dept)
-                for code in course.course_codes
-                for dept in criteria.exclude_department_codes
-            ):
-                if criteria.whitelist_courses:
-                    if course.course_name not in criteria.whitelist_courses:
-                        return False
-                else:
-                    return False
-
-        # 課程屬性
-        if criteria.course_types:
-            if course.course_type not in criteria.course_types:
-                return False
-
-        if criteria.categories:
-            if course.category not in criteria.categories:
-                return False
-
-        if criteria.tags:
-            if not all(tag in course.tag for tag in criteria.tags):
-                return False
+    @staticmethod
+    def fingerprint_student(student: Student) -> str:
+        """
+        計算學生資料的指紋（SHA-256），包含基本資料與修課列表
 
-        if criteria.exclude_same_name:
-            pass  # 這個條件需要在更高層次處理，因為需要知道本系課程名稱
+        修課順序會影響評估結果（RuleAll 依序承認課程），因此順序改變也視為不同
+        """
+        header = student.model_dump_json(include={"id", "name", "major"})
+        data = header + UtilFunctions.fingerprint_courses(student.courses)
+        return hashlib.sha256(data.encode("utf-8")).hexdigest()
 
-        if criteria.series_courses:
-            pass  # 這個條件需要在更高層次處理，因為需要知道系列課程的結構
+    @staticmethod
+    def rule_digest(rule: Rule) -> str:
+        """計算規則內容（正規化 JSON）的 SHA-256"""
+        return hashlib.sha256(rule.model_dump_json().encode("utf-8")).hexdigest()
 
-        # 成績條件
-        if not (60 <= course.grade <= 100) and not course.grade in (555, 999):
-            if not criteria.allow_fail:
-                return False
-            else:
-                if not (0 <= course.grade < 60):
-                    return False
+    @staticmethod
+    def compile_criteria(criteria: CourseCriteria) -> CriteriaMatcher:
+        """取得篩選條件的已編譯比對器，快取於條件物件上，條件被修改時會重新編譯"""
+        matcher = criteria._matcher
+        if matcher is None:
+            matcher = CriteriaMatcher(criteria)
+            criteria._matcher = matcher
+        return matcher
 
-        return True
+    @staticmethod
+    def match_criteria(
+        course: StudentCourse,
+        criteria: CourseCriteria,
+    ) -> bool:
+        """檢查學生課程是否符合篩選條件"""
+        # exclude_same_name 與 series_courses 需要在更高層次處理
+        return UtilFunctions.compile_criteria(criteria).match(course)
 
     @staticmethod
     def apply_requirement(
         rule: Rule,
-        result: Result,
+        result: Result | ResultRecord,
     ):
         """根據要求類型應用規則"""
-        if isinstance(result, AllResult):
+        if result.result_type == "rule_all":
             total_credits = sum(course.credit for course in result.finished_course_list)
             total_courses = len(result.finished_course_list)
         else:
@@ -158,29 +138,5 @@ class UtilFunctions:
                 raise ValueError(f"未知的需求類型: {rule.requirement.type}")
 
     def get_department_code(self, department_code: str) -> list[str]:
-        from pathlib import Path
-        import json
-
-        department_info_path = Path("data/departments_info.json")
-        if not department_info_path.exists():
-            raise FileNotFoundError("找不到 departments_info.json 檔案")
-        try:
-            department_info = json.loads(
-                department_info_path.read_text(encoding="utf-8")
-            )
-        except json.JSONDecodeError:
-            raise ValueError("departments_info.json 檔案格式錯誤")
-        except Exception as e:
-            raise IOError(f"讀取 departments_info.json 檔案時發生錯誤: {e}")
-
-        college = department_info[department_code].get("college")
-
-        department_codes: list[str] = []
-        for dept_code, dept_info in department_info.items():
-            if dept_info.get("college") == college:
-                department_codes.append(dept_code)
-
-        if not department_codes:
-            raise ValueError(f"找不到對應學院 {college} 的系所")
-
-        return department_codes
+        """與系所同學院的所有系所代碼（見 DepartmentRegistry.same_college）"""
+        return department_registry.same_college(department_code)
@@ -0,0 +1,158 @@
+import asyncio
+import threading
+import pytest
+from api.crud.job_crud import JobCancelled, JobManager
+from api.models.job_models import JobInfo
+
+
+class CountJob(JobInfo):
+    count: int = 0
+
+
+def wait(manager: JobManager, job_id: str) -> JobInfo:
+    async def last():
+        job = None
+        async for job in manager.watch(job_id, interval=0.01):
+            pass
+        return job
+
+    return asyncio.run(last())
+
+
+class TestJobManager:
+    @pytest.fixture
+    def manager(self, tmp_path):
+        manager = JobManager(CountJob, max_workers=1, report_dir=tmp_path, keep=1)
+        yield manager
+        manager.shutdown()
+
+    def test_completed_job(self, manager, tmp_path):
+        def run(job: CountJob):
+            for _ in range(3):
+                manager.update(
+                    job.job_id, lambda job: setattr(job, "count", job.count + 1)
+                )
+
+        job = manager.submit(CountJob(job_id="a"), run)
+        assert job.status == "pending"
+
+        job = wait(manager, "a")
+        assert job.status == "completed"
+        assert job.count == 3
+        assert job.started_at is not None and job.finished_at is not None
+        assert CountJob.model_validate_json((tmp_path / "a.json").read_text()) == job
+
+    def test_failed_job(self, manager):
+        def run(job: CountJob):
+            raise ValueError("壞掉了")
+
+        manager.submit(CountJob(job_id="a"), run)
+
+        job = wait(manager, "a")
+        assert job.status == "failed"
+        assert job.message == "壞掉了"
+
+    def test_finished_jobs_are_read_from_report(self, manager):
+        for job_id in ("a", "b", "c"):
+            manager.submit(CountJob(job_id=job_id), lambda job: None)
+            wait(manager, job_id)
+
+        # 只保留最近一個工作在記憶體中，其餘從報告檔案讀取
+        assert [manager.get(job_id).status for job_id in "abc"] == ["completed"] * 3
+        assert set(manager._jobs) == set(manager._versions) == set(manager._reports)
+        with pytest.raises(FileNotFoundError):
+            manager.get("missing")
+
+    def test_watch_yields_each_change(self, manager):
+        release = threading.Event()
+
+        def run(job: CountJob):
+            release.wait(5)
+            manager.update(job.job_id, lambda job: setattr(job, "count", 1))
+
+        manager.submit(CountJob(job_id="a"), run)
+
+        async def collect():
+            seen = []
+            async for job in manager.watch("a", interval=0.01):
+                seen.append(job)
+                if job.status == "running":
+                    release.set()
+            return seen
+
+        seen = asyncio.run(collect())
+        assert seen[-1].status == "completed"
+        assert [job.version for job in seen] == sorted({job.version for job in seen})
+        assert any(job.status == "running" for job in seen)
+
+    def test_cancel_running_job(self, manager):
+        started = threading.Event()
+
+        def run(job: CountJob):
+            started.set()
+            while not manager.cancel_requested(job.job_id):
+                threading.Event().wait(0.01)
+            raise JobCancelled()
+
+        manager.submit(CountJob(job_id="a"), run)
+        started.wait(5)
+        assert manager.cancel("a").cancel_requested
+
+        job = wait(manager, "a")
+        assert job.status == "cancelled"
+        assert job.finished
+
+    def test_cancel_pending_job_skips_it(self, manager):
+        release = threading.Event()
+        ran = []
+
+        manager.submit(CountJob(job_id="a"), lambda job: release.wait(5))
+        manager.submit(CountJob(job_id="b"), lambda job: ran.append(job.job_id))
+        manager.cancel("b")
+        release.set()
+
+        assert wait(manager, "b").status == "cancelled"
+        assert wait(manager, "a").status == "completed"
+        assert ran == []
+
+    def test_cancel_finished_job_is_noop(self, manager):
+        manager.submit(CountJob(job_id="a"), lambda job: None)
+        wait(manager, "a")
+
+        job = manager.cancel("a")
+        assert job.status == "completed"
+        assert not job.cancel_requested
+        with pytest.raises(FileNotFoundError):
+            manager.cancel("missing")
+
+    def test_get_if_changed(self, manager, monkeypatch):
+        manager.submit(CountJob(job_id="a"), lambda job: None)
+        job = wait(manager, "a")
+        copies = []
+        model_copy = CountJob.model_copy
+
+        def counting_model_copy(self, *args, **kwargs):
+            copies.append(self.job_id)
+            return model_copy(self, *args, **kwargs)
+
+        monkeypatch.setattr(CountJob, "model_copy", counting_model_copy)
+
+        assert manager.get_if_changed("a", job.version) is None
+        assert copies == []
+        assert manager.get_if_changed("a", job.version - 1) == job
+        with pytest.raises(FileNotFoundError):
+            manager.get_if_changed("missing", -1)
+
+    def test_watch_polls_in_io_executor(self, manager, monkeypatch):
+        threads = []
+        get_if_changed = manager.get_if_changed
+
+        def recording_get_if_changed(job_id, version):
+            threads.append(threading.current_thread().name)
+            return get_if_changed(job_id, version)
+
+        monkeypatch.setattr(manager, "get_if_changed", recording_get_if_changed)
+        manager.submit(CountJob(job_id="a"), lambda job: None)
+
+        assert wait(manager, "a").status == "completed"
+        assert threads and all(name.startswith("io") for name in threads)
@@ -0,0 +1,465 @@
+import asyncio
+import threading
+import shutil
+from pathlib import Path
+import pytest
+import json
+import os
+from api.crud import review_crud
+from api.crud.review_crud import ReviewCRUD, review_cache
+from api.crud.result_crud import ResultCRUD
+from api.executors import shutdown_process_pools
+from api.crud.student_crud import StudentCRUD
+from api.models.review_models import BatchReviewLine, ReviewOptions, SimulatedCourse
+from api.storage import JsonStorage, set_storage
+from rule_engine.models.course import StudentCourse
+from rule_engine.profiler import EvaluationProfiler
+
+DATA_DIR = Path(__file__).resolve().parents[4] / "data"
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    shutil.copytree(DATA_DIR, tmp_path / "data")
+    monkeypatch.chdir(tmp_path)
+    review_cache.clear()
+    yield tmp_path / "data"
+    review_cache.clear()
+    # 不留下使用暫存目錄的 worker 行程
+    shutdown_process_pools()
+
+
+class TestBatchReview:
+    @pytest.mark.parametrize("max_workers", [1, 2])
+    def test_results_in_submission_order(self, data_dir, max_workers):
+        student_ids = ["AN4116089", "B51110001", "AN4116089"]
+        options = ReviewOptions(minor=["B5"])
+
+        items = ReviewCRUD.review_students(
+            student_ids, options, max_workers=max_workers, save_result=False
+        )
+
+        assert [item.student_id for item in items] == student_ids
+        assert [item.success for item in items] == [True, False, True]
+        assert items[1].error
+        assert options.minor == ["B5"]
+
+        expected = ReviewCRUD.review_student(
+            StudentCRUD.get_student_by_id("AN4116089"),
+            minor_departments=["B5"],
+            save_result=False,
+        )
+        for item in (items[0], items[2]):
+            assert item.results is not None
+            assert {k: v.to_dict() for k, v in item.results.items() if v} == {
+                k: v.to_dict() for k, v in expected.items() if v
+            }
+
+    def test_save_result(self, data_dir):
+        ReviewCRUD.review_students(
+            ["AN4116089"], ReviewOptions(minor=["B5"]), max_workers=1
+        )
+        assert len(list((data_dir / "evaluation_results").glob("*.json"))) == 1
+
+    @pytest.mark.parametrize("max_workers", [1, 2])
+    def test_iter_yields_every_position_once(self, data_dir, max_workers):
+        student_ids = ["AN4116089", "B51110001", "AN4116089"]
+
+        pairs = list(
+            ReviewCRUD.iter_review_students(
+                student_ids,
+                ReviewOptions(minor=["B5"]),
+                max_workers=max_workers,
+                save_result=False,
+            )
+        )
+
+        assert sorted(position for position, _ in pairs) == [0, 1, 2]
+        for position, item in pairs:
+            assert item.student_id == student_ids[position]
+        successes = [item for _, item in pairs if item.success]
+        assert len(successes) == 2
+        assert all(item.student.id == "AN4116089" for item in successes)
+
+    def test_rules_selected_once_per_batch(self, data_dir, monkeypatch):
+        calls = []
+        select_rule = ReviewCRUD.select_rule
+
+        def counting_select_rule(*key):
+            calls.append(key)
+            return select_rule(*key)
+
+        monkeypatch.setattr(
+            ReviewCRUD, "select_rule", staticmethod(counting_select_rule)
+        )
+        options = ReviewOptions(minor=["B5"])
+
+        ReviewCRUD.review_students(
+            ["AN4116089"], options, max_workers=1, save_result=False
+        )
+        first_batch = len(calls)
+        review_cache.clear()
+        ReviewCRUD.review_students(
+            ["AN4116089"] * 3, options, max_workers=1, save_result=False
+        )
+
+        assert first_batch > 0
+        assert len(calls) == 2 * first_batch
+
+    def test_interleaved_batches_keep_their_own_rules(self, data_dir, monkeypatch):
+        calls = []
+        select_rule = ReviewCRUD.select_rule
+
+        def counting_select_rule(*key):
+            calls.append(key)
+            return select_rule(*key)
+
+        monkeypatch.setattr(
+            ReviewCRUD, "select_rule", staticmethod(counting_select_rule)
+        )
+        options = ReviewOptions(minor=["B5"])
+        first = ReviewCRUD.iter_review_students(
+            ["AN4116089"] * 3, options, max_workers=1, save_result=False
+        )
+
+        next(first)
+        per_batch = len(calls)
+        list(
+            ReviewCRUD.iter_review_students(
+                ["AN4116089"] * 2, options, max_workers=1, save_result=False
+            )
+        )
+        list(first)
+
+        assert per_batch > 0
+        assert len(calls) == 2 * per_batch
+        assert not review_crud._batch_rules
+
+
+class TestAsyncReview:
+    def test_matches_sync_review(self, data_dir):
+        student = StudentCRUD.get_student_by_id("AN4116089")
+
+        student_info, results = asyncio.run(
+            ReviewCRUD.review_student_async(
+                "AN4116089", minor_departments=["B5"], save_result=False
+            )
+        )
+
+        expected = ReviewCRUD.review_student(
+            student, minor_departments=["B5"], save_result=False
+        )
+        assert student_info.id == student.id and student_info.name == student.name
+        assert {key: record.to_dict() for key, record in results.items()} == {
+            key: record.to_dict() for key, record in expected.items()
+        }
+        assert not (data_dir / "evaluation_results").exists()
+
+    def test_profile_entries_return_from_worker(self, data_dir):
+        profiler = EvaluationProfiler()
+
+        asyncio.run(
+            ReviewCRUD.review_student_async(
+                "AN4116089",
+                minor_departments=["B5"],
+                save_result=False,
+                profiler=profiler,
+            )
+        )
+
+        assert profiler.entries
+        assert profiler.entries[0].depth == 0
+
+    def test_saves_result_from_worker(self, data_dir):
+        asyncio.run(
+            ReviewCRUD.review_student_async("AN4116089", minor_departments=["B5"])
+        )
+
+        assert len(ResultCRUD.get_all_results().items) == 1
+
+    def test_missing_student(self, data_dir):
+        with pytest.raises(FileNotFoundError):
+            asyncio.run(ReviewCRUD.review_student_async("X00000000"))
+
+    def test_worker_uses_storage_set_at_runtime(self, data_dir, tmp_path):
+        asyncio.run(
+            ReviewCRUD.review_student_async("AN4116089", minor_departments=["B5"])
+        )
+        other = tmp_path / "other"
+        shutil.copytree(DATA_DIR, other)
+
+        # 行程池已經建立，之後替換的儲存層仍傳給 worker 行程
+        previous = set_storage(JsonStorage(other))
+        try:
+            asyncio.run(
+                ReviewCRUD.review_student_async("AN4116089", minor_departments=["B5"])
+            )
+        finally:
+            set_storage(previous)
+
+        assert len(list((data_dir / "evaluation_results").glob("*.json"))) == 1
+        assert len(list((other / "evaluation_results").glob("*.json"))) == 1
+
+    def test_simulate_matches_sync_simulation(self, data_dir):
+        student = StudentCRUD.get_cached_student("AN4116089")
+        course = SimulatedCourse(
+            course_name="台灣文學史（一）", course_codes=["B510010"], credit=3.0
+        )
+
+        student_info, outcomes = asyncio.run(
+            ReviewCRUD.simulate_student_async(
+                "AN4116089", [[], [course]], minor_departments=["B5"]
+            )
+        )
+
+        year, semester = ReviewCRUD.next_semester(student)
+        expected = ReviewCRUD.simulate_student(
+            student,
+            [[], [course.to_student_course(year, semester)]],
+            minor_departments=["B5"],
+        )
+        assert student_info.id == "AN4116089"
+        assert [
+            {k: v.to_dict() for k, v in outcome.items() if v} for outcome in outcomes
+        ] == [{k: v.to_dict() for k, v in outcome.items() if v} for outcome in expected]
+
+    def test_simulate_invalid_course(self, data_dir):
+        course = SimulatedCourse(
+            course_name="課程", course_codes=["B510010"], credit=3.0, category=""
+        )
+
+        with pytest.raises(review_crud.SimulationInputError):
+            asyncio.run(ReviewCRUD.simulate_student_async("AN4116089", [[course]]))
+
+
+class TestBatchReviewLine:
+    def test_from_item(self, data_dir):
+        ok, failed = ReviewCRUD.review_students(
+            ["AN4116089", "B51110001"],
+            ReviewOptions(minor=["B5"]),
+            max_workers=1,
+            save_result=False,
+        )
+
+        line = BatchReviewLine.from_item(0, ok)
+        assert line.success and line.student_info.id == "AN4116089"
+        assert line.is_eligible_for_graduation == ok.results["main"].is_valid
+        assert set(line.review_validity) == set(ok.results)
+        assert line.evaluation_results is None
+        assert BatchReviewLine.from_item(0, ok, include_details=True).evaluation_results
+
+        line = BatchReviewLine.from_item(1, failed)
+        assert not line.success and line.error == failed.error
+
+
+class TestReviewJob:
+    def wait(self, job_id):
+        async def collect():
+            return [job async for job in ReviewCRUD.watch_review_job(job_id)]
+
+        return asyncio.run(collect())
+
+    def test_job_writes_results_and_progress(self, data_dir):
+        student_ids = ["AN4116089", "B51110001"]
+        job = ReviewCRUD.submit_review_job(
+            student_ids, ReviewOptions(minor=["B5"]), max_workers=1
+        )
+        assert job.progress.total == 2
+
+        updates = self.wait(job.job_id)
+        job = ReviewCRUD.get_review_job(job.job_id)
+        assert updates[-1] == job
+        assert job.status == "completed"
+        assert (job.progress.completed, job.progress.succeeded) == (2, 1)
+        assert job.progress.failed == 1
+
+        path = ReviewCRUD.get_review_job_results(job.job_id)
+        lines = [
+            BatchReviewLine.model_validate_json(line)
+            for line in path.read_text(encoding="utf-8").splitlines()
+        ]
+        assert sorted((line.index, line.student_id) for line in lines) == list(
+            enumerate(student_ids)
+        )
+        # 成功的審查結果保存到審查結果中
+        assert len(list((data_dir / "evaluation_results").glob("*.json"))) == 1
+
+    def test_missing_job_results(self, data_dir):
+        with pytest.raises(FileNotFoundError):
+            ReviewCRUD.get_review_job_results("missing")
+
+
+class TestReviewCache:
+    def review(self, student_id="AN4116089", **kwargs):
+        return ReviewCRUD.review_student(
+            StudentCRUD.get_student_by_id(student_id),
+            minor_departments=["B5"],
+            **kwargs,
+        )
+
+    def result_files(self, data_dir):
+        return list((data_dir / "evaluation_results").glob("*.json"))
+
+    def test_hit_skips_evaluation(self, data_dir):
+        first = self.review()
+        second = self.review()
+
+        assert second is first
+        assert self.result_files(data_dir)
+
+    def test_hit_after_unsaved_review_still_saves(self, data_dir):
+        self.review(save_result=False)
+        self.review()
+
+        assert self.result_files(data_dir)
+
+    def test_hit_saves_again_after_results_deleted(self, data_dir):
+        first = self.review()
+        [result_file] = self.result_files(data_dir)
+        ResultCRUD.delete_result_by_filename(result_file.name)
+
+        assert self.review() is first
+        assert len(self.result_files(data_dir)) == 1
+
+    def test_disk_tier_survives_memory_clear(self, data_dir, monkeypatch):
+        monkeypatch.setattr(review_cache, "disk_dir", data_dir / "review_cache")
+        first = self.review()
+        review_cache.clear()
+        second = self.review()
+
+        assert second is not first
+        assert {k: v.to_dict() for k, v in second.items() if v} == {
+            k: v.to_dict() for k, v in first.items() if v
+        }
+
+    def test_disk_tier_is_off_by_default(self, data_dir):
+        self.review()
+
+        assert review_cache.disk_dir is None
+        assert not (data_dir / "review_cache").exists()
+
+    def test_deleting_student_clears_disk_tier(self, data_dir, monkeypatch):
+        monkeypatch.setattr(review_cache, "disk_dir", data_dir / "review_cache")
+        self.review()
+        assert list((data_dir / "review_cache").glob("*.json"))
+
+        StudentCRUD.delete_student_by_id("AN4116089")
+
+        assert not list((data_dir / "review_cache").glob("*.json"))
+
+    def test_worker_clears_memory_after_caller_clears(self, data_dir):
+        first = self.review()
+        generation = review_crud._review_cache_generation
+
+        # 與呼叫端相同的次數不清除；呼叫端清除後（次數改變）worker 行程在審查前清除
+        review_crud._sync_review_cache(generation)
+        assert self.review() is first
+        review_crud._sync_review_cache(generation + 1)
+        assert self.review() is not first
+
+    def test_clear_does_not_clear_again_on_sync(self, data_dir):
+        review_crud.clear_review_cache()
+        first = self.review()
+
+        review_crud._sync_review_cache(review_crud._review_cache_generation)
+
+        assert self.review() is first
+
+    def test_transcript_change_invalidates(self, data_dir):
+        first = self.review()
+
+        student_file = data_dir / "students" / "AN4116089.json"
+        student_data = json.loads(student_file.read_text(encoding="utf-8"))
+        student_data["courses"][0]["grade"] = 0
+        student_file.write_text(json.dumps(student_data), encoding="utf-8")
+
+        assert self.review() is not first
+
+    def test_rule_change_invalidates(self, data_dir):
+        first = self.review()
+
+        rule_file = next((data_dir / "rules" / "B5").glob("*_minor.json"))
+        rule_data = json.loads(rule_file.read_text(encoding="utf-8"))
+        rule_data["description"] = "修改過的規則"
+        rule_file.write_text(json.dumps(rule_data), encoding="utf-8")
+
+        assert self.review() is not first
+
+    def test_options_are_part_of_key(self, data_dir):
+        first = self.review()
+        second = ReviewCRUD.review_student(
+            StudentCRUD.get_student_by_id("AN4116089"),
+            minor_departments=["B5"],
+            double_major_department="B5",
+        )
+
+        assert second is not first
+
+
+class TestSharedRules:
+    def test_undeclared_review_does_not_modify_shared_rule(self, data_dir):
+        student = StudentCRUD.get_student_by_id("AN4116089")
+        shared = ReviewCRUD.select_rule("AN", student.admission_year, "major")
+        original = shared.model_copy(deep=True)
+
+        first = ReviewCRUD.review_student(
+            student, minor_departments=["B5"], save_result=False, use_cache=False
+        )
+        second = ReviewCRUD.review_student(
+            student, minor_departments=["H5"], save_result=False, use_cache=False
+        )
+
+        assert ReviewCRUD.select_rule("AN", student.admission_year, "major") is shared
+        assert shared == original
+        assert first["main"].to_dict() != second["main"].to_dict()
+
+
+class TestSimulation:
+    def test_variants_match_review_with_added_courses(self, data_dir):
+        student = StudentCRUD.get_cached_student("AN4116089")
+        before = student.model_dump()
+        year, semester = ReviewCRUD.next_semester(student)
+        variants = [
+            [],
+            [
+                StudentCourse(
+                    course_name="台灣文學史（一）",
+                    course_codes=["B510010"],
+                    credit=3.0,
+                    course_type=1,
+                    grade=60,
+                    category=" ",
+                    year_taken=year,
+                    semester_taken=semester,
+                )
+            ],
+        ]
+
+        outcomes = ReviewCRUD.simulate_student(
+            student, variants, minor_departments=["B5"]
+        )
+
+        assert student.model_dump() == before
+        assert not (data_dir / "evaluation_results").exists()
+        for added, outcome in zip(variants, outcomes):
+            expected = ReviewCRUD.review_student(
+                student.model_copy(update={"courses": student.courses + added}),
+                minor_departments=["B5"],
+                save_result=False,
+                use_cache=False,
+            )
+            assert {k: v.to_dict() for k, v in outcome.items() if v} == {
+                k: v.to_dict() for k, v in expected.items() if v
+            }
+
+    def test_cached_student_reloads_after_change(self, data_dir):
+        first = StudentCRUD.get_cached_student("AN4116089")
+        assert StudentCRUD.get_cached_student("AN4116089") is first
+
+        student_file = data_dir / "students" / "AN4116089.json"
+        student_file.write_text(
+            student_file.read_text(encoding="utf-8"), encoding="utf-8"
+        )
+        os.utime(student_file, ns=(0, 0))
+
+        assert StudentCRUD.get_cached_student("AN4116089") is not first
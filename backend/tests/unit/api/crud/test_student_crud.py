@@ -0,0 +1,175 @@
+import asyncio
+import shutil
+from pathlib import Path
+import pytest
+from api.crud.student_crud import StudentCRUD
+from api.models.job_models import ImportJob
+from api.storage import JsonStorage
+from benchmarks.generator import DataGenerator
+
+DATA_DIR = Path(__file__).resolve().parents[4] / "data"
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    shutil.copytree(DATA_DIR, tmp_path / "data")
+    monkeypatch.chdir(tmp_path)
+    yield tmp_path / "data"
+
+
+class TestImportStudentsFromExcel:
+    def test_students_are_saved(self, data_dir, tmp_path):
+        students = DataGenerator(seed=1).students(5, 8)
+        excel_file = tmp_path / "students.xlsx"
+        DataGenerator.write_excel(students, excel_file)
+
+        imported, errors = StudentCRUD.import_students_from_excel(excel_file, "AN")
+
+        assert errors == []
+        assert [info.id for info in imported] == [student.id for student in students]
+        for student in students:
+            saved = StudentCRUD.get_student_by_id(student.id)
+            assert saved.major == "AN"
+            # Excel 沒有標籤欄位
+            assert saved.courses == [
+                course.model_copy(update={"tag": []}) for course in student.courses
+            ]
+
+
+class TestIncrementalImport:
+    @pytest.fixture
+    def students(self):
+        return DataGenerator(seed=4).students(4, 6)
+
+    def import_excel(self, students, tmp_path, incremental=True):
+        excel_file = tmp_path / "students.xlsx"
+        DataGenerator.write_excel(students, excel_file)
+        imported, _ = StudentCRUD.import_students_from_excel(
+            excel_file, "AN", incremental=incremental
+        )
+        return {info.id: (info.status, info.written) for info in imported}
+
+    def mtimes(self, data_dir) -> dict[str, int]:
+        return {
+            f.stem: f.stat().st_mtime_ns for f in (data_dir / "students").glob("*.json")
+        }
+
+    def test_unchanged_students_are_not_written(self, data_dir, tmp_path, students):
+        first = self.import_excel(students, tmp_path)
+        assert set(first.values()) == {("added", True)}
+        before = self.mtimes(data_dir)
+
+        second = self.import_excel(students, tmp_path)
+
+        assert set(second.values()) == {("unchanged", False)}
+        assert self.mtimes(data_dir) == before
+
+    def test_changed_and_added_students(self, data_dir, tmp_path, students):
+        self.import_excel(students[:3], tmp_path)
+        changed = students[1]
+        changed.courses[0] = changed.courses[0].model_copy(update={"grade": 1})
+
+        result = self.import_excel(students, tmp_path)
+
+        assert result == {
+            students[0].id: ("unchanged", False),
+            students[1].id: ("changed", True),
+            students[2].id: ("unchanged", False),
+            students[3].id: ("added", True),
+        }
+        assert StudentCRUD.get_student_by_id(changed.id).courses[0].grade == 1
+
+    def test_full_import_rewrites_every_student(
+        self, data_dir, tmp_path, students, monkeypatch
+    ):
+        self.import_excel(students, tmp_path)
+
+        # 完整匯入不讀取既有學生的指紋
+        def fail(self, student_id):
+            raise AssertionError(f"讀取了 {student_id} 的指紋")
+
+        monkeypatch.setattr(JsonStorage, "student_fingerprint", fail)
+        result = self.import_excel(students, tmp_path, incremental=False)
+
+        assert set(result.values()) == {("imported", True)}
+
+    def test_files_edited_outside_import_are_compared(
+        self, data_dir, tmp_path, students
+    ):
+        self.import_excel(students, tmp_path)
+        # 直接修改學生檔案後，索引中的指紋已過期，需重新讀取檔案比較
+        student_file = data_dir / "students" / f"{students[0].id}.json"
+        student_file.write_text(
+            student_file.read_text(encoding="utf-8").replace(
+                students[0].name, "王大明"
+            ),
+            encoding="utf-8",
+        )
+
+        result = self.import_excel(students, tmp_path)
+
+        assert result[students[0].id] == ("changed", True)
+        assert StudentCRUD.get_student_by_id(students[0].id).name == students[0].name
+        assert [status for status, _ in result.values()].count("unchanged") == 3
+
+
+class TestImportJob:
+    def wait(self, job_id: str) -> list[ImportJob]:
+        async def collect():
+            return [job async for job in StudentCRUD.watch_import_job(job_id)]
+
+        return asyncio.run(collect())
+
+    def test_job_reports_progress_and_result(self, data_dir, tmp_path):
+        students = DataGenerator(seed=2).students(4, 6)
+        excel_file = tmp_path / "upload.xlsx"
+        DataGenerator.write_excel(students, excel_file)
+
+        job = StudentCRUD.submit_import_job(excel_file, "students.xlsx", "AN")
+        updates = self.wait(job.job_id)
+
+        job = StudentCRUD.get_import_job(job.job_id)
+        assert updates[-1] == job
+        assert job.status == "completed"
+        assert job.progress.rows_read == job.progress.total_rows == 24
+        assert job.progress.students_written == job.progress.imported == 4
+        assert [student.id for student in job.students] == [s.id for s in students]
+        assert [student.courses for student in job.students] == [6] * 4
+        assert job.errors == []
+        # 上傳的暫存檔案在匯入後刪除，工作報告保留
+        assert not excel_file.exists()
+        assert (data_dir / "import_jobs" / f"{job.job_id}.json").exists()
+        for student in students:
+            assert (data_dir / "students" / f"{student.id}.json").exists()
+
+    def test_failed_job(self, data_dir, tmp_path):
+        excel_file = tmp_path / "upload.xlsx"
+        excel_file.write_bytes(b"not an excel file")
+
+        job = StudentCRUD.submit_import_job(excel_file, "broken.xlsx", "AN")
+        self.wait(job.job_id)
+
+        job = StudentCRUD.get_import_job(job.job_id)
+        assert job.status == "failed"
+        assert "無法讀取 Excel 檔案" in job.message
+        assert not excel_file.exists()
+
+
+class TestAsyncVariants:
+    def test_match_sync_methods(self, data_dir):
+        async def load():
+            return await asyncio.gather(
+                StudentCRUD.get_student_by_id_async("AN4116089"),
+                StudentCRUD.query_students_async(),
+                StudentCRUD.student_version_async("AN4116089"),
+            )
+
+        student, page, version = asyncio.run(load())
+
+        assert student == StudentCRUD.get_student_by_id("AN4116089")
+        assert page == StudentCRUD.query_students()
+        assert version == StudentCRUD.student_version("AN4116089")
+
+    def test_errors_propagate(self, data_dir):
+        with pytest.raises(FileNotFoundError):
+            asyncio.run(StudentCRUD.get_student_by_id_async("B51110001"))
@@ -0,0 +1,320 @@
+import asyncio
+import json
+import shutil
+import threading
+from pathlib import Path
+import pytest
+from fastapi.testclient import TestClient
+from api.crud.review_crud import ReviewCRUD, review_cache
+from api.executors import shutdown_process_pools
+from api.main import app
+
+DATA_DIR = Path(__file__).resolve().parents[4] / "data"
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    shutil.copytree(DATA_DIR, tmp_path / "data")
+    monkeypatch.chdir(tmp_path)
+    review_cache.clear()
+    yield tmp_path / "data"
+    review_cache.clear()
+    shutdown_process_pools()
+
+
+@pytest.fixture
+def client(data_dir):
+    with TestClient(app) as client:
+        yield client
+
+
+def ndjson(text: str) -> list[dict]:
+    return [json.loads(line) for line in text.splitlines()]
+
+
+async def post_until_lines(path: str, body: dict, lines: int) -> list[bytes]:
+    """以 ASGI 直接呼叫 app，收到 lines 個回應區塊後中斷連線"""
+    chunks: list[bytes] = []
+    disconnected = asyncio.Event()
+    request_sent = False
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {
+                "type": "http.request",
+                "body": json.dumps(body).encode(),
+                "more_body": False,
+            }
+        await disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.body" and message.get("body"):
+            chunks.append(message["body"])
+            if len(chunks) >= lines:
+                disconnected.set()
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"content-type", b"application/json")],
+        "client": ("testclient", 50000),
+        "server": ("testserver", 80),
+    }
+    await app(scope, receive, send)
+    return chunks
+
+
+class TestBatchReview:
+    def test_streams_one_line_per_student(self, client):
+        student_ids = ["AN4116089", "B51110001", "AN4116089"]
+
+        response = client.post(
+            "/review/batch",
+            json={
+                "student_ids": student_ids,
+                "options": {"minor": ["B5"]},
+                "save_result": False,
+            },
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        assert response.headers["x-batch-size"] == "3"
+        lines = sorted(ndjson(response.text), key=lambda line: line["index"])
+        assert [line["index"] for line in lines] == [0, 1, 2]
+        assert [line["student_id"] for line in lines] == student_ids
+        assert [line["success"] for line in lines] == [True, False, True]
+        assert lines[0]["student_info"]["id"] == "AN4116089"
+        assert lines[0]["evaluation_results"] is None
+        assert lines[1]["error"]
+
+    def test_include_details(self, client):
+        response = client.post(
+            "/review/batch",
+            json={
+                "student_ids": ["AN4116089"],
+                "options": {"minor": ["B5"]},
+                "save_result": False,
+                "include_details": True,
+            },
+        )
+
+        [line] = ndjson(response.text)
+        assert (
+            line["evaluation_results"]["is_valid"] == line["is_eligible_for_graduation"]
+        )
+
+    def test_requires_one_selection(self, client):
+        response = client.post("/review/batch", json={"options": {"minor": ["B5"]}})
+
+        assert response.status_code == 422
+
+    def test_disconnect_stops_the_batch(self, data_dir, monkeypatch):
+        student_ids = ["AN4116089"] * 50
+        iter_review_students = ReviewCRUD.iter_review_students
+        yielded = []
+        closed = threading.Event()
+
+        def recording_iter(*args, **kwargs):
+            try:
+                for pair in iter_review_students(*args, **kwargs):
+                    yielded.append(pair)
+                    yield pair
+            finally:
+                closed.set()
+
+        monkeypatch.setattr(
+            ReviewCRUD, "iter_review_students", staticmethod(recording_iter)
+        )
+
+        chunks = asyncio.run(
+            post_until_lines(
+                "/review/batch",
+                {
+                    "student_ids": student_ids,
+                    "options": {"minor": ["B5"]},
+                    "save_result": False,
+                },
+                lines=1,
+            )
+        )
+
+        # 連線中斷後批次停止（尚未開始的審查被取消），不會審查完所有學生
+        assert closed.wait(10)
+        assert json.loads(chunks[0])["success"]
+        assert len(yielded) < len(student_ids)
+
+
+def sse(text: str) -> list[tuple[str, dict]]:
+    """Server-Sent Events 的 (event, data) 列表"""
+    events = []
+    for frame in text.split("\n\n"):
+        if not frame:
+            continue
+        fields = dict(line.split(": ", 1) for line in frame.splitlines())
+        events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+class TestReviewJobs:
+    def submit(self, client, student_ids):
+        response = client.post(
+            "/review/jobs",
+            json={"student_ids": student_ids, "options": {"minor": ["B5"]}},
+        )
+        assert response.status_code == 202
+        return response.json()["data"]
+
+    def test_events_until_done_then_results(self, client, data_dir):
+        job = self.submit(client, ["AN4116089", "B51110001"])
+        assert job["progress"]["total"] == 2
+
+        response = client.get(f"/review/jobs/{job['job_id']}/events")
+
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = sse(response.text)
+        assert [event for event, _ in events[:-1]] == ["progress"] * (len(events) - 1)
+        event, last = events[-1]
+        assert event == "done"
+        assert last["status"] == "completed"
+        assert (last["progress"]["completed"], last["progress"]["failed"]) == (2, 1)
+        # 每個事件都是狀態改變後的新版本
+        versions = [data["version"] for _, data in events]
+        assert versions == sorted(set(versions))
+
+        status = client.get(f"/review/jobs/{job['job_id']}").json()["data"]
+        assert status == last
+
+        response = client.get(f"/review/jobs/{job['job_id']}/results")
+        assert response.headers["content-type"] == "application/x-ndjson"
+        lines = ndjson(response.text)
+        assert sorted(line["student_id"] for line in lines) == [
+            "AN4116089",
+            "B51110001",
+        ]
+        assert len(list((data_dir / "evaluation_results").glob("*.json"))) == 1
+
+    def test_cancel_running_job(self, client, monkeypatch):
+        started = threading.Event()
+        release = threading.Event()
+        iter_review_students = ReviewCRUD.iter_review_students
+
+        def blocking_iter(*args, **kwargs):
+            started.set()
+            release.wait(10)
+            yield from iter_review_students(*args, **kwargs)
+
+        monkeypatch.setattr(
+            ReviewCRUD, "iter_review_students", staticmethod(blocking_iter)
+        )
+        job = self.submit(client, ["AN4116089", "AN4116089"])
+        assert started.wait(10)
+
+        # 執行中的工作沒有結果可下載
+        response = client.get(f"/review/jobs/{job['job_id']}/results")
+        assert response.status_code == 409
+
+        response = client.post(f"/review/jobs/{job['job_id']}/cancel")
+        assert response.json()["data"]["cancel_requested"]
+        release.set()
+
+        event, data = sse(client.get(f"/review/jobs/{job['job_id']}/events").text)[-1]
+        assert event == "done" and data["status"] == "cancelled"
+        assert data["progress"]["completed"] < 2
+
+    def test_missing_job(self, client):
+        for response in (
+            client.get("/review/jobs/missing"),
+            client.get("/review/jobs/missing/events"),
+            client.post("/review/jobs/missing/cancel"),
+            client.get("/review/jobs/missing/results"),
+        ):
+            assert response.status_code == 404
+
+
+class TestReviewStudent:
+    def test_review(self, client, data_dir):
+        response = client.post("/review/AN4116089", params={"minor": "B5"})
+
+        assert response.status_code == 200
+        data = response.json()["data"]
+        assert data["student_info"]["id"] == "AN4116089"
+        assert data["is_eligible_for_graduation"] == (
+            data["evaluation_results"]["is_valid"]
+        )
+        assert data["profile"] is None
+        assert len(list((data_dir / "evaluation_results").glob("*.json"))) == 1
+
+    def test_profile(self, client):
+        response = client.post(
+            "/review/AN4116089", params={"minor": "B5", "profile": True}
+        )
+
+        assert response.json()["data"]["profile"][0]["depth"] == 0
+
+    def test_missing_student(self, client):
+        response = client.post("/review/X00000000")
+
+        assert response.status_code == 404
+        assert response.json()["detail"] == "找不到學生 X00000000"
+
+    def test_undeclared_student_requires_minor(self, client):
+        assert client.post("/review/AN4116089").status_code == 400
+
+    def test_simulate(self, client, data_dir):
+        course = {
+            "course_name": "台灣文學史（一）",
+            "course_codes": ["B510010"],
+            "credit": 3.0,
+        }
+
+        response = client.post(
+            "/review/AN4116089/simulate",
+            json={
+                "minor": ["B5"],
+                "variants": [{"courses": []}, {"courses": [course]}],
+            },
+        )
+
+        assert response.status_code == 200
+        data = response.json()["data"]
+        assert data["student_info"]["id"] == "AN4116089"
+        assert [variant["name"] for variant in data["variants"]] == ["方案 1", "方案 2"]
+        assert (
+            data["variants"][1]["earned_credits"]
+            >= data["variants"][0]["earned_credits"]
+        )
+        assert not (data_dir / "evaluation_results").exists()
+
+    def test_simulate_invalid_course(self, client):
+        course = {
+            "course_name": "課程",
+            "course_codes": ["B510010"],
+            "credit": 3.0,
+            "category": "",
+        }
+
+        response = client.post(
+            "/review/AN4116089/simulate",
+            json={"minor": ["B5"], "variants": [{"courses": [course]}]},
+        )
+
+        assert response.status_code == 422
+        assert response.json()["detail"].startswith("假設課程資料錯誤")
+
+    def test_simulate_missing_student(self, client):
+        response = client.post(
+            "/review/X00000000/simulate", json={"variants": [{"courses": []}]}
+        )
+
+        assert response.status_code == 404
@@ -0,0 +1,580 @@
+import json
+import multiprocessing
+import os
+import pickle
+import shutil
+from concurrent.futures import ProcessPoolExecutor, wait
+from datetime import datetime
+from pathlib import Path
+import orjson
+import pytest
+from api.crud.review_crud import ReviewCRUD, review_cache
+from api.crud.student_crud import StudentCRUD
+from api.models.result_models import ResultQuery
+from api.models.student_models import StudentQuery
+from api.storage import (
+    JsonStorage,
+    SqliteStorage,
+    json_storage,
+    set_storage,
+    sqlite_storage,
+)
+from api.storage.base import StudentCache
+from api.storage.json_storage import _result_manifests, _student_indexes, fcntl
+from api.storage.migrate import migrate
+from rule_engine.factory import RuleFactory, StudentFactory
+from rule_engine.record import AllRecord
+from rule_engine.utils import UtilFunctions
+
+DATA_DIR = Path(__file__).resolve().parents[4] / "data"
+
+
+@pytest.fixture(params=["json", "sqlite"])
+def storage(request, tmp_path):
+    if request.param == "json":
+        return JsonStorage(tmp_path / "data")
+    return SqliteStorage(tmp_path / "graduation.sqlite3")
+
+
+def storage_module(storage):
+    return json_storage if isinstance(storage, JsonStorage) else sqlite_storage
+
+
+@pytest.fixture
+def student():
+    return StudentFactory.from_json_file(DATA_DIR / "students" / "AN4116089.json")
+
+
+@pytest.fixture
+def rule():
+    return RuleFactory.from_json_file(DATA_DIR / "rules" / "B5" / "102_minor.json")
+
+
+class TestStudents:
+    def test_round_trip(self, storage, student):
+        assert storage.student_fingerprint(student.id) is None
+
+        storage.save_student(student)
+        storage.flush()
+
+        assert storage.get_student(student.id) == student
+        assert storage.get_cached_student(student.id) == student
+        assert storage.list_students() == [student]
+        assert storage.student_fingerprint(
+            student.id
+        ) == UtilFunctions.fingerprint_student(student)
+
+    def test_cached_student_is_refreshed_after_save(self, storage, student):
+        storage.save_student(student)
+        assert storage.get_cached_student(student.id).name == student.name
+
+        renamed = student.model_copy(update={"name": "新名字"})
+        storage.save_student(renamed)
+
+        assert storage.get_cached_student(student.id).name == "新名字"
+
+    def test_delete(self, storage, student):
+        with pytest.raises(FileNotFoundError):
+            storage.get_student(student.id)
+        assert storage.delete_student(student.id) is False
+
+        storage.save_student(student)
+        assert storage.delete_student(student.id) is True
+        with pytest.raises(FileNotFoundError):
+            storage.get_cached_student(student.id)
+
+        storage.save_student(student)
+        assert storage.delete_all_students() == 1
+        assert storage.list_students() == []
+
+    @pytest.mark.parametrize("delete_all", [False, True])
+    def test_delete_evicts_cached_student(self, storage, student, delete_all):
+        cache = storage_module(storage)._student_cache
+        storage.save_student(student)
+        storage.get_cached_student(student.id)
+        size = len(cache)
+
+        if delete_all:
+            storage.delete_all_students()
+        else:
+            storage.delete_student(student.id)
+
+        assert len(cache) == size - 1
+
+
+class TestStudentCache:
+    def test_evicts_least_recently_used(self, student):
+        cache = StudentCache(maxsize=2)
+        cache.put("A", 1, student)
+        cache.put("B", 1, student)
+        assert cache.get("A", 1) is student
+
+        cache.put("C", 1, student)
+
+        assert cache.get("B", 1) is None
+        assert cache.get("A", 1) is student and cache.get("C", 1) is student
+
+    def test_stale_stamp_misses(self, student):
+        cache = StudentCache(maxsize=2)
+        cache.put("A", 1, student)
+
+        assert cache.get("A", 2) is None
+
+    def test_zero_size_disables(self, student):
+        cache = StudentCache(maxsize=0)
+        cache.put("A", 1, student)
+
+        assert len(cache) == 0
+
+    def test_size_from_environment(self, monkeypatch):
+        monkeypatch.setenv("GRADUATION_STUDENT_CACHE_SIZE", "3")
+
+        assert StudentCache().maxsize == 3
+
+
+class TestStudentQuery:
+    @pytest.fixture
+    def students(self, storage, student):
+        for student_id, name, major in [
+            ("B51110001", "王小明", "B5"),
+            ("AN4116001", "Alice", "AN"),
+            ("AN4116002", "小華", "AN"),
+        ]:
+            storage.save_student(
+                student.model_copy(
+                    update={"id": student_id, "name": name, "major": major}
+                )
+            )
+        storage.flush()
+        return storage
+
+    def ids(self, page):
+        return [info.id for info in page.items]
+
+    def test_sorted_by_id(self, students):
+        page = students.query_students(StudentQuery())
+
+        assert self.ids(page) == ["AN4116001", "AN4116002", "B51110001"]
+        assert page.items[2].name == "王小明"
+        assert page.total == 3
+
+    def test_filter_and_paginate(self, students):
+        assert self.ids(students.query_students(StudentQuery(search="alice"))) == [
+            "AN4116001"
+        ]
+        assert self.ids(students.query_students(StudentQuery(search="小"))) == [
+            "AN4116002",
+            "B51110001",
+        ]
+        assert self.ids(students.query_students(StudentQuery(search="b511"))) == [
+            "B51110001"
+        ]
+        assert self.ids(students.query_students(StudentQuery(search="%"))) == []
+
+        page = students.query_students(StudentQuery(major="AN", offset=1, limit=5))
+        assert self.ids(page) == ["AN4116002"]
+        assert (page.total, page.offset, page.limit) == (2, 1, 5)
+
+        page = students.query_students(StudentQuery(major="AN", admission_year=111))
+        assert self.ids(page) == ["AN4116001", "AN4116002"]
+        assert self.ids(students.query_students(StudentQuery(admission_year=112))) == []
+
+    def test_reflects_deletes(self, students):
+        students.delete_student("AN4116002")
+
+        assert self.ids(students.query_students(StudentQuery())) == [
+            "AN4116001",
+            "B51110001",
+        ]
+
+
+class TestJsonStudentIndex:
+    @pytest.fixture
+    def storage(self, tmp_path, student):
+        storage = JsonStorage(tmp_path / "data")
+        storage.save_student(student)
+        storage.flush()
+        return storage
+
+    def test_listing_does_not_parse_courses(self, storage, student, monkeypatch):
+        def fail(*args, **kwargs):
+            raise AssertionError("不應解析學生檔案")
+
+        monkeypatch.setattr(StudentFactory, "from_json_file", fail)
+
+        [info] = storage.query_students(StudentQuery()).items
+        assert (info.id, info.name, info.major) == (
+            student.id,
+            student.name,
+            student.major,
+        )
+
+    def test_files_written_outside_the_storage(self, storage, student):
+        data = student.model_dump() | {"name": "手動修改"}
+        student_file = storage.students_dir / f"{student.id}.json"
+        student_file.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+        (storage.students_dir / "B51110001.json").write_text(
+            json.dumps(
+                data | {"id": "B51110001", "name": "新學生"}, ensure_ascii=False
+            ),
+            encoding="utf-8",
+        )
+        (storage.students_dir / "broken.json").write_text("{", encoding="utf-8")
+
+        page = storage.query_students(StudentQuery())
+
+        assert [(info.id, info.name) for info in page.items] == [
+            (student.id, "手動修改"),
+            ("B51110001", "新學生"),
+        ]
+        with open(storage.student_index, "r", encoding="utf-8") as f:
+            index = json.load(f)
+        assert index["B51110001"]["name"] == "新學生"
+        assert "fingerprint" not in index["B51110001"]
+        # 指紋仍與檔案內容一致
+        assert storage.student_fingerprint("B51110001") == (
+            UtilFunctions.fingerprint_student(storage.get_student("B51110001"))
+        )
+
+    def test_index_without_headers(self, storage, student):
+        # 舊版索引只有指紋與修改時間
+        index = _student_indexes[storage.student_index.absolute()]
+        index[student.id] = {
+            key: index[student.id][key] for key in ("mtime_ns", "fingerprint")
+        }
+
+        [info] = storage.query_students(StudentQuery()).items
+        assert info.name == student.name
+
+
+class TestResolved:
+    def test_pickles_to_equal_storage(self, storage, student):
+        storage.save_student(student)
+        copy = pickle.loads(pickle.dumps(storage.resolved()))
+
+        assert copy == storage.resolved() and hash(copy) == hash(storage.resolved())
+        assert copy.get_student(student.id) == student
+
+    def test_different_locations_differ(self, storage, tmp_path):
+        other = type(storage)(tmp_path / "other")
+
+        assert storage != other
+
+
+class TestRules:
+    def test_find_rule_selects_latest_eligible_year(self, storage, rule):
+        for year in (100, 102, 105):
+            storage.save_rule("B5", year, "minor", rule)
+
+        assert storage.list_rules() == [
+            ("B5", 100, "minor"),
+            ("B5", 102, "minor"),
+            ("B5", 105, "minor"),
+        ]
+        assert storage.rule_years("B5", "minor") == [100, 102, 105]
+        assert storage.find_rule("B5", 104, "minor") == rule
+        assert storage.get_rule("B5", 101, "minor") is None
+
+        with pytest.raises(FileNotFoundError, match="入學年度 99"):
+            storage.find_rule("B5", 99, "minor")
+        with pytest.raises(FileNotFoundError, match="沒有可用的 major 規則"):
+            storage.find_rule("B5", 110, "major")
+        with pytest.raises(FileNotFoundError):
+            storage.find_rule("H5", 110, "minor")
+
+    def test_save_existing_rule(self, storage, rule):
+        storage.save_rule("B5", 102, "minor", rule)
+
+        with pytest.raises(FileExistsError):
+            storage.save_rule("B5", 102, "minor", rule)
+        storage.save_rule("B5", 102, "minor", rule, overwrite=True)
+
+        assert storage.delete_rule("B5", 102, "minor") is True
+        assert storage.delete_rule("B5", 102, "minor") is False
+
+
+class TestVersions:
+    def test_student_version(self, storage, student):
+        assert storage.student_version(student.id) is None
+
+        storage.save_student(student)
+        version = storage.student_version(student.id)
+        assert version == storage.student_version(student.id)
+
+        storage.save_student(student.model_copy(update={"name": "新名字"}))
+        assert storage.student_version(student.id) != version
+
+        storage.delete_student(student.id)
+        assert storage.student_version(student.id) is None
+
+    def test_rule_versions(self, storage, rule):
+        assert storage.rule_version("B5", 102, "minor") is None
+        empty = storage.rules_version()
+
+        storage.save_rule("B5", 102, "minor", rule)
+        version = storage.rule_version("B5", 102, "minor")
+        listed = storage.rules_version()
+        assert version is not None
+        assert listed != empty
+
+        renamed = rule.model_copy(update={"name": "新規則"})
+        storage.save_rule("B5", 102, "minor", renamed, overwrite=True)
+        assert storage.rule_version("B5", 102, "minor") != version
+        # 規則內容改變不影響列表
+        assert storage.rules_version()[0] == listed[0]
+
+        storage.save_rule("B5", 103, "minor", rule)
+        assert storage.rules_version()[0] != listed[0]
+
+
+class TestCachedRules:
+    def test_parsed_once_and_frozen(self, storage, rule):
+        storage.save_rule("B5", 102, "minor", rule)
+
+        cached = storage.find_rule("B5", 110, "minor")
+
+        assert cached == rule
+        assert cached.frozen
+        assert storage.find_rule("B5", 102, "minor") is cached
+        assert storage.get_rule("B5", 102, "minor") is not cached
+
+    def test_invalidated_by_save_and_delete(self, storage, rule):
+        storage.save_rule("B5", 102, "minor", rule)
+        cached = storage.find_rule("B5", 110, "minor")
+
+        renamed = rule.model_copy(update={"name": "新規則"})
+        storage.save_rule("B5", 102, "minor", renamed, overwrite=True)
+        assert storage.find_rule("B5", 110, "minor").name == "新規則"
+
+        storage.save_rule("B5", 105, "minor", rule)
+        assert storage.find_rule("B5", 110, "minor") == rule
+        assert storage.find_rule("B5", 110, "minor") is not cached
+
+        storage.delete_rule("B5", 105, "minor")
+        storage.delete_rule("B5", 102, "minor")
+        assert storage.get_cached_rule("B5", 102, "minor") is None
+        with pytest.raises(FileNotFoundError):
+            storage.find_rule("B5", 110, "minor")
+
+    def test_json_file_changed_outside_the_storage(self, tmp_path, rule):
+        storage = JsonStorage(tmp_path / "data")
+        storage.save_rule("B5", 102, "minor", rule)
+        assert storage.find_rule("B5", 110, "minor") == rule
+
+        rule_file = storage.rules_dir / "B5" / "102_minor.json"
+        content = rule.model_dump() | {"name": "手動修改"}
+        rule_file.write_text(json.dumps(content, ensure_ascii=False), encoding="utf-8")
+        assert storage.find_rule("B5", 110, "minor").name == "手動修改"
+
+        (storage.rules_dir / "B5" / "104_minor.json").write_text(
+            rule.model_dump_json(), encoding="utf-8"
+        )
+        assert storage.rule_years("B5", "minor") == [102, 104]
+        assert storage.find_rule("B5", 110, "minor") == rule
+
+
+class TestResults:
+    def test_newest_first(self, storage):
+        storage.save_result(
+            "A_old.json", {"id": "A", "name": "甲"}, datetime(2025, 1, 1)
+        )
+        storage.save_result(
+            "B_new.json", {"id": "B", "name": "乙"}, datetime(2025, 6, 1)
+        )
+
+        assert [
+            (info.file_name, info.student_id, info.student_name)
+            for info in storage.list_results()
+        ] == [("B_new.json", "B", "乙"), ("A_old.json", "A", "甲")]
+        assert storage.get_result("A_old.json") == {"id": "A", "name": "甲"}
+        assert storage.result_created_at("A_old.json") == datetime(2025, 1, 1)
+
+    def test_records_are_stored_as_json(self, storage):
+        record = AllRecord("規則", None, ["微積分（一）"])
+        record.earned_credits = 3
+
+        storage.save_result("A.json", {"id": "A", "name": "甲", "main": record})
+
+        assert storage.get_result("A.json")["main"] == record.to_dict()
+        assert orjson.loads(storage.get_result_json("A.json")) == storage.get_result(
+            "A.json"
+        )
+        assert storage.list_results()[0].programs == ["main"]
+        with pytest.raises(FileNotFoundError):
+            storage.get_result_json("missing.json")
+
+    def test_delete(self, storage):
+        with pytest.raises(FileNotFoundError):
+            storage.get_result("missing.json")
+        assert storage.delete_result("missing.json") is False
+
+        storage.save_result("A.json", {"id": "A", "name": "甲"})
+        storage.save_result("B.json", {"id": "B", "name": "乙"})
+        assert storage.delete_result("A.json") is True
+        assert storage.delete_all_results() == 1
+        assert storage.list_results() == []
+
+
+class TestResultQuery:
+    @pytest.fixture
+    def results(self, storage):
+        passed = {"is_valid": True}
+        failed = {"is_valid": False}
+        for day, student_id, name, data in [
+            (1, "A", "甲", {"main": passed, "minor_B5": failed}),
+            (2, "B", "乙", {"main": passed, "double_major": None}),
+            (3, "A", "甲", {"main": passed}),
+            (4, "C", "丙", {}),
+        ]:
+            storage.save_result(
+                f"{student_id}_{day}.json",
+                {"id": student_id, "name": name} | data,
+                datetime(2025, 1, day),
+            )
+        return storage
+
+    def test_summary(self, results):
+        infos = {info.file_name: info for info in results.list_results()}
+
+        assert infos["A_1.json"].is_eligible is False
+        assert infos["A_1.json"].programs == ["main", "minor_B5"]
+        assert infos["B_2.json"].is_eligible is True
+        assert infos["B_2.json"].programs == ["main"]
+        assert infos["C_4.json"].is_eligible is None
+        assert infos["C_4.json"].created_at == datetime(2025, 1, 4)
+
+    def test_filter_sort_and_paginate(self, results):
+        page = results.query_results(ResultQuery(student_id="A"))
+        assert [info.file_name for info in page.items] == ["A_3.json", "A_1.json"]
+        assert page.total == 2
+
+        page = results.query_results(
+            ResultQuery(sort="student_id", descending=False, offset=1, limit=2)
+        )
+        assert [info.file_name for info in page.items] == ["A_3.json", "B_2.json"]
+        assert (page.total, page.offset, page.limit) == (4, 1, 2)
+
+        page = results.query_results(ResultQuery(offset=10))
+        assert page.items == [] and page.total == 4
+
+    def test_overwrite_updates_summary(self, results):
+        results.save_result(
+            "A_1.json", {"id": "A", "name": "甲", "main": {"is_valid": True}}
+        )
+
+        info = results.query_results(ResultQuery(student_id="A")).items[0]
+        assert info.file_name == "A_1.json"
+        assert info.is_eligible is True
+
+
+class TestJsonResultFormat:
+    def test_compact_by_default(self, tmp_path):
+        JsonStorage(tmp_path).save_result("A.json", {"id": "A", "name": "甲"})
+
+        assert (tmp_path / "evaluation_results" / "A.json").read_bytes() == (
+            '{"id":"A","name":"甲"}'.encode()
+        )
+
+    def test_pretty(self, tmp_path):
+        record = AllRecord("規則", None)
+        storage = JsonStorage(tmp_path, pretty=True)
+        storage.save_result("A.json", {"id": "A", "main": record})
+
+        text = (tmp_path / "evaluation_results" / "A.json").read_text(encoding="utf-8")
+        assert '\n    "is_valid": true' in text
+        assert storage.get_result("A.json")["main"] == record.to_dict()
+        assert storage.resolved().pretty
+
+
+class TestJsonResultManifest:
+    @pytest.fixture
+    def storage(self, tmp_path):
+        storage = JsonStorage(tmp_path / "data")
+        storage.save_result("A.json", {"id": "A", "name": "甲"}, datetime(2025, 1, 1))
+        return storage
+
+    def test_listing_reads_only_the_manifest(self, storage):
+        (storage.results_dir / "A.json").write_text("not json", encoding="utf-8")
+
+        assert [info.student_id for info in storage.list_results()] == ["A"]
+        assert storage.results_manifest.exists()
+
+    def test_syncs_files_changed_outside_the_storage(self, storage, tmp_path):
+        # 其他行程（例如批次審查的 worker）寫入或刪除結果檔案
+        other = JsonStorage(tmp_path / "data")
+        other.save_result("B.json", {"id": "B", "name": "乙"}, datetime(2025, 1, 2))
+        assert [info.file_name for info in storage.list_results()] == [
+            "B.json",
+            "A.json",
+        ]
+
+        (storage.results_dir / "A.json").unlink()
+        with open(storage.results_dir / "C.json", "w", encoding="utf-8") as f:
+            json.dump({"id": "C", "name": "丙"}, f)
+        assert sorted(info.file_name for info in storage.list_results()) == [
+            "B.json",
+            "C.json",
+        ]
+
+    @pytest.mark.skipif(fcntl is None, reason="需要 fcntl")
+    def test_manifest_is_locked_across_processes(self, storage):
+        with ProcessPoolExecutor(
+            max_workers=1, mp_context=multiprocessing.get_context("spawn")
+        ) as executor:
+            executor.submit(os.getpid).result()
+            with storage._manifest_locked():
+                future = executor.submit(
+                    storage.save_result, "B.json", {"id": "B", "name": "乙"}
+                )
+                # 其他行程在索引的檔案鎖釋放之前無法寫入索引
+                assert not wait([future], timeout=0.5).done
+            future.result(timeout=30)
+
+        manifest = json.loads(storage.results_manifest.read_text(encoding="utf-8"))
+        assert sorted(manifest["results"]) == ["A.json", "B.json"]
+
+    def test_rebuilds_a_missing_manifest(self, storage):
+        storage.results_manifest.unlink()
+        _result_manifests.clear()
+
+        assert [info.file_name for info in storage.list_results()] == ["A.json"]
+        assert storage.delete_all_results() == 1
+        assert storage.list_results() == []
+
+
+class TestMigrate:
+    @pytest.fixture
+    def migrated(self, tmp_path, monkeypatch):
+        shutil.copytree(DATA_DIR, tmp_path / "data")
+        monkeypatch.chdir(tmp_path)
+        source = JsonStorage(tmp_path / "data")
+        target = SqliteStorage(tmp_path / "graduation.sqlite3")
+        counts = migrate(source, target)
+        review_cache.clear()
+        previous = set_storage(target)
+        yield source, target, counts
+        set_storage(previous)
+        review_cache.clear()
+
+    def test_copies_everything(self, migrated):
+        source, target, counts = migrated
+
+        assert counts["students"] == len(source.list_students()) > 0
+        assert counts["rules"] == len(source.list_rules()) > 0
+        assert target.list_students() == source.list_students()
+        assert target.list_rules() == source.list_rules()
+        for key in source.list_rules():
+            assert target.get_rule(*key) == source.get_rule(*key)
+
+    def test_review_uses_sqlite(self, migrated, tmp_path):
+        source, target, _ = migrated
+        shutil.rmtree(tmp_path / "data" / "students")
+        shutil.rmtree(tmp_path / "data" / "rules")
+
+        results = ReviewCRUD.review_student(
+            StudentCRUD.get_student_by_id("AN4116089"), minor_departments=["B5"]
+        )
+
+        assert results["main"] is not None
+        assert [info.student_id for info in target.list_results()] == ["AN4116089"]
+        assert not (tmp_path / "data" / "evaluation_results").exists()
@@ -0,0 +1,85 @@
+import os
+import asyncio
+import threading
+import pytest
+from concurrent.futures.process import BrokenProcessPool
+from api.executors import (
+    ProcessPool,
+    cpu_pool,
+    run_cpu,
+    run_io,
+    shutdown_process_pools,
+)
+
+
+def thread_name(*args, **kwargs) -> tuple[str, tuple, dict]:
+    return threading.current_thread().name, args, kwargs
+
+
+def process_id(*args, **kwargs) -> tuple[int, tuple, dict]:
+    return os.getpid(), args, kwargs
+
+
+class TestExecutors:
+    def test_separate_executors(self):
+        async def run():
+            return await asyncio.gather(
+                run_io(thread_name, 1, key="io"), run_cpu(process_id, 2, key="cpu")
+            )
+
+        try:
+            (io_thread, io_args, io_kwargs), (cpu_pid, cpu_args, cpu_kwargs) = (
+                asyncio.run(run())
+            )
+        finally:
+            shutdown_process_pools()
+
+        assert io_thread.startswith("io")
+        assert cpu_pid != os.getpid()
+        assert (io_args, io_kwargs) == ((1,), {"key": "io"})
+        assert (cpu_args, cpu_kwargs) == ((2,), {"key": "cpu"})
+
+    def test_exceptions_propagate(self):
+        def fail():
+            raise FileNotFoundError("找不到")
+
+        with pytest.raises(FileNotFoundError, match="找不到"):
+            asyncio.run(run_io(fail))
+
+    def test_process_pool_is_shared_until_discarded(self):
+        pool = ProcessPool(max_workers=1)
+        executor = pool.get()
+        try:
+            assert pool.get() is executor
+            assert executor._mp_context.get_start_method() == "spawn"
+            assert executor.submit(os.getpid).result() != os.getpid()
+
+            other = ProcessPool(max_workers=1)
+            pool.discard(other.get())
+            other.discard()
+            assert pool.get() is executor
+        finally:
+            pool.discard()
+
+        assert pool.get() is not executor
+        pool.discard()
+
+    def test_broken_pool_is_replaced_without_waiting(self, monkeypatch):
+        calls = []
+        discard = ProcessPool.discard
+
+        def recording_discard(self, executor=None, wait=True):
+            calls.append(wait)
+            discard(self, executor, wait)
+
+        monkeypatch.setattr(ProcessPool, "discard", recording_discard)
+        try:
+            broken = cpu_pool.get()
+            with pytest.raises(BrokenProcessPool):
+                asyncio.run(run_cpu(os._exit, 1))
+
+            assert calls == [False]
+            assert cpu_pool.get() is not broken
+            assert asyncio.run(run_cpu(process_id))[0] != os.getpid()
+        finally:
+            shutdown_process_pools()
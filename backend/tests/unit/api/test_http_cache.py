@@ -0,0 +1,101 @@
+from datetime import datetime, timedelta, timezone
+import pytest
+from fastapi import Response
+from starlette.requests import Request
+from api.http_cache import CacheValidator, HTTPCache
+
+MODIFIED = datetime(2025, 10, 20, 14, 30, 15, 500000, tzinfo=timezone.utc)
+
+
+def request(**headers: str) -> Request:
+    return Request(
+        {
+            "type": "http",
+            "method": "GET",
+            "headers": [
+                (name.replace("_", "-").encode(), value.encode())
+                for name, value in headers.items()
+            ],
+        }
+    )
+
+
+class TestCacheValidator:
+    def test_etag_depends_on_every_version(self):
+        validator = CacheValidator(("a", MODIFIED), ("b", None))
+
+        assert validator.etag.startswith('"') and validator.etag.endswith('"')
+        assert validator.etag == CacheValidator(("a", None), ("b", None)).etag
+        assert validator.etag != CacheValidator(("a", None), ("c", None)).etag
+        # 任一版本沒有修改時間就不提供 Last-Modified
+        assert validator.last_modified is None
+
+    def test_last_modified_is_latest(self):
+        earlier = MODIFIED - timedelta(days=1)
+        validator = CacheValidator(("a", earlier), ("b", MODIFIED))
+
+        assert validator.last_modified == MODIFIED
+
+
+class TestHTTPCache:
+    @pytest.fixture
+    def validator(self):
+        return CacheValidator(("a", MODIFIED))
+
+    def test_headers(self, validator):
+        headers = HTTPCache("test").headers(validator)
+
+        assert headers == {
+            "ETag": validator.etag,
+            "Cache-Control": "no-cache",
+            "Last-Modified": "Mon, 20 Oct 2025 14:30:15 GMT",
+        }
+
+    def test_cache_control_from_environment(self, monkeypatch):
+        monkeypatch.setenv("GRADUATION_CACHE_CONTROL_TEST", "max-age=60")
+
+        assert HTTPCache("test").cache_control == "max-age=60"
+        assert HTTPCache("other").cache_control == "no-cache"
+
+    @pytest.mark.parametrize(
+        "headers, fresh",
+        [
+            ({}, False),
+            ({"if_none_match": "ETAG"}, True),
+            ({"if_none_match": 'W/ETAG, "other"'}, True),
+            ({"if_none_match": "*"}, True),
+            ({"if_none_match": '"other"'}, False),
+            ({"if_modified_since": "Mon, 20 Oct 2025 14:30:15 GMT"}, True),
+            ({"if_modified_since": "Mon, 20 Oct 2025 14:30:14 GMT"}, False),
+            ({"if_modified_since": "not a date"}, False),
+            # If-None-Match 優先於 If-Modified-Since
+            (
+                {
+                    "if_none_match": '"other"',
+                    "if_modified_since": "Mon, 20 Oct 2025 14:30:15 GMT",
+                },
+                False,
+            ),
+        ],
+    )
+    def test_is_fresh(self, validator, headers, fresh):
+        headers = {
+            name: value.replace("ETAG", validator.etag)
+            for name, value in headers.items()
+        }
+
+        assert HTTPCache.is_fresh(request(**headers), validator) is fresh
+
+    def test_not_modified(self, validator):
+        cache = HTTPCache("test")
+
+        response = Response()
+        assert cache.not_modified(request(), response, validator) is None
+        assert response.headers["etag"] == validator.etag
+
+        cached = cache.not_modified(
+            request(if_none_match=validator.etag), Response(), validator
+        )
+        assert cached.status_code == 304
+        assert cached.headers["etag"] == validator.etag
+        assert cached.body == b""
@@ -0,0 +1,65 @@
+from benchmarks.generator import DataGenerator
+from benchmarks.run import compare_results, run_benchmarks
+from rule_engine.evaluator import Evaluator
+from rule_engine.factory import StudentFactory
+
+
+class TestDataGenerator:
+    def test_deterministic(self):
+        first = DataGenerator(seed=7)
+        second = DataGenerator(seed=7)
+
+        assert first.students(3, 20) == second.students(3, 20)
+        assert first.rule_dict() == second.rule_dict()
+        assert DataGenerator(seed=8).students(3, 20) != DataGenerator(seed=7).students(
+            3, 20
+        )
+
+    def test_generated_data_is_evaluable(self):
+        generator = DataGenerator()
+        students = generator.students(5, 40)
+        rule = generator.rule(depth=2, breadth=3)
+
+        assert len({student.id for student in students}) == 5
+        assert all(len(student.courses) == 40 for student in students)
+        for student in students:
+            Evaluator().evaluate(rule, student.courses)
+
+    def test_excel_round_trip(self, tmp_path):
+        students = DataGenerator().students(3, 10)
+        DataGenerator.write_excel(students, tmp_path / "students.xlsx")
+
+        loaded = StudentFactory.load_students_from_excel(
+            tmp_path / "students.xlsx", tmp_path / "out", major="AN"
+        )
+
+        assert sorted(loaded) == sorted(student.id for student in students)
+        for student in students:
+            assert [c.course_name for c in loaded[student.id].courses] == [
+                c.course_name for c in student.courses
+            ]
+
+
+class TestBenchmarkRunner:
+    def test_machine_readable_results(self):
+        results = run_benchmarks(
+            n_students=2,
+            n_courses=10,
+            repeat=1,
+            selected=["evaluator.evaluate", "rule_factory.from_json_file"],
+        )
+
+        assert [item["name"] for item in results["benchmarks"]] == [
+            "evaluator.evaluate",
+            "rule_factory.from_json_file",
+        ]
+        assert all(item["ops"] > 0 for item in results["benchmarks"])
+
+        slower = {
+            "benchmarks": [
+                dict(item, median_s=item["median_s"] * 2)
+                for item in results["benchmarks"]
+            ]
+        }
+        assert len(compare_results(slower, results, threshold=0.5)) == 2
+        assert compare_results(results, results, threshold=0.5) == []
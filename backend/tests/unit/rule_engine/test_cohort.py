@@ -0,0 +1,114 @@
+from pathlib import Path
+import pytest
+from rule_engine.evaluator import Evaluator
+from rule_engine.factory import RuleFactory, StudentFactory
+from rule_engine.models.course import *
+from rule_engine.models.student import Student
+
+DATA_DIR = Path(__file__).resolve().parents[3] / "data"
+RULE_FILES = sorted((DATA_DIR / "rules").glob("*/*.json"))
+
+
+def make_course(course_name: str, course_code: str, **kwargs) -> StudentCourse:
+    data = {
+        "course_name": course_name,
+        "course_codes": [course_code],
+        "credit": 3.0,
+        "course_type": 1,
+        "tag": [],
+        "grade": 85,
+        "category": " ",
+        "year_taken": 111,
+        "semester_taken": 1,
+    }
+    data.update(kwargs)
+    return StudentCourse(**data)
+
+
+def make_students() -> list[Student]:
+    sample = StudentFactory.from_json_file(DATA_DIR / "students" / "AN4116089.json")
+    retaker = Student(
+        name="重修生",
+        id="B51110001",
+        major="B5",
+        courses=[
+            make_course("台灣文學史（一）", "B510001", grade=40, year_taken=110),
+            make_course("台灣文學史（一）", "H510001", grade=75),
+            make_course("台灣文學史（二）", "B510002"),
+            make_course("語言學概論（一）", "B510003", grade=999),
+            make_course("語言學概論（二）", "B510004", grade=555),
+            make_course("公共運輸", "H510005", tag=["coursera"]),
+        ],
+    )
+    empty = Student(name="新生", id="H51130001", major="H5", courses=[])
+    return [sample, retaker, empty]
+
+
+def evaluate_each(rule, students: list[Student]) -> list[dict]:
+    evaluator = Evaluator()
+    return [
+        evaluator.evaluate(rule.model_copy(deep=True), student.courses).model_dump()
+        for student in students
+    ]
+
+
+class TestCohortEvaluator:
+    @pytest.mark.parametrize("rule_file", RULE_FILES, ids=lambda p: p.stem)
+    def test_matches_per_student_evaluation(self, rule_file: Path):
+        rule = RuleFactory.from_json_file(rule_file)
+        students = make_students()
+
+        expected = evaluate_each(rule, students)
+        results = Evaluator().evaluate_cohort(rule, students)
+
+        assert [result.model_dump() for result in results] == expected
+
+    @pytest.mark.parametrize(
+        "course_list, criteria",
+        [
+            (["台灣文學史（一）"], {"allow_external_substitute_after_fail": True}),
+            (None, {"allow_external_substitute_after_fail": True}),
+            (["台灣文學史（一）", "台灣文學史（一）"], {}),
+            (None, {"department_codes": ["B5"], "allow_fail": True}),
+            (None, {"tags": ["coursera"], "exclude_department_codes": ["B5"]}),
+        ],
+    )
+    def test_sequential_and_vectorized_paths(self, course_list, criteria):
+        rule = RuleFactory.from_dict(
+            {
+                "name": "規則",
+                "rule_type": "rule_set",
+                "requirement": {"type": "meaningless"},
+                "sub_rules": [
+                    {
+                        "name": "子規則",
+                        "rule_type": "rule_all",
+                        "requirement": {"type": "min_credits", "min_credits": 3},
+                        "course_list": course_list,
+                        "course_criteria": criteria,
+                    },
+                    {
+                        "name": "其餘課程",
+                        "rule_type": "rule_all",
+                        "requirement": {"type": "max_credits", "max_credits": 9},
+                        "course_criteria": {},
+                    },
+                ],
+            }
+        )
+        students = make_students()
+
+        expected = evaluate_each(rule, students)
+        results = Evaluator().evaluate_cohort(rule, students)
+
+        assert [result.model_dump() for result in results] == expected
+
+    def test_does_not_mutate_students(self):
+        rule = RuleFactory.from_json_file(RULE_FILES[0])
+        students = make_students()
+
+        Evaluator().evaluate_cohort(rule, students)
+
+        assert not any(
+            course.recognized for student in students for course in student.courses
+        )
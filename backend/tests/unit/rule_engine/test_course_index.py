@@ -0,0 +1,67 @@
+from rule_engine.course_index import CourseIndex
+from rule_engine.models.course import *
+from rule_engine.models.rule import *
+
+
+def make_course(course_name: str, course_code: str, **kwargs) -> StudentCourse:
+    data = {
+        "course_name": course_name,
+        "course_codes": [course_code],
+        "credit": 3.0,
+        "course_type": 1,
+        "tag": [],
+        "grade": 85,
+        "category": " ",
+        "year_taken": 111,
+        "semester_taken": 1,
+    }
+    data.update(kwargs)
+    return StudentCourse(**data)
+
+
+class TestCourseIndex:
+    def setup_method(self):
+        self.courses = [
+            make_course("語言學概論（二）", "B510002"),
+            make_course("微積分（一）", "A910001", category="X"),
+            make_course("語言學概論（一）", "B510001", year_taken=112),
+            make_course("語言學概論（一）", "B510001", year_taken=110, grade=40),
+        ]
+        self.index = CourseIndex(self.courses)
+
+    def test_candidates_by_course_list(self):
+        candidates = self.index.candidates(
+            ["語言學概論（一）", "語言學概論（二）"], CourseCriteria()
+        )
+        assert candidates == [
+            self.courses[3],
+            self.courses[2],
+            self.courses[0],
+        ]
+
+    def test_candidates_skip_recognized(self):
+        recognized = bytearray(len(self.courses))
+        recognized[3] = 1
+        candidates = self.index.candidates(
+            ["語言學概論（一）"], CourseCriteria(), recognized
+        )
+        assert candidates == [self.courses[2]]
+        assert self.index.candidate_positions(
+            ["語言學概論（一）"], CourseCriteria(), recognized
+        ) == [2]
+
+    def test_candidates_narrowed_by_department_and_category(self):
+        by_department = self.index.candidates(
+            None, CourseCriteria(department_codes=["A9"])
+        )
+        assert by_department == [self.courses[1]]
+
+        by_category = self.index.candidates(None, CourseCriteria(categories=[" "]))
+        assert self.courses[1] not in by_category
+        assert len(by_category) == 3
+
+    def test_candidates_not_narrowed_for_external_substitute(self):
+        criteria = CourseCriteria(
+            department_codes=["A9"], allow_external_substitute_after_fail=True
+        )
+        assert len(self.index.candidates(None, criteria)) == len(self.courses)
@@ -0,0 +1,74 @@
+import json
+import os
+from pathlib import Path
+import pytest
+from rule_engine.departments import DepartmentRegistry
+from rule_engine.utils import UtilFunctions
+
+DEPARTMENTS = {
+    "B1": {"name_zh_tw": "中國文學系學士班", "college": "文學院"},
+    "B2": {"name_zh_tw": "外國語文學系學士班", "college": "文學院"},
+    "C1": {"name_zh_tw": "數學系學士班", "college": "理學院"},
+}
+
+
+def write_departments(path: Path, departments: dict):
+    path.write_text(json.dumps(departments, ensure_ascii=False), encoding="utf-8")
+
+
+@pytest.fixture
+def departments_file(tmp_path) -> Path:
+    path = tmp_path / "departments_info.json"
+    write_departments(path, DEPARTMENTS)
+    return path
+
+
+class TestDepartmentRegistry:
+    def test_lookups(self, departments_file):
+        registry = DepartmentRegistry(departments_file)
+
+        assert registry.departments() == DEPARTMENTS
+        assert registry.get("C1")["name_zh_tw"] == "數學系學士班"
+        assert registry.get("Z9") is None
+        assert registry.college_of("B2") == "文學院"
+        assert registry.departments_in_college("理學院") == ["C1"]
+        assert registry.same_college("B2") == ["B1", "B2"]
+        with pytest.raises(ValueError):
+            registry.same_college("Z9")
+
+    def test_loaded_once_until_file_changes(self, departments_file):
+        registry = DepartmentRegistry(departments_file)
+        snapshot = registry.snapshot()
+
+        assert DepartmentRegistry(departments_file).snapshot() is snapshot
+
+        write_departments(departments_file, DEPARTMENTS | {"C2": {"college": "文學院"}})
+        stat = departments_file.stat()
+        os.utime(departments_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+
+        assert registry.snapshot() is not snapshot
+        assert registry.same_college("B1") == ["B1", "B2", "C2"]
+
+    def test_returned_lists_are_copies(self, departments_file):
+        registry = DepartmentRegistry(departments_file)
+
+        registry.same_college("B1").append("C1")
+
+        assert registry.same_college("B1") == ["B1", "B2"]
+
+    def test_missing_or_invalid_file(self, tmp_path):
+        registry = DepartmentRegistry(tmp_path / "departments_info.json")
+        with pytest.raises(FileNotFoundError):
+            registry.departments()
+
+        (tmp_path / "departments_info.json").write_text("{", encoding="utf-8")
+        with pytest.raises(ValueError):
+            registry.departments()
+
+    def test_get_department_code_uses_registry(self, monkeypatch):
+        monkeypatch.chdir(Path(__file__).resolve().parents[3])
+
+        codes = UtilFunctions().get_department_code("B5")
+
+        assert "B5" in codes
+        assert codes == DepartmentRegistry().same_college("B5")
@@ -0,0 +1,95 @@
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from rule_engine.evaluator import Evaluator
+from rule_engine.factory import RuleFactory, StudentFactory
+from rule_engine.models.course import *
+from rule_engine.models.result import *
+
+DATA_DIR = Path(__file__).resolve().parents[3] / "data"
+
+
+def make_course(**kwargs) -> StudentCourse:
+    data = {
+        "course_name": "台灣文學史（一）",
+        "course_codes": ["B510010"],
+        "credit": 3.0,
+        "course_type": 1,
+        "tag": [],
+        "grade": 85,
+        "category": " ",
+        "year_taken": 111,
+        "semester_taken": 1,
+    }
+    data.update(kwargs)
+    return StudentCourse(**data)
+
+
+def make_rule(**criteria):
+    return RuleFactory.from_dict(
+        {
+            "name": "必修",
+            "rule_type": "rule_all",
+            "requirement": {"type": "min_credits", "min_credits": 3},
+            "course_list": ["台灣文學史（一）"],
+            "course_criteria": {"department_codes": ["B5"], **criteria},
+        }
+    )
+
+
+class TestRuleAllEvaluator:
+    def test_external_substitute_after_fail(self):
+        rule = make_rule(allow_external_substitute_after_fail=True)
+        courses = [
+            make_course(grade=40, year_taken=110),
+            make_course(course_codes=["H510010"], grade=80, year_taken=111),
+        ]
+
+        result = Evaluator().evaluate(rule, courses)
+
+        assert isinstance(result, AllResult)
+        assert result.is_valid
+        assert [c.status for c in result.finished_course_list] == ["外系承抵"]
+
+    def test_failed_course_without_substitute_terminates(self):
+        rule = make_rule(allow_external_substitute_after_fail=True)
+        courses = [make_course(grade=40)]
+
+        result = Evaluator().evaluate(rule, courses)
+
+        assert isinstance(result, AllResult)
+        assert not result.is_valid
+        assert result.finished_course_list == []
+
+
+class TestEvaluator:
+    def setup_method(self):
+        self.student = StudentFactory.from_json_file(
+            DATA_DIR / "students" / "AN4116089.json"
+        )
+        self.rules = [
+            RuleFactory.from_json_file(rule_file)
+            for rule_file in sorted((DATA_DIR / "rules").glob("*/*.json"))
+        ]
+
+    def test_does_not_mutate_student_courses(self):
+        before = [course.model_dump() for course in self.student.courses]
+
+        for rule in self.rules:
+            Evaluator().evaluate(rule, self.student.courses)
+
+        assert [course.model_dump() for course in self.student.courses] == before
+
+    def test_concurrent_evaluation_matches_sequential(self):
+        expected = [
+            Evaluator().evaluate(rule, self.student.courses) for rule in self.rules
+        ]
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(
+                executor.map(
+                    lambda rule: Evaluator().evaluate(rule, self.student.courses),
+                    self.rules * 4,
+                )
+            )
+
+        assert results == expected * 4
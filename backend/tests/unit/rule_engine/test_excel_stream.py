@@ -0,0 +1,92 @@
+import random
+import pandas as pd
+import pytest
+from benchmarks.generator import EXCEL_COLUMNS
+from rule_engine.excel_stream import ExcelStudentStream
+from rule_engine.factory import StudentFactory
+from tests.unit.rule_engine.test_factory import make_rows
+
+
+def write_excel(rows: list[list], file_path):
+    pd.DataFrame(rows, columns=list(EXCEL_COLUMNS)).to_excel(file_path, index=False)
+    return file_path
+
+
+def dump(students) -> dict:
+    return {student.id: student.model_dump() for student in students}
+
+
+class TestExcelStudentStream:
+    @pytest.fixture
+    def rows(self) -> list[list]:
+        # 依學號遞減排列（相同學號保持原本順序），與向量化匯入產生學生的順序相反
+        return sorted(
+            make_rows(),
+            key=lambda row: row[0] if isinstance(row[0], str) else "",
+            reverse=True,
+        )
+
+    @pytest.fixture
+    def excel_file(self, rows, tmp_path):
+        return write_excel(rows, tmp_path / "students.xlsx")
+
+    @pytest.fixture
+    def shuffled_file(self, rows, tmp_path):
+        rows = rows[:]
+        random.Random(0).shuffle(rows)
+        return write_excel(rows, tmp_path / "shuffled.xlsx")
+
+    @pytest.mark.parametrize("chunk_rows", [1, 7, 5000])
+    def test_clustered_matches_vectorized(self, excel_file, tmp_path, chunk_rows):
+        expected, expected_errors = StudentFactory.load_students_from_excel_vectorized(
+            excel_file, tmp_path / "out", major="AN"
+        )
+
+        stream = ExcelStudentStream(excel_file, "AN", chunk_rows=chunk_rows)
+        students = list(stream)
+
+        assert stream.clustered is True
+        assert dump(students) == dump(expected.values())
+        assert stream.errors == expected_errors
+
+    def test_clustered_keeps_file_order(self, excel_file):
+        students = list(ExcelStudentStream(excel_file, "AN"))
+
+        ids = [student.id for student in students]
+        assert ids == sorted(ids, reverse=True)
+
+    def test_unsorted_file_is_spilled(self, shuffled_file, tmp_path):
+        expected, _ = StudentFactory.load_students_from_excel_vectorized(
+            shuffled_file, tmp_path / "out", major="AN"
+        )
+
+        stream = ExcelStudentStream(
+            shuffled_file, "AN", chunk_rows=5, spill_dir=tmp_path
+        )
+        students = list(stream)
+
+        assert stream.clustered is False
+        assert [student.id for student in students] == sorted(expected)
+        assert dump(students) == dump(expected.values())
+        assert len(stream.errors) == 11
+        assert [error.row for error in stream.errors] == sorted(
+            error.row for error in stream.errors
+        )
+        # 暫存的 SQLite 檔案在迭代結束後刪除
+        assert sorted(p.name for p in tmp_path.iterdir()) == [
+            "out",
+            "shuffled.xlsx",
+        ]
+
+    def test_forced_clustered_rejects_unsorted_file(self, shuffled_file):
+        with pytest.raises(ValueError, match="未依學號排序"):
+            list(ExcelStudentStream(shuffled_file, "AN", clustered=True))
+
+    def test_missing_column(self, rows, tmp_path):
+        excel_file = tmp_path / "students.xlsx"
+        pd.DataFrame(rows, columns=list(EXCEL_COLUMNS)).drop(columns="學期").to_excel(
+            excel_file, index=False
+        )
+
+        with pytest.raises(ValueError, match="學期"):
+            list(ExcelStudentStream(excel_file, "AN"))
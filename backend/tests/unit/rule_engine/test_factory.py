@@ -0,0 +1,104 @@
+import pandas as pd
+import pytest
+from benchmarks.generator import EXCEL_COLUMNS, DataGenerator
+from rule_engine.factory import StudentFactory
+
+
+def make_rows() -> list[list]:
+    students = DataGenerator(seed=3).students(4, 12)
+    rows = [
+        [
+            student.id,
+            student.name,
+            course.course_name,
+            course.course_codes[0],
+            course.credit,
+            course.grade,
+            course.category,
+            course.course_type,
+            course.year_taken,
+            course.semester_taken,
+        ]
+        for student in students
+        for course in student.courses
+    ]
+    invalid = [
+        ["B51100001", "王小明", "課程", None, 3, 80, " ", 1, 111, 1],
+        [None, "王小明", "課程", "A1", 3, 80, " ", 1, 111, 1],
+        ["B51100001", "王小明", "課程", "A1", -3, 80, " ", 1, 111, 1],
+        ["B51100001", "王小明", "課程", "A1", 3, "A+", " ", 1, 111, 1],
+        ["B51100001", "王小明", "課程", "A1", 3, 150, " ", 1, 111, 1],
+        ["B51100001", "王小明", "課程", "A1", 3, 99, " ", 7, 111, 1],
+        ["B51100001", "王小明", "課程", "A1", 3, 99, "C", 2, 111, 1],
+        ["B51100001", "王小明", "課程", "A1", 3, 99, " ", 2, None, 1],
+        ["B51100001", "王小明", "課程", "A1", 3, 99, " ", 2, 111, 5],
+        ["B51100001", "王小明", "課程", "A1", 3, "85.7", " ", 2, 111, 1],
+        ["bad", "王小明", "課程", "A1", 3, 88, " ", 1, 111, 2],
+    ]
+    valid_edge_cases = [
+        ["B51100001", "王小明", "課程", "A1", 3, None, " ", 1, 111, 1],
+        ["B51100001", "王小明", "  課程  ", "A2", "3", "85", "X", "1", "111", "2"],
+        ["B51100001", "王小明", "課程", "A3", 2, 85.7, " ", 2, 111, 2],
+    ]
+    return rows[:10] + invalid + rows[10:] + valid_edge_cases
+
+
+class TestVectorizedExcelImport:
+    @pytest.fixture
+    def excel_file(self, tmp_path):
+        file_path = tmp_path / "students.xlsx"
+        pd.DataFrame(make_rows(), columns=list(EXCEL_COLUMNS)).to_excel(
+            file_path, index=False
+        )
+        return file_path
+
+    def test_matches_row_by_row_import(self, excel_file, tmp_path):
+        expected = StudentFactory.load_students_from_excel(
+            excel_file, tmp_path / "rows", major="AN"
+        )
+        students, _ = StudentFactory.load_students_from_excel_vectorized(
+            excel_file, tmp_path / "vectorized", major="AN"
+        )
+
+        assert list(students) == list(expected)
+        assert {k: v.model_dump() for k, v in students.items()} == {
+            k: v.model_dump() for k, v in expected.items()
+        }
+        assert sorted(p.name for p in (tmp_path / "vectorized").iterdir()) == sorted(
+            p.name for p in (tmp_path / "rows").iterdir()
+        )
+
+    def test_reports_every_invalid_row(self, excel_file, tmp_path):
+        _, errors = StudentFactory.load_students_from_excel_vectorized(
+            excel_file, tmp_path / "out", major="AN"
+        )
+
+        # 第 1 列為標題，前 10 列資料合法，不合法的資料從第 12 列開始
+        assert [error.row for error in errors] == list(range(12, 23))
+        assert [error.errors[0] for error in errors] == [
+            "缺少課程代碼",
+            "缺少學號、姓名或課程名稱",
+            "學分數必須為非負數字",
+            "成績必須為數字",
+            "成績必須在0到100之間，或為特殊值111, 555, 777, 999",
+            "選修必修類別錯誤",
+            "承抵課程類別錯誤",
+            "修課學年必須為數字",
+            "修課學期必須為 0、1 或 2",
+            "成績必須為數字",
+            errors[-1].errors[0],
+        ]
+        assert errors[-1].student_id == "bad"
+        assert errors[-1].errors[0].startswith("學生資料錯誤")
+
+    def test_edge_cases_are_coerced(self, excel_file, tmp_path):
+        students, _ = StudentFactory.load_students_from_excel_vectorized(
+            excel_file, tmp_path / "out", major="AN"
+        )
+
+        courses = students["B51100001"].courses
+        assert [(c.course_name, c.grade, c.semester_taken) for c in courses] == [
+            ("課程", 0, 1),
+            ("課程", 85, 2),
+            ("課程", 85, 2),
+        ]
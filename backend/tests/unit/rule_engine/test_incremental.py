@@ -0,0 +1,108 @@
+import random
+from pathlib import Path
+import pytest
+from rule_engine.evaluator import Evaluator
+from rule_engine.factory import RuleFactory, StudentFactory
+from rule_engine.incremental import CourseDelta
+from rule_engine.models.course import *
+
+DATA_DIR = Path(__file__).resolve().parents[3] / "data"
+RULE_FILES = sorted((DATA_DIR / "rules").glob("*/*.json"))
+
+
+def load_courses() -> list[StudentCourse]:
+    return StudentFactory.from_json_file(
+        DATA_DIR / "students" / "AN4116089.json"
+    ).courses
+
+
+def regrade(course: StudentCourse, grade: int) -> StudentCourse:
+    return course.model_copy(update={"grade": grade})
+
+
+def full_evaluation(rule, courses: list[StudentCourse]) -> dict:
+    return Evaluator().evaluate_record(rule, courses).to_dict()
+
+
+class TestIncrementalEvaluation:
+    @pytest.mark.parametrize("rule_file", RULE_FILES, ids=lambda p: p.stem)
+    def test_new_semester_matches_full_evaluation(self, rule_file: Path):
+        rule = RuleFactory.from_json_file(rule_file)
+        courses = load_courses()
+        last_year = max(course.year_taken for course in courses)
+        earlier = [c for c in courses if c.year_taken < last_year]
+        new_semester = [c for c in courses if c.year_taken == last_year]
+
+        evaluator = Evaluator()
+        _, state = evaluator.evaluate_with_state(rule, earlier)
+        record, state = evaluator.evaluate_incremental(
+            rule, state, CourseDelta(added=new_semester)
+        )
+
+        assert record.to_dict() == full_evaluation(rule, earlier + new_semester)
+        assert state.courses == earlier + new_semester
+
+    @pytest.mark.parametrize("rule_file", RULE_FILES, ids=lambda p: p.stem)
+    def test_random_deltas_match_full_evaluation(self, rule_file: Path):
+        rule = RuleFactory.from_json_file(rule_file)
+        pool = load_courses()
+        rng = random.Random(rule_file.stem)
+        courses = rng.sample(pool, len(pool) // 2)
+        evaluator = Evaluator()
+        _, state = evaluator.evaluate_with_state(rule, courses)
+
+        for _ in range(20):
+            current = state.courses
+            unused = [c for c in pool if c not in current]
+            delta = CourseDelta(
+                added=rng.sample(unused, min(len(unused), rng.randint(0, 3))),
+                removed=rng.sample(current, min(len(current), rng.randint(0, 2))),
+            )
+            remaining = [c for c in current if c not in delta.removed]
+            delta.regraded = [
+                regrade(c, rng.choice([0, 59, 60, 95, 555, 999]))
+                for c in rng.sample(remaining, min(len(remaining), rng.randint(0, 2)))
+            ]
+
+            record, state = evaluator.evaluate_incremental(rule, state, delta)
+
+            assert record.to_dict() == full_evaluation(rule, state.courses)
+
+    def test_unaffected_nodes_are_reused(self):
+        rule = RuleFactory.from_json_file(RULE_FILES[0])
+        courses = load_courses()
+        evaluator = Evaluator()
+        _, state = evaluator.evaluate_with_state(rule, courses)
+
+        _, new_state = evaluator.evaluate_incremental(rule, state, CourseDelta())
+
+        assert all(
+            new.record is old.record for new, old in zip(new_state.nodes, state.nodes)
+        )
+
+    def test_regraded_course_keeps_position(self):
+        courses = load_courses()
+        delta = CourseDelta(regraded=[regrade(courses[3], 10)])
+
+        updated = delta.apply(courses)
+
+        assert updated[3].grade == 10
+        assert updated[:3] == courses[:3] and updated[4:] == courses[4:]
+        assert courses[3].grade != 10 or courses[3] is not updated[3]
+
+    def test_unknown_course_in_delta(self):
+        courses = load_courses()
+        missing = courses[0].model_copy(update={"year_taken": 90})
+
+        with pytest.raises(ValueError):
+            CourseDelta(removed=[missing]).apply(courses)
+        with pytest.raises(ValueError):
+            CourseDelta(regraded=[missing]).apply(courses)
+
+    def test_rule_change_is_rejected(self):
+        rule = RuleFactory.from_json_file(RULE_FILES[0])
+        _, state = Evaluator().evaluate_with_state(rule, load_courses())
+        rule.description = "修改過的規則"
+
+        with pytest.raises(ValueError):
+            Evaluator().evaluate_incremental(rule, state, CourseDelta())
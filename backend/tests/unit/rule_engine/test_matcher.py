@@ -0,0 +1,74 @@
+import pytest
+from rule_engine.utils import UtilFunctions
+from rule_engine.matcher import CriteriaMatcher
+from rule_engine.models.course import *
+from rule_engine.models.rule import *
+
+
+def make_course(**kwargs) -> StudentCourse:
+    data = {
+        "course_name": "計算機概論（一）",
+        "course_codes": ["E216610"],
+        "credit": 3.0,
+        "course_type": 1,
+        "tag": [],
+        "grade": 95,
+        "category": " ",
+        "year_taken": 111,
+        "semester_taken": 1,
+    }
+    data.update(kwargs)
+    return StudentCourse(**data)
+
+
+class TestCriteriaMatcher:
+    @pytest.mark.parametrize(
+        "criteria, course, expected",
+        [
+            (CourseCriteria(department_codes=["E2"]), make_course(), True),
+            (CourseCriteria(department_codes=["F7", "A9"]), make_course(), False),
+            (CourseCriteria(department_codes=["E21", "F7"]), make_course(), True),
+            (CourseCriteria(exclude_department_codes=["E2"]), make_course(), False),
+            (
+                CourseCriteria(course_name_pattern="^計算機"),
+                make_course(),
+                True,
+            ),
+            (
+                CourseCriteria(course_code_pattern="^E2"),
+                make_course(course_codes=["E216610", "F716610"]),
+                False,
+            ),
+            (CourseCriteria(categories=["A"]), make_course(), False),
+            (CourseCriteria(course_types=[0, 1]), make_course(), True),
+            (CourseCriteria(tags=["coursera"]), make_course(), False),
+            (CourseCriteria(), make_course(grade=50), False),
+            (CourseCriteria(allow_fail=True), make_course(grade=50), True),
+            (CourseCriteria(allow_fail=True), make_course(grade=111), False),
+            (CourseCriteria(), make_course(grade=555), True),
+            (CourseCriteria(), make_course(grade=999), True),
+        ],
+    )
+    def test_match(self, criteria, course, expected):
+        assert CriteriaMatcher(criteria).match(course) is expected
+        assert UtilFunctions.match_criteria(course, criteria) is expected
+
+    def test_grade_override(self):
+        matcher = CriteriaMatcher(CourseCriteria())
+        course = make_course(grade=40)
+        assert not matcher.match(course)
+        assert matcher.match(course, grade=60)
+
+    def test_compile_is_cached_per_criteria(self):
+        criteria = CourseCriteria(department_codes=["E2"])
+        matcher = UtilFunctions.compile_criteria(criteria)
+        assert UtilFunctions.compile_criteria(criteria) is matcher
+        assert UtilFunctions.compile_criteria(CourseCriteria()) is not matcher
+
+    def test_cache_invalidated_on_assignment(self):
+        criteria = CourseCriteria(department_codes=["F7"])
+        course = make_course()
+        assert not UtilFunctions.match_criteria(course, criteria)
+
+        criteria.department_codes = ["E2"]
+        assert UtilFunctions.match_criteria(course, criteria)
@@ -0,0 +1,69 @@
+from pathlib import Path
+import pytest
+from rule_engine.evaluator import Evaluator
+from rule_engine.factory import RuleFactory, StudentFactory
+from rule_engine.models.course import *
+from rule_engine.overlay import CourseOverlay
+
+DATA_DIR = Path(__file__).resolve().parents[3] / "data"
+RULE_FILES = sorted((DATA_DIR / "rules").glob("*/*.json"))
+
+
+def make_course(course_name: str, course_code: str, **kwargs) -> StudentCourse:
+    data = {
+        "course_name": course_name,
+        "course_codes": [course_code],
+        "credit": 3.0,
+        "course_type": 1,
+        "tag": [],
+        "grade": 85,
+        "category": " ",
+        "year_taken": 113,
+        "semester_taken": 1,
+    }
+    data.update(kwargs)
+    return StudentCourse(**data)
+
+
+class TestCourseOverlay:
+    def setup_method(self):
+        self.base = [make_course("微積分（一）", "A910001")]
+        self.added = [make_course("語言學概論（一）", "B510001")]
+
+    def test_sequence_view(self):
+        replacement = make_course("微積分（一）", "A910001", grade=40)
+        overlay = CourseOverlay(self.base, self.added, {0: replacement})
+
+        assert len(overlay) == 2
+        assert list(overlay) == [replacement, self.added[0]]
+        assert overlay[-1] is self.added[0]
+        assert overlay[0:1] == [replacement]
+        assert self.base[0].grade == 85
+        with pytest.raises(IndexError):
+            overlay[2]
+        with pytest.raises(IndexError):
+            CourseOverlay(self.base, replaced={1: replacement})
+
+    def test_with_courses_shares_base(self):
+        overlay = CourseOverlay(self.base).with_courses(self.added)
+
+        assert list(overlay) == self.base + self.added
+        assert len(self.base) == 1
+
+    @pytest.mark.parametrize("rule_file", RULE_FILES, ids=lambda p: p.stem)
+    def test_evaluation_matches_concatenated_list(self, rule_file: Path):
+        rule = RuleFactory.from_json_file(rule_file)
+        courses = StudentFactory.from_json_file(
+            DATA_DIR / "students" / "AN4116089.json"
+        ).courses
+        added = [
+            make_course("台灣文學史（一）", "B510010"),
+            make_course("公共運輸", "H510005", tag=["coursera"]),
+        ]
+
+        result = Evaluator().evaluate_record(rule, CourseOverlay(courses, added))
+
+        assert (
+            result.to_dict()
+            == Evaluator().evaluate_record(rule, courses + added).to_dict()
+        )
@@ -0,0 +1,83 @@
+from rule_engine.evaluator import Evaluator
+from rule_engine.factory import RuleFactory
+from rule_engine.models.course import *
+from rule_engine.profiler import EvaluationProfiler
+
+
+def make_course(course_name: str, course_code: str, **kwargs) -> StudentCourse:
+    data = {
+        "course_name": course_name,
+        "course_codes": [course_code],
+        "credit": 3.0,
+        "course_type": 1,
+        "tag": [],
+        "grade": 85,
+        "category": " ",
+        "year_taken": 111,
+        "semester_taken": 1,
+    }
+    data.update(kwargs)
+    return StudentCourse(**data)
+
+
+def make_rule():
+    return RuleFactory.from_dict(
+        {
+            "name": "畢業規則",
+            "rule_type": "rule_set",
+            "requirement": {"type": "meaningless"},
+            "sub_rules": [
+                {
+                    "name": "系必修",
+                    "rule_type": "rule_all",
+                    "requirement": {"type": "all"},
+                    "course_list": ["台灣文學史（一）", "台灣文學史（二）"],
+                    "course_criteria": {"department_codes": ["B5"]},
+                },
+                {
+                    "name": "其餘課程",
+                    "rule_type": "rule_all",
+                    "requirement": {"type": "min_credits", "min_credits": 3},
+                    "course_criteria": {},
+                },
+            ],
+        }
+    )
+
+
+class TestEvaluationProfiler:
+    def setup_method(self):
+        self.courses = [
+            make_course("台灣文學史（一）", "B510001"),
+            make_course("台灣文學史（二）", "H510002"),
+            make_course("微積分（一）", "A910001"),
+        ]
+
+    def test_records_each_rule_node(self):
+        profiler = EvaluationProfiler()
+        Evaluator(profiler).evaluate(make_rule(), self.courses)
+
+        entries = profiler.to_list()
+        assert [entry["path"] for entry in entries] == [
+            "畢業規則",
+            "畢業規則 > 系必修",
+            "畢業規則 > 其餘課程",
+        ]
+        assert [entry["depth"] for entry in entries] == [0, 1, 1]
+        assert [
+            (entry["candidates"], entry["match_calls"], entry["matches"])
+            for entry in entries
+        ] == [(0, 0, 0), (2, 2, 1), (2, 2, 2)]
+        assert entries[0]["wall_time_ms"] >= entries[1]["wall_time_ms"]
+        assert [entry.path for entry in profiler.hottest(1)][0] in (
+            "畢業規則 > 系必修",
+            "畢業規則 > 其餘課程",
+        )
+        assert "系必修" in profiler.format_report()
+
+    def test_profiling_does_not_change_result(self):
+        profiler = EvaluationProfiler()
+
+        assert Evaluator(profiler).evaluate(
+            make_rule(), self.courses
+        ) == Evaluator().evaluate(make_rule(), self.courses)
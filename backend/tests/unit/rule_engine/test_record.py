@@ -0,0 +1,56 @@
+from pathlib import Path
+import numpy as np
+import pytest
+from rule_engine.evaluator import Evaluator
+from rule_engine.factory import RuleFactory, StudentFactory
+from rule_engine.models.result import *
+from rule_engine.record import AllRecord, SetRecord
+
+DATA_DIR = Path(__file__).resolve().parents[3] / "data"
+RULE_FILES = sorted((DATA_DIR / "rules").glob("*/*.json"))
+
+
+class TestResultRecord:
+    @pytest.mark.parametrize("rule_file", RULE_FILES, ids=lambda p: p.stem)
+    def test_record_converts_to_model(self, rule_file: Path):
+        rule = RuleFactory.from_json_file(rule_file)
+        student = StudentFactory.from_json_file(
+            DATA_DIR / "students" / "AN4116089.json"
+        )
+
+        record = Evaluator().evaluate_record(rule, student.courses)
+        model = record.to_model()
+
+        assert isinstance(record, SetRecord)
+        assert isinstance(model, SetResult)
+        assert record.to_dict() == model.model_dump()
+        assert model == Evaluator().evaluate(rule, student.courses)
+
+    @pytest.mark.parametrize("rule_file", RULE_FILES, ids=lambda p: p.stem)
+    def test_json_matches_model(self, rule_file: Path):
+        rule = RuleFactory.from_json_file(rule_file)
+        student = StudentFactory.from_json_file(
+            DATA_DIR / "students" / "AN4116089.json"
+        )
+
+        record = Evaluator().evaluate_record(rule, student.courses)
+
+        assert record.to_json() == record.to_model().model_dump_json().encode()
+        assert record.to_json() is record.to_json()
+
+    def test_json_normalizes_numbers(self):
+        record = AllRecord("規則", None)
+        record.is_valid = np.bool_(False)
+        record.earned_credits = np.float64(3)
+
+        assert record.to_json() == record.to_model().model_dump_json().encode()
+        assert b'"earned_credits":3.0' in record.to_json()
+
+    def test_empty_all_record(self):
+        record = AllRecord("規則", None, ["微積分（一）"])
+        model = record.to_model()
+
+        assert isinstance(model, AllResult)
+        assert model.is_valid
+        assert model.finished_course_list == []
+        assert model.required_course_list == ["微積分（一）"]
@@ -0,0 +1,76 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from rule_engine.record import AllRecord
+from rule_engine.result_cache import CachedResults, ResultCache
+
+
+def make_entry(name: str) -> CachedResults:
+    return CachedResults({"main": AllRecord(name, None), "minor_B5_error": None})
+
+
+class TestResultCache:
+    def test_key_is_canonical(self):
+        assert ResultCache.make_key(a=1, b={"x": 1, "y": 2}) == ResultCache.make_key(
+            b={"y": 2, "x": 1}, a=1
+        )
+        assert ResultCache.make_key(a=1) != ResultCache.make_key(a=2)
+
+    def test_lru_eviction(self):
+        cache = ResultCache(maxsize=2)
+        cache.put("a", make_entry("a"))
+        cache.put("b", make_entry("b"))
+        cache.get("a")
+        cache.put("c", make_entry("c"))
+
+        assert cache.get("a") is not None
+        assert cache.get("b") is None
+        assert cache.get("c") is not None
+
+    def test_disk_tier(self, tmp_path):
+        ResultCache(disk_dir=tmp_path).put("key", make_entry("規則"))
+
+        entry = ResultCache(disk_dir=tmp_path).get("key")
+
+        assert entry is not None
+        assert entry.results["main"].to_dict() == AllRecord("規則", None).to_dict()
+        assert entry.results["minor_B5_error"] is None
+        assert ResultCache(disk_dir=tmp_path).get("missing") is None
+
+    def test_corrupted_file_is_a_miss(self, tmp_path):
+        (tmp_path / "key.json").write_text("{", encoding="utf-8")
+
+        assert ResultCache(disk_dir=tmp_path).get("key") is None
+
+    def test_disk_tier_is_bounded(self, tmp_path):
+        cache = ResultCache(disk_dir=tmp_path, disk_maxsize=2)
+        for index, key in enumerate(["a", "b", "c"]):
+            cache.put(key, make_entry(key))
+            os.utime(tmp_path / f"{key}.json", (index, index))
+        cache.put("d", make_entry("d"))
+
+        assert sorted(path.stem for path in tmp_path.glob("*.json")) == ["c", "d"]
+
+    def test_clear_disk(self, tmp_path):
+        cache = ResultCache(disk_dir=tmp_path)
+        cache.put("key", make_entry("規則"))
+
+        cache.clear()
+        assert cache.get("key") is not None
+
+        cache.clear(include_disk=True)
+        assert cache.get("key") is None
+        assert not list(tmp_path.glob("*.json"))
+
+    def test_concurrent_writes_to_same_key(self, tmp_path):
+        cache = ResultCache(disk_dir=tmp_path)
+        entries = [make_entry("規則" * 200 + str(index)) for index in range(8)]
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(lambda entry: cache.put("key", entry), entries * 10))
+
+        entry = ResultCache(disk_dir=tmp_path).get("key")
+        assert entry is not None
+        assert entry.results["main"].to_dict() in [
+            e.results["main"].to_dict() for e in entries
+        ]
+        assert not list(tmp_path.glob("*.tmp"))
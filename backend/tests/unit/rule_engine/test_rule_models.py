@@ -0,0 +1,61 @@
+import copy
+import pickle
+from pathlib import Path
+import pytest
+from rule_engine.factory import RuleFactory
+from rule_engine.models.rule import FrozenList, RuleAll, RuleSet
+from rule_engine.utils import UtilFunctions
+
+RULE_FILE = (
+    Path(__file__).resolve().parents[3] / "data" / "rules" / "AN" / "99_major.json"
+)
+
+
+@pytest.fixture
+def rule() -> RuleSet:
+    return RuleFactory.from_json_file(RULE_FILE)
+
+
+class TestFreeze:
+    def test_frozen_rule_rejects_changes(self, rule):
+        digest = UtilFunctions.rule_digest(rule)
+        rule.freeze()
+        sub_rule = next(r for r in rule.sub_rules if isinstance(r, RuleAll))
+
+        with pytest.raises(TypeError):
+            rule.name = "新名稱"
+        with pytest.raises(TypeError):
+            rule.sub_rules[0] = sub_rule
+        with pytest.raises(TypeError):
+            rule.sub_rules.append(sub_rule)
+        with pytest.raises(TypeError):
+            sub_rule.course_criteria.department_codes = ["B5"]
+        with pytest.raises(TypeError):
+            sub_rule.requirement.min_credits = 1
+
+        assert rule.frozen and sub_rule.frozen
+        assert UtilFunctions.rule_digest(rule) == digest
+
+    def test_deep_copy_is_mutable(self, rule):
+        original = copy.deepcopy(rule)
+        rule.freeze()
+
+        copied = rule.model_copy(deep=True)
+        copied.sub_rules[0] = copied.sub_rules[1]
+        for sub_rule in copied.sub_rules:
+            if isinstance(sub_rule, RuleAll):
+                sub_rule.course_criteria.department_codes = ["B5"]
+
+        assert not copied.frozen
+        assert type(copied.sub_rules) is list
+        assert rule == original != copied
+
+    def test_equality_and_pickle_ignore_frozen_state(self, rule):
+        frozen = rule.model_copy(deep=True).freeze()
+
+        assert frozen == rule
+        restored = pickle.loads(pickle.dumps(frozen))
+        assert restored == rule
+        assert restored.frozen
+        assert isinstance(restored.sub_rules, FrozenList)
+        assert type(frozen.model_dump()["sub_rules"]) is list